@@ -0,0 +1,81 @@
+"""
+Compares two benchmark result files and reports regressions.
+
+A scenario regresses when its p95 latency grows, or its throughput drops,
+by more than the threshold. The exit code is 1 if any scenario regressed.
+
+Usage:
+    python -m benchmarks.compare baseline.json candidate.json --threshold 10
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def change_pct(old: float, new: float) -> float:
+    """
+    Returns the relative change from `old` to `new` in percent.
+    """
+    if not old:
+        return 0.0
+    return (new - old) / old * 100
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> list:
+    """
+    Compares scenarios present in both reports.
+
+    Args:
+        baseline (dict): The reference report.
+        candidate (dict): The report to check.
+        threshold (float): Allowed degradation in percent.
+
+    Returns:
+        list: One row per scenario with the changes and a regression flag.
+    """
+    rows = []
+    for name, old in baseline["scenarios"].items():
+        new = candidate["scenarios"].get(name)
+        if new is None:
+            continue
+        p95 = change_pct(old["latency_ms"]["p95"], new["latency_ms"]["p95"])
+        throughput = change_pct(old["throughput_rps"], new["throughput_rps"])
+        rows.append(
+            {
+                "scenario": name,
+                "p95_ms": (old["latency_ms"]["p95"], new["latency_ms"]["p95"]),
+                "p95_change_pct": round(p95, 1),
+                "throughput_change_pct": round(throughput, 1),
+                "regressed": p95 > threshold or throughput < -threshold,
+            }
+        )
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent")
+    args = parser.parse_args(argv)
+
+    rows = compare(
+        json.loads(args.baseline.read_text()),
+        json.loads(args.candidate.read_text()),
+        args.threshold,
+    )
+    for row in rows:
+        old_p95, new_p95 = row["p95_ms"]
+        flag = "REGRESSION" if row["regressed"] else "ok"
+        print(
+            f"{row['scenario']:>10}: p95 {old_p95:.1f} -> {new_p95:.1f}ms "
+            f"({row['p95_change_pct']:+.1f}%), "
+            f"throughput {row['throughput_change_pct']:+.1f}%  {flag}"
+        )
+    return 1 if any(row["regressed"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+"""
+Load and latency benchmark for the Contacts API.
+
+Seeds N users x M contacts into a database, drives the real ASGI `app`
+from `main.py` in-process through an async HTTP client at a configurable
+concurrency, and writes latency percentiles, throughput and peak RSS per
+scenario as JSON. Redis must be reachable at the configured host, as for the
+application itself.
+
+Usage:
+    python -m benchmarks.load --users 10 --contacts 2000 --concurrency 32
+    python -m benchmarks.compare baseline.json candidate.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta, UTC
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from main import app
+from src.conf.config import settings
+from src.database.db import get_db, get_read_db
+from src.database.models import Base, Contact, User, birthday_doy
+from src.services.auth import Hash, create_access_token
+from src.utils.limiter import limiter
+
+SCENARIOS = ("list", "search", "birthdays", "create", "login", "me")
+PASSWORD = "benchmark-password"
+FIRST_NAMES = ["Anna", "Bohdan", "Daria", "Ivan", "Maria", "Oleh", "Sofia", "Taras"]
+LAST_NAMES = ["Bondar", "Kovalenko", "Melnyk", "Shevchenko", "Tkachenko", "Zhuk"]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """
+    Returns the nearest-rank percentile of already sorted values.
+
+    Args:
+        sorted_values (List[float]): Values in ascending order.
+        pct (float): Percentile between 0 and 100.
+
+    Returns:
+        float: The percentile value, or 0.0 for an empty list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def peak_rss_mb() -> float:
+    """
+    Returns the peak resident set size of this process in megabytes.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes.
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+async def seed(session_maker, users: int, contacts: int) -> List[dict]:
+    """
+    Creates confirmed users, each with the same number of random contacts.
+
+    Args:
+        session_maker: Session factory bound to the benchmark database.
+        users (int): Number of users to create.
+        contacts (int): Number of contacts per user.
+
+    Returns:
+        List[dict]: Id, email and access token of every seeded user.
+    """
+    rng = random.Random(42)
+    hashed = Hash().get_password_hash(PASSWORD)
+    seeded = []
+    async with session_maker() as session:
+        for u in range(users):
+            user = User(
+                username=f"bench{u}",
+                email=f"bench{u}@example.com",
+                hashed_password=hashed,
+                confirmed=True,
+                role="user",
+                avatar="https://example.com/avatar.png",
+            )
+            session.add(user)
+            await session.flush()
+
+            rows = []
+            for c in range(contacts):
+                birthday = date(1970, 1, 1) + timedelta(days=rng.randrange(365 * 40))
+                name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {c}"
+                rows.append(
+                    {
+                        "name": name,
+                        "email": f"contact{c}.u{u}@example.com",
+                        "phone": f"+38099{rng.randrange(10**7):07d}",
+                        "birthday": birthday,
+                        "birthday_doy": birthday_doy(birthday),
+                        "user_id": user.id,
+                    }
+                )
+            for start in range(0, len(rows), 1000):
+                await session.execute(
+                    insert(Contact).values(rows[start : start + 1000])
+                )
+
+            token = await create_access_token(
+                data={"sub": user.email, "uid": user.id}, role=user.role
+            )
+            seeded.append({"id": user.id, "email": user.email, "token": token})
+        await session.commit()
+    return seeded
+
+
+def build_requests(
+    client: httpx.AsyncClient, users: List[dict]
+) -> Dict[str, Callable[[int], Awaitable[httpx.Response]]]:
+    """
+    Builds one request factory per scenario; each takes the request number.
+
+    Args:
+        client (httpx.AsyncClient): Client bound to the ASGI app.
+        users (List[dict]): The seeded users.
+
+    Returns:
+        Dict[str, Callable]: Scenario name to request coroutine factory.
+    """
+
+    def auth(i: int) -> dict:
+        return {"Authorization": f"Bearer {users[i % len(users)]['token']}"}
+
+    def contact_body(i: int) -> dict:
+        return {
+            "name": f"Created {i}",
+            "email": f"created{i}@example.com",
+            "phone": "+380990000000",
+            "birthday": "1990-01-01",
+            "user_id": users[i % len(users)]["id"],
+        }
+
+    return {
+        "list": lambda i: client.get(
+            "/api/contacts/", params={"limit": 50}, headers=auth(i)
+        ),
+        "search": lambda i: client.get(
+            "/api/contacts/search",
+            params={"q": FIRST_NAMES[i % len(FIRST_NAMES)]},
+            headers=auth(i),
+        ),
+        "birthdays": lambda i: client.get(
+            "/api/contacts/upcoming_birthdays", headers=auth(i)
+        ),
+        "create": lambda i: client.post(
+            "/api/contacts/", json=contact_body(i), headers=auth(i)
+        ),
+        "login": lambda i: client.post(
+            "/api/auth/login",
+            data={"email": users[i % len(users)]["email"], "password": PASSWORD},
+        ),
+        "me": lambda i: client.get("/api/users/me", headers=auth(i)),
+    }
+
+
+async def run_scenario(
+    make_request: Callable[[int], Awaitable[httpx.Response]],
+    requests: int,
+    concurrency: int,
+) -> dict:
+    """
+    Sends `requests` requests with at most `concurrency` in flight.
+
+    Args:
+        make_request (Callable): Factory returning the request coroutine.
+        requests (int): Total number of requests.
+        concurrency (int): Number of concurrent workers.
+
+    Returns:
+        dict: Latency percentiles in milliseconds, throughput and status codes.
+    """
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    counter = iter(range(requests))
+
+    async def worker():
+        for i in counter:
+            started = time.perf_counter()
+            response = await make_request(i)
+            latencies.append((time.perf_counter() - started) * 1000)
+            key = str(response.status_code)
+            statuses[key] = statuses.get(key, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    errors = sum(n for code, n in statuses.items() if not code.startswith("2"))
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "status_codes": statuses,
+        "wall_seconds": round(wall, 4),
+        "throughput_rps": round(requests / wall, 2) if wall else 0.0,
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "max": round(latencies[-1], 3) if latencies else 0.0,
+        },
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            text=True,
+            stderr=subprocess.DEVNULL,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def main(args: argparse.Namespace) -> dict:
+    engine = create_async_engine(args.database_url)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    seed_started = time.perf_counter()
+    users = await seed(session_maker, args.users, args.contacts)
+    seed_seconds = time.perf_counter() - seed_started
+
+    async def override_get_db():
+        async with session_maker() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    limiter.enabled = False
+    # Requests use the overrides above; warming the configured database
+    # would only retry against a server the benchmark does not use.
+    settings.WARMUP_DB_CONNECTIONS = 0
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://benchmark"
+        ) as client:
+            factories = build_requests(client, users)
+            for name in args.scenarios:
+                requests = args.login_requests if name == "login" else args.requests
+                await run_scenario(factories[name], min(requests, 10), 1)
+                results[name] = await run_scenario(
+                    factories[name], requests, args.concurrency
+                )
+                print(
+                    f"{name:>10}: p50={results[name]['latency_ms']['p50']:.1f}ms "
+                    f"p95={results[name]['latency_ms']['p95']:.1f}ms "
+                    f"p99={results[name]['latency_ms']['p99']:.1f}ms "
+                    f"{results[name]['throughput_rps']:.0f} req/s "
+                    f"errors={results[name]['errors']}"
+                )
+
+    await engine.dispose()
+    return {
+        "meta": {
+            "timestamp": datetime.now(UTC).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database_url": engine.url.render_as_string(hide_password=True),
+            "users": args.users,
+            "contacts_per_user": args.contacts,
+            "seed_seconds": round(seed_seconds, 3),
+        },
+        "scenarios": results,
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--contacts", type=int, default=1000, help="per user")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500, help="per scenario")
+    parser.add_argument(
+        "--login-requests", type=int, default=50, help="bcrypt makes logins slow"
+    )
+    parser.add_argument("--database-url", default="sqlite+aiosqlite:///./benchmark.db")
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS)
+    )
+    parser.add_argument("--output", type=Path, default=Path("benchmark-results.json"))
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    report = asyncio.run(main(arguments))
+    arguments.output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {arguments.output}")
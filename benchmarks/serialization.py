@@ -0,0 +1,120 @@
+"""
+CPU cost of serializing a large contact list to a response body.
+
+Builds N contacts as ORM objects and times each way of turning them into
+JSON bytes, reporting CPU time per run and the CPU saved relative to the
+path FastAPI takes when a route returns the rows with a `response_model`.
+
+Paths:
+    fastapi: response_model validation, `jsonable_encoder`, then `json.dumps`.
+    fastapi-orjson: the same, rendered by `ORJSONResponse`.
+    validated: one validation and dump through a cached TypeAdapter.
+    rows: the fields read off the rows and encoded by orjson, as the API does.
+
+Usage:
+    python -m benchmarks.serialization --contacts 10000 --repeat 5
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from src.database.models import Contact
+from src.schemas.contacts import ContactOut
+from src.utils.serialization import dump_json, dump_rows
+
+
+def make_contacts(count: int) -> List[Contact]:
+    """
+    Builds contacts the way the repository returns them, without a database.
+    """
+    return [
+        Contact(
+            id=i,
+            name=f"Contact {i}",
+            email=f"contact{i}@example.com",
+            phone=f"+38099{i:07d}",
+            birthday=date(1990, 1, 1) + timedelta(days=i % 3650),
+            additional_data=None if i % 2 else f"note {i}",
+            user_id=1,
+        )
+        for i in range(count)
+    ]
+
+
+def build_paths(contacts: List[Contact]) -> Dict[str, Callable[[], bytes]]:
+    field = create_model_field(
+        name="response", type_=List[ContactOut], mode="serialization"
+    )
+
+    def fastapi_path(response_class) -> Callable[[], bytes]:
+        def render() -> bytes:
+            content = asyncio.run(
+                serialize_response(
+                    field=field, response_content=contacts, is_coroutine=True
+                )
+            )
+            return response_class(content).body
+
+        return render
+
+    return {
+        "fastapi": fastapi_path(JSONResponse),
+        "fastapi-orjson": fastapi_path(ORJSONResponse),
+        "validated": lambda: dump_json(List[ContactOut], contacts),
+        "rows": lambda: dump_rows(ContactOut, contacts),
+    }
+
+
+def measure(render: Callable[[], bytes], repeat: int) -> float:
+    """
+    Returns the lowest CPU time of `repeat` runs, in milliseconds.
+    """
+    render()
+    timings = []
+    for _ in range(repeat):
+        started = time.process_time()
+        render()
+        timings.append(time.process_time() - started)
+    return min(timings) * 1000
+
+
+def main(args: argparse.Namespace) -> dict:
+    contacts = make_contacts(args.contacts)
+    paths = build_paths(contacts)
+
+    bodies = {name: json.loads(render()) for name, render in paths.items()}
+    if any(body != bodies["fastapi"] for body in bodies.values()):
+        raise SystemExit("The serialization paths disagree on the output")
+
+    results = {name: measure(render, args.repeat) for name, render in paths.items()}
+    baseline = results["fastapi"]
+    per_10k = 10_000 / args.contacts
+    for name, cpu_ms in results.items():
+        print(
+            f"{name:>14}: {cpu_ms:8.1f}ms CPU, "
+            f"{cpu_ms * per_10k:8.1f}ms per 10k contacts, "
+            f"saves {(baseline - cpu_ms) * per_10k:8.1f}ms per 10k"
+        )
+    return {
+        "contacts": args.contacts,
+        "cpu_ms": {name: round(cpu_ms, 2) for name, cpu_ms in results.items()},
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--contacts", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,121 @@
+"""
+Cold-start import time of the application entry point, checked against a budget.
+
+Imports `main` in fresh interpreters with `python -X importtime`, reports
+the median total and the slowest modules, and fails when the median
+exceeds the budget or when an integration that is meant to load lazily
+was imported.
+
+Usage:
+    python -m benchmarks.startup --runs 5 --budget-ms 1300
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_BUDGET_MS = 1300.0
+"""Median import time of `main` allowed, in milliseconds."""
+
+LAZY_MODULES = (
+    "aiosmtplib",
+    "asyncpg",
+    "cloudinary",
+    "fastapi_mail",
+    "jinja2",
+    "libgravatar",
+    "passlib",
+    "PIL",
+)
+"""Top-level packages that must not be imported by `import main`."""
+
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Parses the report of `python -X importtime`.
+
+    Args:
+        stderr (str): The interpreter's standard error.
+
+    Returns:
+        Dict[str, Tuple[int, int]]: Self and cumulative microseconds by module.
+    """
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:") :].split("|")
+        times[module.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def measure_once() -> Dict[str, Tuple[int, int]]:
+    """
+    Imports `main` in a fresh interpreter.
+
+    Returns:
+        Dict[str, Tuple[int, int]]: Self and cumulative microseconds by module.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def eager_lazy_modules(times: Dict[str, Tuple[int, int]]) -> List[str]:
+    """
+    Returns the lazily loaded packages that were imported anyway.
+    """
+    return [module for module in LAZY_MODULES if module in times]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=15, help="slowest modules shown")
+    args = parser.parse_args(argv)
+
+    runs = [measure_once() for _ in range(args.runs)]
+    totals_ms = [times["main"][1] / 1000 for times in runs]
+    median_ms = statistics.median(totals_ms)
+
+    last = runs[-1]
+    top_level = sorted(
+        (
+            (cumulative, module)
+            for module, (_, cumulative) in last.items()
+            if "." not in module and module != "main"
+        ),
+        reverse=True,
+    )
+    print("Slowest top-level imports of the last run:")
+    for cumulative, module in top_level[: args.top]:
+        print(f"{module:>30}: {cumulative / 1000:8.1f}ms")
+
+    print(
+        f"import main: median {median_ms:.1f}ms over {args.runs} runs "
+        f"(min {min(totals_ms):.1f}ms, budget {args.budget_ms:.0f}ms)"
+    )
+    failed = False
+    if median_ms > args.budget_ms:
+        print("FAIL: import time is over budget")
+        failed = True
+    eager = eager_lazy_modules(last)
+    if eager:
+        print(f"FAIL: imported eagerly: {', '.join(eager)}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
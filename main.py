@@ -1,25 +1,94 @@
-from fastapi import FastAPI, Request
-from slowapi import _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
+import asyncio
+import logging
+import math
+import os
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from fastapi.staticfiles import StaticFiles
 from starlette.responses import JSONResponse
 
-from src.utils.limiter import limiter
+from src.conf.config import settings
+from src.database.db import read_sessionmanager, sessionmanager
+from src.database.redis import close_redis, init_redis
+from src.services.cache import user_cache
+from src.services.hashing import hashing_pool
+from src.services.upload_file import image_pool
+from src.services.worker_pool import PoolBusyError
+from src.utils.lifecycle import drain_on_signal, lifecycle, warm_up
+from src.utils.limiter import RateLimitExceeded, limiter
+from src.utils.metrics import MetricsMiddleware
+from src.utils.read_your_writes import ReadYourWritesMiddleware
+from src.utils.sql_profiler import SQLProfilerMiddleware
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warms the worker up, runs background tasks and shuts down gracefully.
+
+    Warmup runs in the background, so the worker is live at once while
+    `/ready` answers 503 until it has finished. SIGTERM turns `/ready` to
+    503 for `SHUTDOWN_DRAIN_DELAY` seconds before uvicorn stops accepting;
+    uvicorn's `--timeout-graceful-shutdown` bounds the wait for in-flight
+    requests that follows, before the pools and connections are closed.
+
+    Args:
+        app (FastAPI): The application instance.
+    """
+    # Created here rather than on import, so that importing the app stays
+    # cheap for tools and tests.
+    sessionmanager.init()
+    read_sessionmanager.init()
+    init_redis()
+    lifecycle.ready = lifecycle.draining = False
+    warmup = asyncio.create_task(warm_up(app))
+    invalidation_listener = asyncio.create_task(user_cache.listen())
+    restore_signal = drain_on_signal(settings.SHUTDOWN_DRAIN_DELAY)
+    yield
+    restore_signal()
+    for task in (warmup, invalidation_listener):
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    # Waiting for running jobs blocks, so it must not hold up the event loop.
+    await asyncio.gather(
+        asyncio.to_thread(hashing_pool.shutdown),
+        asyncio.to_thread(image_pool.shutdown),
+    )
+    await sessionmanager.dispose()
+    await read_sessionmanager.dispose()
+    await close_redis()
+
 
 app = FastAPI(
     title="Contacts API",
     version="1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-
 
 @app.exception_handler(RateLimitExceeded)
 async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
     return JSONResponse(
         status_code=429,
         content={"error": "Too Many Requests"},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+    )
+
+
+@app.exception_handler(PoolBusyError)
+async def pool_busy_handler(request: Request, exc: PoolBusyError):
+    logger.warning(f"Rejected {request.url.path}: the {exc.pool} pool is full")
+    return JSONResponse(
+        status_code=503,
+        content={"error": "Service is busy, try again shortly"},
+        headers={"Retry-After": "1"},
     )
 
 
@@ -35,15 +104,30 @@ app.add_middleware(
     allow_methods=["POST"],
     allow_headers=["*"],
 )
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(SQLProfilerMiddleware)
+app.add_middleware(MetricsMiddleware)
+
+from src.api import utils, contacts, auth, users, metrics, health
 
-from src.api import utils, contacts, auth, users
+app.include_router(metrics.router)
+app.include_router(health.router)
+rate_limited = [Depends(limiter)]
 
-app.include_router(utils.router, prefix="/api")
-app.include_router(contacts.router, prefix="/api")
-app.include_router(auth.router, prefix="/api")
-app.include_router(users.router, prefix="/api")
+app.include_router(utils.router, prefix="/api", dependencies=rate_limited)
+app.include_router(contacts.router, prefix="/api", dependencies=rate_limited)
+app.include_router(auth.router, prefix="/api", dependencies=rate_limited)
+app.include_router(users.router, prefix="/api", dependencies=rate_limited)
+
+if settings.AVATAR_STORAGE == "local":
+    os.makedirs(settings.AVATAR_LOCAL_DIR, exist_ok=True)
+    app.mount(
+        settings.AVATAR_BASE_URL,
+        StaticFiles(directory=settings.AVATAR_LOCAL_DIR),
+        name="avatars",
+    )
 
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(app, host="0.0.0.0", port=8000, timeout_graceful_shutdown=25)
@@ -0,0 +1,32 @@
+"""add contacts keyset index
+
+Revision ID: 3b9d51c2e7a4
+Revises: ad31f25bcd91
+Create Date: 2025-02-12 18:21:47.512903
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3b9d51c2e7a4"
+down_revision: Union[str, None] = "ad31f25bcd91"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_contacts_user_id_name_id",
+        "contacts",
+        ["user_id", "name", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_contacts_user_id_name_id", table_name="contacts")
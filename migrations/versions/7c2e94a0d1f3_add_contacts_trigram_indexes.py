@@ -0,0 +1,39 @@
+"""add contacts trigram indexes
+
+Revision ID: 7c2e94a0d1f3
+Revises: 3b9d51c2e7a4
+Create Date: 2025-02-13 11:04:12.730215
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c2e94a0d1f3"
+down_revision: Union[str, None] = "3b9d51c2e7a4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGRAM_COLUMNS = ("name", "email", "phone")
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in TRIGRAM_COLUMNS:
+        op.create_index(
+            f"ix_contacts_{column}_trgm",
+            "contacts",
+            [column],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    for column in TRIGRAM_COLUMNS:
+        op.drop_index(f"ix_contacts_{column}_trgm", table_name="contacts")
@@ -0,0 +1,59 @@
+"""add user scoped and case-insensitive user indexes
+
+Revision ID: 9d4f1a7c3e21
+Revises: b58f0e3a6c19
+Create Date: 2025-02-15 10:37:05.118264
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9d4f1a7c3e21"
+down_revision: Union[str, None] = "b58f0e3a6c19"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns, unique). `(user_id, name)` is already covered by
+# ix_contacts_user_id_name_id.
+INDEXES = (
+    ("ix_contacts_user_id_id", "contacts", ["user_id", "id"], False),
+    ("ix_users_email_lower", "users", [sa.text("lower(email)")], True),
+    ("ix_users_username_lower", "users", [sa.text("lower(username)")], True),
+)
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY keeps the tables writable while the indexes
+    # are built, but cannot run inside a transaction. A failed concurrent
+    # build leaves an invalid index behind, which is dropped before retrying.
+    with op.get_context().autocommit_block():
+        for name, table_name, columns, unique in INDEXES:
+            op.drop_index(
+                name,
+                table_name=table_name,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+            op.create_index(
+                name,
+                table_name,
+                columns,
+                unique=unique,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table_name, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table_name,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
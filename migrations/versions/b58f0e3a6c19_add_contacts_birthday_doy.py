@@ -0,0 +1,39 @@
+"""add contacts birthday_doy
+
+Revision ID: b58f0e3a6c19
+Revises: 7c2e94a0d1f3
+Create Date: 2025-02-14 09:47:31.208664
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b58f0e3a6c19"
+down_revision: Union[str, None] = "7c2e94a0d1f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("contacts", sa.Column("birthday_doy", sa.Integer(), nullable=True))
+    op.execute(
+        "UPDATE contacts SET birthday_doy = "
+        "EXTRACT(MONTH FROM birthday) * 100 + EXTRACT(DAY FROM birthday)"
+    )
+    op.alter_column("contacts", "birthday_doy", nullable=False)
+    op.create_index(
+        "ix_contacts_user_id_birthday_doy",
+        "contacts",
+        ["user_id", "birthday_doy"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_contacts_user_id_birthday_doy", table_name="contacts")
+    op.drop_column("contacts", "birthday_doy")
@@ -7,6 +7,7 @@ from fastapi import (
     BackgroundTasks,
     Request,
 )
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordRequestForm
 from src.schemas.users import (
@@ -23,6 +24,7 @@ from src.services.auth import (
     get_email_from_token,
 )
 from src.services.email import send_email, send_reset_password_email
+from src.services.gravatar import fill_gravatar
 from src.services.users import UserService
 from src.database.db import get_db
 
@@ -87,8 +89,16 @@ async def register_user(
             status_code=status.HTTP_409_CONFLICT,
             detail="User with this username already exists",
         )
-    user_data.password = Hash().get_password_hash(user_data.password)
-    new_user = await user_service.create_user(user_data)
+    user_data.password = await Hash().get_password_hash_async(user_data.password)
+    try:
+        new_user = await user_service.create_user(user_data)
+    except IntegrityError:
+        # A concurrent registration won the race for the unique indexes.
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="User with this email or username already exists",
+        )
+    background_tasks.add_task(fill_gravatar, new_user.email)
     background_tasks.add_task(
         send_email, new_user.email, new_user.username, request.base_url
     )
@@ -113,7 +123,9 @@ async def login_user(
     user_service = UserService(db)
     user = await user_service.get_user_by_email(form_data.username)
 
-    if not user or not Hash().verify_password(form_data.password, user.hashed_password):
+    if not user or not await Hash().verify_password_async(
+        form_data.password, user.hashed_password
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect login or password",
@@ -126,7 +138,9 @@ async def login_user(
             detail="Email confirm failed",
         )
 
-    access_token = await create_access_token(data={"sub": user.email}, role=user.role)
+    access_token = await create_access_token(
+        data={"sub": user.email, "uid": user.id}, role=user.role
+    )
     return {"access_token": access_token, "token_type": "bearer"}
 
 
@@ -242,7 +256,7 @@ async def confirm_reset_password(
             detail="Invalid token or user not found",
         )
 
-    new_hashed_password = Hash().get_password_hash(body.new_password)
+    new_hashed_password = await Hash().get_password_hash_async(body.new_password)
     await user_service.update_password(email, new_hashed_password)
 
     return {"message": "Password successfully reset"}
@@ -1,89 +1,320 @@
-from typing import Optional, Sequence
+import json
+from datetime import date
+from typing import AsyncIterator, Awaitable, Callable, List, Literal, Optional, Sequence
 
-from fastapi import APIRouter, HTTPException, Depends, Query
+import orjson
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.db import get_db
+from src.database.db import get_db, get_read_db, is_replica_session
 from src.database.models import User
-from src.services.auth import get_current_user
-from src.services.contacts import ContactService
-from src.schemas.contacts import ContactOut, ContactCreate, ContactUpdate
+from src.services.auth import get_current_principal
+from src.services.cache import contacts_cache
+from src.conf.config import settings
+from src.services.contacts import ContactService, parse_contact_rows
+from src.schemas.contacts import (
+    ContactOut,
+    ContactCreate,
+    ContactUpdate,
+    ContactPage,
+    ContactBulkImportResult,
+    ContactBulkUpdate,
+    ContactBulkResult,
+    ContactSelector,
+)
+from src.utils.pagination import InvalidCursorError
+from src.utils.serialization import dump_row, dump_rows, row_dicts
 
 router = APIRouter(prefix="/contacts", tags=["contacts"])
 
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
 
-@router.get("/", response_model=Sequence[ContactOut])
+IMPORT_FORMATS = {
+    "application/json": "json",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "text/csv": "csv",
+}
+
+
+def _etag_matches(
+    etag: str, if_none_match: Optional[str], exists: bool = False
+) -> bool:
+    """
+    Checks an If-None-Match header against an ETag using weak comparison.
+
+    `*` matches only when `exists` says the representation is known to exist.
+    """
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return (exists and "*" in candidates) or etag.removeprefix("W/") in {
+        tag.removeprefix("W/") for tag in candidates
+    }
+
+
+async def _cached_json(
+    request: Request,
+    user: User,
+    query: str,
+    build: Callable[[], Awaitable[bytes]],
+    db: AsyncSession,
+) -> Response:
+    """
+    Serves a contacts response from the per-user response cache.
+
+    Answers 304 when the client already has the current version; `*` is
+    only honoured once the body is found or built, so a missing contact or
+    a bad cursor still fails. The generation is read before `build` runs, so a body built from data that a
+    concurrent write has already replaced is stored under a dead generation.
+    A body built from a replica may predate the generation, so it is neither
+    stored nor tagged.
+
+    Args:
+        request (Request): The incoming request.
+        user (User): Current authenticated user.
+        query (str): The normalized query the response answers.
+        build (Callable): Produces the serialized body on a cache miss.
+        db (AsyncSession): The session `build` reads through.
+
+    Returns:
+        Response: The JSON body or an empty 304, with ETag headers.
+    """
+    generation = await contacts_cache.generation(user.id)
+    if generation is None:
+        return Response(await build(), media_type="application/json")
+
+    etag = contacts_cache.etag(user.id, generation, query)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if _etag_matches(etag, if_none_match):
+        return Response(status_code=304, headers=headers)
+
+    body = await contacts_cache.get(user.id, generation, query)
+    if body is None:
+        body = await build()
+        if is_replica_session(db):
+            return Response(body, media_type="application/json")
+        await contacts_cache.set(user.id, generation, query, body)
+    if _etag_matches(etag, if_none_match, exists=True):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+async def _read_import_upload(request: Request) -> tuple[bytes, str]:
+    """
+    Reads a bulk import body, either raw or as a multipart `file` field.
+
+    Args:
+        request (Request): The incoming request.
+
+    Returns:
+        tuple[bytes, str]: The uploaded content and its import format.
+
+    Raises:
+        HTTPException: If the content type is not supported.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type == "multipart/form-data":
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Missing file field")
+        extension = (upload.filename or "").rsplit(".", 1)[-1].lower()
+        import_format = {"jsonl": "ndjson"}.get(extension, extension)
+        if import_format not in IMPORT_FORMATS.values():
+            import_format = IMPORT_FORMATS.get(upload.content_type)
+        data = await upload.read()
+    else:
+        import_format = IMPORT_FORMATS.get(content_type)
+        data = await request.body()
+
+    if import_format is None:
+        raise HTTPException(
+            status_code=415, detail="Upload JSON, NDJSON or CSV contacts"
+        )
+    return data, import_format
+
+
+@router.get("/", response_model=ContactPage)
 async def read_contacts(
+    request: Request,
     name: Optional[str] = Query(None, description="Search by contact name"),
     email: Optional[str] = Query(None, description="Search by contact email"),
-    db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    limit: int = Query(50, ge=1, le=500, description="Maximum contacts per page"),
+    cursor: Optional[str] = Query(None, description="Cursor of the next page"),
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(get_current_principal),
 ):
     """
-    Retrieve a list of contacts with optional filtering by name and email.
+    Retrieve a page of contacts with optional filtering by name and email.
+
+    Responses are cached per user and carry an ETag; a matching
+    If-None-Match yields 304 Not Modified.
 
     Args:
+        request (Request): The incoming request.
         name (Optional[str]): Contact name to filter results.
         email (Optional[str]): Contact email to filter results.
-        db (AsyncSession): Database session dependency.
+        limit (int): Maximum number of contacts on the page.
+        cursor (Optional[str]): The `next_cursor` value from the previous page.
+        db (AsyncSession): Read-only database session dependency.
+        user (User): Current authenticated user.
+
+    Returns:
+        ContactPage: A page of contacts matching the filter criteria.
+    """
+    contact_service = ContactService(db)
+
+    async def build() -> bytes:
+        try:
+            page = await contact_service.get_contacts(
+                name=name, email=email, user=user, limit=limit, cursor=cursor
+            )
+        except InvalidCursorError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        return orjson.dumps({**page, "items": row_dicts(ContactOut, page["items"])})
+
+    query = json.dumps(["list", name, email, limit, cursor])
+    return await _cached_json(request, user, query, build, db)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_contacts(
+    export_format: Literal["ndjson", "csv"] = Query(
+        "ndjson", alias="format", description="Export format"
+    ),
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(get_current_principal),
+):
+    """
+    Stream all contacts of the authenticated user as NDJSON or CSV.
+
+    Args:
+        export_format (str): Either "ndjson" or "csv".
+        db (AsyncSession): Read-only database session dependency.
+        user (User): Current authenticated user.
+
+    Returns:
+        StreamingResponse: The export, streamed as rows are read from the database.
+    """
+    contact_service = ContactService(db)
+
+    async def body() -> AsyncIterator[bytes]:
+        # The dependency has already released the session by the time the
+        # body is streamed, so the cursor opened here must be closed here.
+        try:
+            async for chunk in contact_service.export_contacts(user, export_format):
+                yield chunk
+        finally:
+            await db.close()
+
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="contacts.{export_format}"'
+        },
+    )
+
+
+@router.get("/search", response_model=Sequence[ContactOut])
+async def search_contacts(
+    q: str = Query(..., min_length=1, description="Name, email or phone fragment"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results"),
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(get_current_principal),
+):
+    """
+    Search contacts by name, email or phone, best matches first.
+
+    Args:
+        q (str): The search term.
+        limit (int): Maximum number of results.
+        db (AsyncSession): Read-only database session dependency.
         user (User): Current authenticated user.
 
     Returns:
-        Sequence[ContactOut]: A list of contacts matching the filter criteria.
+        Sequence[ContactOut]: Matching contacts ordered by relevance.
     """
     contact_service = ContactService(db)
-    contacts = await contact_service.get_contacts(name=name, email=email, user=user)
-    return contacts
+    contacts = await contact_service.search_contacts(user=user, query=q, limit=limit)
+    return Response(dump_rows(ContactOut, contacts), media_type="application/json")
 
 
 @router.get("/upcoming_birthdays", response_model=Sequence[ContactOut])
 async def get_upcoming_birthdays(
-    db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    request: Request,
+    days: int = Query(7, ge=0, le=365, description="Length of the window in days"),
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(get_current_principal),
 ):
     """
-    Retrieve contacts with upcoming birthdays within the next 7 days.
+    Retrieve contacts with upcoming birthdays within the next `days` days.
+
+    Responses are cached per user and day and carry an ETag.
 
     Args:
-        db (AsyncSession): Database session dependency.
+        request (Request): The incoming request.
+        days (int): Length of the window in days, 7 by default.
+        db (AsyncSession): Read-only database session dependency.
         user (User): Current authenticated user.
 
     Returns:
         Sequence[ContactOut]: A list of contacts with upcoming birthdays.
     """
     contact_service = ContactService(db)
-    return await contact_service.get_upcoming_birthdays(user=user)
+
+    async def build() -> bytes:
+        contacts = await contact_service.get_upcoming_birthdays(user=user, days=days)
+        return dump_rows(ContactOut, contacts)
+
+    query = json.dumps(["birthdays", date.today().isoformat(), days])
+    return await _cached_json(request, user, query, build, db)
 
 
 @router.get("/{contact_id}", response_model=ContactOut)
 async def read_contact(
     contact_id: int,
-    db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(get_current_principal),
 ):
     """
     Retrieve a single contact by its ID.
 
+    Responses are cached per user and carry an ETag.
+
     Args:
         contact_id (int): Unique identifier of the contact.
-        db (AsyncSession): Database session dependency.
+        request (Request): The incoming request.
+        db (AsyncSession): Read-only database session dependency.
         user (User): Current authenticated user.
 
     Returns:
         ContactOut: The requested contact if found.
     """
     contact_service = ContactService(db)
-    contact = await contact_service.get_contact(contact_id=contact_id, user=user)
-    if not contact:
-        raise HTTPException(status_code=404, detail="Contact not found")
-    return contact
+
+    async def build() -> bytes:
+        contact = await contact_service.get_contact(contact_id=contact_id, user=user)
+        if not contact:
+            raise HTTPException(status_code=404, detail="Contact not found")
+        return dump_row(ContactOut, contact)
+
+    query = json.dumps(["contact", contact_id])
+    return await _cached_json(request, user, query, build, db)
 
 
 @router.post("/", response_model=ContactOut, status_code=201)
 async def create_contact(
     contact_data: ContactCreate,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: User = Depends(get_current_principal),
 ):
     """
     Create a new contact for the authenticated user.
@@ -101,12 +332,100 @@ async def create_contact(
     return contact
 
 
+@router.post("/bulk", response_model=ContactBulkImportResult)
+async def import_contacts(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_principal),
+):
+    """
+    Import many contacts at once from a JSON array, NDJSON or CSV.
+
+    The body can be sent raw with a matching content type, or as a multipart
+    upload in the `file` field. Invalid rows are skipped and reported.
+
+    Args:
+        request (Request): The request carrying the upload.
+        db (AsyncSession): Database session dependency.
+        user (User): Current authenticated user.
+
+    Returns:
+        ContactBulkImportResult: Created IDs, per-row errors and throughput.
+    """
+    data, import_format = await _read_import_upload(request)
+    try:
+        rows = parse_contact_rows(data, import_format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Malformed upload: {e}")
+    if len(rows) > settings.BULK_IMPORT_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.BULK_IMPORT_MAX_ROWS} contacts per import",
+        )
+
+    contact_service = ContactService(db)
+    return await contact_service.import_contacts(rows=rows, user=user)
+
+
+@router.patch("/bulk", response_model=ContactBulkResult)
+async def bulk_update_contacts(
+    body: ContactBulkUpdate,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_principal),
+):
+    """
+    Apply the same changes to many contacts selected by IDs and/or filters.
+
+    Args:
+        body (ContactBulkUpdate): The selection and the changes to apply.
+        db (AsyncSession): Database session dependency.
+        user (User): Current authenticated user.
+
+    Returns:
+        ContactBulkResult: The number and IDs of updated contacts.
+    """
+    if body.is_empty():
+        raise HTTPException(status_code=400, detail="Select contacts by ids or filter")
+    if not body.changes.model_fields_set:
+        raise HTTPException(status_code=400, detail="No changes given")
+    contact_service = ContactService(db)
+    return await contact_service.bulk_update_contacts(selector=body, user=user)
+
+
+@router.delete("/bulk", response_model=ContactBulkResult)
+async def bulk_delete_contacts(
+    ids: Optional[List[int]] = Query(None, description="IDs of contacts to delete"),
+    name: Optional[str] = Query(None, description="Delete contacts matching name"),
+    email: Optional[str] = Query(None, description="Delete contacts matching email"),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_principal),
+):
+    """
+    Delete many contacts selected by IDs and/or filters.
+
+    Args:
+        ids (Optional[List[int]]): IDs of the contacts to delete.
+        name (Optional[str]): Delete contacts whose name contains this value.
+        email (Optional[str]): Delete contacts whose email contains this value.
+        db (AsyncSession): Database session dependency.
+        user (User): Current authenticated user.
+
+    Returns:
+        ContactBulkResult: The number and IDs of deleted contacts.
+    """
+    selector = ContactSelector(ids=ids, name=name, email=email)
+    if selector.is_empty():
+        raise HTTPException(status_code=400, detail="Select contacts by ids or filter")
+    contact_service = ContactService(db)
+    return await contact_service.bulk_delete_contacts(selector=selector, user=user)
+
+
 @router.put("/{contact_id}", response_model=ContactOut)
 async def update_contact(
     contact_id: int,
     contact_update: ContactUpdate,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: User = Depends(get_current_principal),
 ):
     """
     Update an existing contact.
@@ -133,7 +452,7 @@ async def update_contact(
 async def delete_contact(
     contact_id: int,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: User = Depends(get_current_principal),
 ):
     """
     Delete a contact by its ID.
@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
+
+from src.utils.lifecycle import lifecycle
+
+router = APIRouter(tags=["health"])
+
+
+@router.get("/ready")
+async def ready():
+    """
+    Report whether this worker should receive traffic.
+
+    The worker is not ready while it warms up after starting, nor while it
+    drains before shutting down.
+
+    Returns:
+        ORJSONResponse: 200 when ready, otherwise 503, with the worker's status.
+    """
+    status_code = 200 if lifecycle.status == "ready" else 503
+    return ORJSONResponse({"status": lifecycle.status}, status_code=status_code)
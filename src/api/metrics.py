@@ -0,0 +1,130 @@
+import logging
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from redis.exceptions import RedisError
+
+from src.conf.config import settings
+from src.database.db import read_sessionmanager, sessionmanager
+from src.services.email_queue import email_queue
+from src.services.hashing import hashing_pool
+from src.services.upload_file import image_pool
+from src.utils.metrics import CONTENT_TYPE, EMAIL_QUEUE_DEPTH, Gauge, registry
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["metrics"])
+
+bearer = HTTPBearer(auto_error=False)
+
+
+def _pool_connections():
+    managers = {"primary": sessionmanager}
+    if read_sessionmanager is not sessionmanager:
+        managers["replica"] = read_sessionmanager
+
+    values = {}
+    for engine, manager in managers.items():
+        stats = manager.pool_stats()
+        for state in ("checked_out", "checked_in", "overflow"):
+            if state in stats:
+                values[(engine, state)] = stats[state]
+    return values
+
+
+def _pool_wait_seconds():
+    stats = sessionmanager.pool_stats()
+    return {(): stats.get("wait_seconds_total", 0)}
+
+
+def _pool_jobs(pool):
+    def collect():
+        stats = pool.stats()
+        return {
+            (state,): stats[state] for state in ("pending", "completed", "rejected")
+        }
+
+    return collect
+
+
+registry.register(
+    Gauge(
+        "db_pool_connections",
+        "Database pool connections by engine and state.",
+        ("engine", "state"),
+        collect=_pool_connections,
+    )
+)
+registry.register(
+    Gauge(
+        "db_pool_checkout_wait_seconds",
+        "Total time requests waited for a connection from the primary pool.",
+        collect=_pool_wait_seconds,
+    )
+)
+registry.register(
+    Gauge(
+        "hashing_pool_jobs",
+        "Password hashing jobs by state; completed and rejected are totals.",
+        ("state",),
+        collect=_pool_jobs(hashing_pool),
+    )
+)
+registry.register(
+    Gauge(
+        "image_pool_jobs",
+        "Avatar resize and upload jobs by state; completed and rejected are totals.",
+        ("state",),
+        collect=_pool_jobs(image_pool),
+    )
+)
+
+
+def require_metrics_token(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer),
+) -> None:
+    """
+    Admits only scrapers that send the configured `METRICS_TOKEN`.
+
+    The metrics describe pool and queue internals, so they are no more
+    public than `/api/pool_stats`.
+
+    Args:
+        credentials (Optional[HTTPAuthorizationCredentials]): The bearer token sent.
+
+    Raises:
+        HTTPException: 404 if no token is configured, 401 if it does not match.
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if credentials is None or not secrets.compare_digest(
+        credentials.credentials.encode(), settings.METRICS_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@router.get(
+    "/metrics",
+    include_in_schema=False,
+    dependencies=[Depends(require_metrics_token)],
+)
+async def metrics():
+    """
+    Expose this worker's metrics in the Prometheus text format.
+
+    Requires `Authorization: Bearer <METRICS_TOKEN>`.
+
+    Returns:
+        Response: The scrape body.
+    """
+    try:
+        EMAIL_QUEUE_DEPTH.set(await email_queue.depth())
+    except (RedisError, OSError) as e:
+        logger.warning(f"Failed to read the email queue depth: {e}")
+    return Response(registry.render(), media_type=CONTENT_TYPE)
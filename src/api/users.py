@@ -1,19 +1,42 @@
-from fastapi import APIRouter, Depends, Request, UploadFile, File, HTTPException
+import logging
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    Request,
+    UploadFile,
+    File,
+    HTTPException,
+    Response,
+)
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.conf.config import settings
-from src.database.db import get_db
-from src.schemas.users import UserSchema
+from src.database.db import get_db, sessionmanager
+from src.schemas.users import AvatarJobSchema, UserSchema
 from src.services.auth import get_current_user, is_admin
-from src.services.upload_file import UploadFileService
+from src.services.upload_file import (
+    SNIFF_BYTES,
+    ImageTooLargeError,
+    InvalidImageError,
+    UploadFileService,
+    avatar_jobs,
+    image_pool,
+    sniff_image_type,
+)
 from src.services.users import UserService
-from src.utils.limiter import limiter
+from src.utils.serialization import dump_json
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+_READ_CHUNK_SIZE = 64 * 1024
+
 
 @router.get("/me", response_model=UserSchema)
-@limiter.limit("5/minute")
 async def me(request: Request, user: UserSchema = Depends(get_current_user)):
     """
     Retrieve the details of the currently authenticated user.
@@ -25,11 +48,74 @@ async def me(request: Request, user: UserSchema = Depends(get_current_user)):
     Returns:
         UserSchema: The authenticated user's details.
     """
-    return user
+    return Response(dump_json(UserSchema, user), media_type="application/json")
+
+
+async def _read_avatar(file: UploadFile) -> bytes:
+    """
+    Reads an avatar upload, checking its type and size as it goes.
+
+    Args:
+        file (UploadFile): The uploaded file.
+
+    Returns:
+        bytes: The file's content.
+
+    Raises:
+        HTTPException: 415 if the file is not an image, 413 if it is too big.
+    """
+    head = await file.read(SNIFF_BYTES)
+    if sniff_image_type(head) is None:
+        raise HTTPException(
+            status_code=415, detail="Avatar must be a PNG, JPEG, GIF or WebP image"
+        )
+
+    chunks = [head]
+    size = len(head)
+    while chunk := await file.read(_READ_CHUNK_SIZE):
+        size += len(chunk)
+        if size > settings.AVATAR_MAX_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Avatar must be at most {settings.AVATAR_MAX_BYTES} bytes",
+            )
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def _process_avatar_job(
+    job_id: str, service: UploadFileService, data: bytes, user: UserSchema
+):
+    """
+    Resizes and stores an avatar after the upload has been answered.
+
+    Args:
+        job_id (str): The job ID.
+        service (UploadFileService): The upload service.
+        data (bytes): The uploaded image.
+        user (UserSchema): The user whose avatar is updated.
+    """
+    try:
+        avatar_url = await image_pool.run(service.upload_file, data, user.id)
+        async with sessionmanager.session() as db:
+            await UserService(db).update_avatar_url(user.email, avatar_url)
+    except InvalidImageError as e:
+        await avatar_jobs.finish(job_id, user.id, error=str(e))
+    except Exception as e:
+        logger.exception(f"Avatar job {job_id} failed: {e}")
+        await avatar_jobs.finish(job_id, user.id, error="Avatar upload failed")
+    else:
+        await avatar_jobs.finish(job_id, user.id, avatar=avatar_url)
 
 
-@router.patch("/avatar", response_model=UserSchema)
+@router.patch(
+    "/avatar",
+    response_model=UserSchema,
+    responses={202: {"model": AvatarJobSchema}},
+)
 async def update_avatar_user(
+    request: Request,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(),
     user: UserSchema = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
@@ -37,26 +123,70 @@ async def update_avatar_user(
     """
     Update the avatar of the authenticated user.
 
+    The image is resized to a square avatar in a worker thread and then
+    stored. Uploads bigger than `AVATAR_ASYNC_THRESHOLD_BYTES` are processed
+    in the background: the response is 202 with a job whose status can be
+    polled at the URL in the Location header.
+
     Args:
+        request (Request): The request instance.
+        background_tasks (BackgroundTasks): Tasks run after the response.
         file (UploadFile): The uploaded avatar file.
         user (UserSchema): The currently authenticated user.
         db (AsyncSession): The database session dependency.
 
     Returns:
         UserSchema: The user with the updated avatar.
+
+    Raises:
+        HTTPException: 403 for non-admins, 413 if the image is too big, 415
+            if it is not an image.
     """
-    print(user.username)
-    print(user.email)
-    print(user.role)
-    print(is_admin(user))
     if not is_admin(user):
         raise HTTPException(status_code=403, detail="Only admins can update avatars")
 
-    avatar_url = UploadFileService(
-        settings.CLD_NAME, settings.CLD_API_KEY, settings.CLD_API_SECRET
-    ).upload_file(file, user.username)
+    data = await _read_avatar(file)
+    service = UploadFileService.from_settings()
+
+    if len(data) > settings.AVATAR_ASYNC_THRESHOLD_BYTES:
+        job_id = await avatar_jobs.create(user.id)
+        background_tasks.add_task(_process_avatar_job, job_id, service, data, user)
+        return JSONResponse(
+            status_code=202,
+            content=AvatarJobSchema(id=job_id, status="pending").model_dump(),
+            headers={"Location": str(request.url_for("get_avatar_job", job_id=job_id))},
+        )
+
+    try:
+        avatar_url = await image_pool.run(service.upload_file, data, user.id)
+    except ImageTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidImageError as e:
+        raise HTTPException(status_code=415, detail=str(e))
 
     user_service = UserService(db)
     user = await user_service.update_avatar_url(user.email, avatar_url)
 
     return user
+
+
+@router.get("/avatar/jobs/{job_id}", response_model=AvatarJobSchema)
+async def get_avatar_job(job_id: str, user: UserSchema = Depends(get_current_user)):
+    """
+    Retrieve the status of a background avatar upload.
+
+    Args:
+        job_id (str): The job ID returned by the upload.
+        user (UserSchema): The currently authenticated user.
+
+    Returns:
+        AvatarJobSchema: The job's status, with the avatar URL once done.
+
+    Raises:
+        HTTPException: 404 if the job does not exist, expired or belongs to
+            another user.
+    """
+    job = await avatar_jobs.get(job_id)
+    if job is None or job["user_id"] != user.id:
+        raise HTTPException(status_code=404, detail="Avatar job not found")
+    return job
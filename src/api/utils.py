@@ -2,7 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
-from src.database.db import get_db
+from src.database.db import get_db, sessionmanager
+from src.database.models import User
+from src.services.auth import get_current_principal, is_admin
 
 router = APIRouter(tags=["utils"])
 
@@ -35,3 +37,23 @@ async def healthchecker(db: AsyncSession = Depends(get_db)):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error connecting to the database",
         )
+
+
+@router.get("/pool_stats")
+async def pool_stats(user: User = Depends(get_current_principal)):
+    """
+    Report the state of this worker's database connection pool.
+
+    Args:
+        user (User): The authenticated caller, who must be an admin.
+
+    Returns:
+        dict: Pool size, checked-out and overflow connections, and how long
+        checkouts have waited for a connection.
+
+    Raises:
+        HTTPException: 403 for non-admins.
+    """
+    if not is_admin(user):
+        raise HTTPException(status_code=403, detail="Only admins can see pool stats")
+    return sessionmanager.pool_stats()
@@ -1,4 +1,5 @@
 import os
+from typing import Dict, Optional
 
 from dotenv import load_dotenv
 from pydantic import EmailStr
@@ -21,6 +22,39 @@ class Settings(BaseSettings):
     )
     """The database connection URL."""
 
+    READ_DATABASE_URL: Optional[str] = os.getenv("READ_DATABASE_URL")
+    """Connection URL of a read replica; read-only queries use the primary when unset."""
+
+    READ_YOUR_WRITES_SECONDS: float = 0
+    """Seconds after a client's write during which its reads go to the primary; 0 disables."""
+
+    DB_POOL_SIZE: int = 5
+    """Connections kept open in each worker's pool."""
+
+    DB_MAX_OVERFLOW: int = 10
+    """Extra connections a worker may open above `DB_POOL_SIZE` under load."""
+
+    DB_POOL_TIMEOUT: float = 30
+    """Seconds a request waits for a pooled connection before failing."""
+
+    DB_POOL_RECYCLE: int = 1800
+    """Seconds after which a pooled connection is replaced; -1 disables recycling."""
+
+    DB_POOL_PRE_PING: bool = True
+    """Whether to test a pooled connection with a ping before handing it out."""
+
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    """Prepared statements cached per asyncpg connection; use 0 behind PgBouncer."""
+
+    WARMUP_DB_CONNECTIONS: int = 5
+    """Pooled connections each worker opens on startup, before it reports ready; 0 disables."""
+
+    WARMUP_RETRY_SECONDS: float = 2
+    """Seconds between startup warmup attempts while the database is unreachable."""
+
+    SHUTDOWN_DRAIN_DELAY: float = 10
+    """Seconds a worker keeps serving with `/ready` failing after SIGTERM; 0 disables."""
+
     JWT_SECRET: str = os.getenv("JWT_SECRET", "YOUR_SECRET_KEY")
     """The secret key used for JWT authentication."""
 
@@ -39,6 +73,36 @@ class Settings(BaseSettings):
     CLD_API_SECRET: str = os.getenv("CLD_API_SECRET", "GREGFDGSDSFWEF")
     """Cloud storage API secret key."""
 
+    AVATAR_STORAGE: str = "cloudinary"
+    """Where avatars are stored: "cloudinary" or "local"."""
+
+    AVATAR_LOCAL_DIR: str = "media/avatars"
+    """Directory avatars are written to when `AVATAR_STORAGE` is "local"."""
+
+    AVATAR_BASE_URL: str = "/media/avatars"
+    """URL path the local avatar directory is served under."""
+
+    AVATAR_SIZE: int = 250
+    """Width and height, in pixels, of the square avatars generated from uploads."""
+
+    AVATAR_MAX_BYTES: int = 5 * 1024 * 1024
+    """Largest avatar upload accepted; bigger ones are rejected with 413."""
+
+    AVATAR_MAX_PIXELS: int = 40_000_000
+    """Largest image, in pixels, an avatar is generated from."""
+
+    AVATAR_ASYNC_THRESHOLD_BYTES: int = 1024 * 1024
+    """Uploads bigger than this are processed as background jobs and answered with 202."""
+
+    AVATAR_JOB_TTL: int = 3600
+    """Seconds the status of a background avatar upload can be polled."""
+
+    IMAGE_POOL_WORKERS: int = 2
+    """Number of threads resizing and uploading avatars."""
+
+    IMAGE_POOL_MAX_PENDING: int = 16
+    """Avatar jobs allowed to run or wait at once before new ones are rejected with 503."""
+
     MAIL_USERNAME: EmailStr = "example@meta.ua"
     """The username for the email server authentication."""
 
@@ -69,12 +133,94 @@ class Settings(BaseSettings):
     VALIDATE_CERTS: bool = True
     """Boolean flag indicating whether to validate SSL certificates."""
 
+    SMTP_POOL_SIZE: int = 4
+    """SMTP connections each email worker keeps open and reuses."""
+
+    SMTP_POOL_MAX_IDLE_SECONDS: float = 60
+    """Seconds an idle SMTP connection is reused before it is replaced."""
+
+    EMAIL_WORKER_CONCURRENCY: int = 4
+    """Emails an email worker sends at once."""
+
+    EMAIL_MAX_ATTEMPTS: int = 5
+    """Delivery attempts before an email is moved to the dead-letter list."""
+
+    EMAIL_RETRY_BASE_SECONDS: float = 30
+    """Delay before the first retry of a failed email; doubled on every attempt."""
+
+    EMAIL_RETRY_MAX_SECONDS: float = 3600
+    """Upper bound of the delay between retries of a failed email."""
+
+    EMAIL_WORKER_STALE_SECONDS: float = 60
+    """Seconds without a heartbeat after which an email worker's jobs are requeued."""
+
+    BULK_IMPORT_CHUNK_SIZE: int = 1000
+    """Number of contacts inserted by a single multi-row INSERT during bulk import."""
+
+    BULK_IMPORT_MAX_ROWS: int = 50000
+    """Maximum number of rows accepted by a single bulk import request."""
+
+    HASH_POOL_KIND: str = "thread"
+    """Executor used for bcrypt hashing: "thread" or "process"."""
+
+    HASH_POOL_WORKERS: int = 4
+    """Number of workers hashing and verifying passwords."""
+
+    HASH_POOL_MAX_PENDING: int = 64
+    """Hashing jobs allowed to run or wait at once before new ones are rejected with 503."""
+
     REDIS_HOST: str = "localhost"
     """Redis host connection URL."""
 
     REDIS_PORT: int = 6379
     """Redis port connection URL."""
 
+    USER_CACHE_LOCAL_SIZE: int = 10000
+    """Maximum number of authenticated users cached in each worker process."""
+
+    USER_CACHE_LOCAL_TTL: float = 60
+    """Seconds an authenticated user stays in the in-process cache."""
+
+    USER_CACHE_REDIS_TTL: int = 600
+    """Seconds an authenticated user stays in the Redis cache."""
+
+    CONTACTS_CACHE_TTL: int = 300
+    """Seconds a cached contact list, detail or birthday response is kept in Redis."""
+
+    GRAVATAR_CACHE_SIZE: int = 10000
+    """Maximum number of Gravatar URLs cached in each worker process."""
+
+    GRAVATAR_CACHE_TTL: float = 86400
+    """Seconds a resolved Gravatar URL stays cached."""
+
+    RATE_LIMIT_ENABLED: bool = True
+    """Whether `/api` requests are rate limited."""
+
+    RATE_LIMIT_DEFAULT: str = "120/minute"
+    """Requests each caller may make to routes without their own rate limit policy."""
+
+    RATE_LIMITS: Dict[str, str] = {
+        "/api/auth/login": "10/minute",
+        "/api/auth/register": "5/minute",
+        "/api/auth/request_email": "3/minute",
+        "/api/auth/reset-password": "3/minute",
+        "/api/auth/reset-password/confirm": "5/minute",
+        "/api/users/me": "5/minute",
+    }
+    """Rate limits by route path template; each listed route has its own bucket per caller."""
+
+    SQL_PROFILE: bool = False
+    """Whether to profile the SQL statements of every request."""
+
+    SQL_PROFILE_ALLOW_HEADER: bool = False
+    """Whether clients may profile a single request by sending an `X-SQL-Profile` header."""
+
+    SQL_PROFILE_REPEAT_THRESHOLD: int = 2
+    """Executions of the same statement in one request that are reported as a possible N+1."""
+
+    METRICS_TOKEN: Optional[str] = os.getenv("METRICS_TOKEN")
+    """Bearer token a scraper must send to read `/metrics`; unset disables the endpoint."""
+
 
 settings = Settings()
 """
@@ -1,13 +1,79 @@
+import asyncio
 import contextlib
+import time
 
-from sqlalchemy.exc import SQLAlchemyError
+from fastapi import Request
+from sqlalchemy import make_url, text
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
+    AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from src.conf.config import settings
+from src.utils.read_your_writes import reads_pinned_to_primary
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool that records how long checkouts wait for a connection.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+def engine_options(url: str) -> dict:
+    """
+    Builds `create_async_engine` keyword arguments from the pool settings.
+
+    Pool sizing only applies to server databases; SQLite keeps SQLAlchemy's
+    default pool for its URL.
+
+    Args:
+        url (str): The database connection URL.
+
+    Returns:
+        dict: Keyword arguments for `create_async_engine`.
+    """
+    parsed = make_url(url)
+    options = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+    if parsed.get_backend_name() != "sqlite":
+        options.update(
+            poolclass=TimedAsyncQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+    if parsed.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+    return options
 
 
 class DatabaseSessionManager:
@@ -18,17 +84,50 @@ class DatabaseSessionManager:
     in an asynchronous environment.
     """
 
-    def __init__(self, url: str):
+    def __init__(self, url: str, **engine_kwargs):
         """
         Initializes the database session manager.
 
+        The engine is not created here but by `init`, which the application
+        calls on startup, or on first use. Importing the module therefore
+        neither loads the database driver nor builds a pool.
+
         Args:
             url (str): The database connection URL.
+            **engine_kwargs: Extra arguments for `create_async_engine`.
         """
-        self._engine: AsyncEngine | None = create_async_engine(url)
-        self._session_maker: async_sessionmaker = async_sessionmaker(
-            autoflush=False, autocommit=False, bind=self._engine
-        )
+        self.url = url
+        self._engine_kwargs = engine_kwargs
+        self._engine: AsyncEngine | None = None
+        self._session_maker: async_sessionmaker | None = None
+
+    def init(self) -> AsyncEngine:
+        """
+        Creates the engine and the session factory, unless already created.
+
+        Returns:
+            AsyncEngine: The engine.
+        """
+        if self._engine is None:
+            self._engine = create_async_engine(self.url, **self._engine_kwargs)
+        if self._session_maker is None:
+            # Writes read their rows back with RETURNING, so objects stay
+            # loaded after commit instead of being refreshed with another
+            # SELECT.
+            self._session_maker = async_sessionmaker(
+                autoflush=False,
+                autocommit=False,
+                expire_on_commit=False,
+                bind=self._engine,
+            )
+        return self._engine
+
+    @property
+    def engine(self) -> AsyncEngine:
+        """
+        The engine, created on first access.
+        """
+        return self.init()
 
     @contextlib.asynccontextmanager
     async def session(self):
@@ -39,11 +138,10 @@ class DatabaseSessionManager:
             AsyncSession: The database session instance.
 
         Raises:
-            Exception: If the session manager is not properly initialized.
             SQLAlchemyError: If an error occurs during session operations.
         """
         if self._session_maker is None:
-            raise Exception("Database session is not initialized")
+            self.init()
         session = self._session_maker()
         try:
             yield session
@@ -53,8 +151,85 @@ class DatabaseSessionManager:
         finally:
             await session.close()
 
+    async def warmup(self, connections: int) -> None:
+        """
+        Opens pooled connections ahead of the first requests.
+
+        The connections are opened at the same time, so each one is a
+        separate pool connection, and the pool keeps them once they are
+        returned. Pools that do not keep several connections get one.
+
+        Args:
+            connections (int): Number of connections to open.
+        """
+        if connections <= 0:
+            return
+        pool = self.engine.pool
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            connections = min(connections, pool.size())
+        else:
+            connections = 1
+
+        async def ping():
+            async with self.engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        await asyncio.gather(*(ping() for _ in range(connections)))
+
+    async def dispose(self) -> None:
+        """
+        Closes every pooled connection and drops the engine.
+
+        A later `init` or session creates a new engine.
+        """
+        if self._engine is not None:
+            engine, self._engine = self._engine, None
+            self._session_maker = None
+            await engine.dispose()
+
+    def pool_stats(self) -> dict:
+        """
+        Describes the current state of the engine's connection pool.
+
+        Returns:
+            dict: Pool size and usage, plus checkout wait times when the pool
+            records them.
+        """
+        pool = self.engine.pool
+        stats = {"pool": type(pool).__name__}
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            stats.update(
+                size=pool.size(),
+                max_overflow=pool._max_overflow,
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=max(pool.overflow(), 0),
+                timeout=pool.timeout(),
+            )
+        if isinstance(pool, TimedAsyncQueuePool):
+            stats.update(
+                checkouts=pool.checkouts,
+                timeouts=pool.timeouts,
+                wait_seconds_total=round(pool.wait_seconds_total, 6),
+                wait_seconds_max=round(pool.wait_seconds_max, 6),
+            )
+        return stats
+
+
+sessionmanager = DatabaseSessionManager(
+    settings.DATABASE_URL, **engine_options(settings.DATABASE_URL)
+)
 
-sessionmanager = DatabaseSessionManager(settings.DATABASE_URL)
+read_sessionmanager = (
+    DatabaseSessionManager(
+        settings.READ_DATABASE_URL, **engine_options(settings.READ_DATABASE_URL)
+    )
+    if settings.READ_DATABASE_URL
+    else sessionmanager
+)
+"""
+Session manager for read-only queries; the primary when no replica is configured.
+"""
 
 
 async def get_db():
@@ -66,3 +241,40 @@ async def get_db():
     """
     async with sessionmanager.session() as session:
         yield session
+
+
+async def get_read_db(request: Request):
+    """
+    Dependency function for retrieving a session for read-only queries.
+
+    Uses the read replica, unless the client is inside its read-your-writes
+    window after a recent write.
+
+    Args:
+        request (Request): The incoming request.
+
+    Yields:
+        AsyncSession: The database session instance.
+    """
+    manager = (
+        sessionmanager if reads_pinned_to_primary(request) else read_sessionmanager
+    )
+    async with manager.session() as session:
+        session.info["replica"] = manager is not sessionmanager
+        yield session
+
+
+def is_replica_session(session: AsyncSession) -> bool:
+    """
+    Tells whether a session reads from the replica, which may lag behind.
+
+    Rows read this way must not refill shared caches: right after a write
+    has invalidated them, a lagging replica would put the old row back.
+
+    Args:
+        session (AsyncSession): A session from `get_read_db`.
+
+    Returns:
+        bool: True if the session is bound to the replica.
+    """
+    return session.info.get("replica") is True
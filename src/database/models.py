@@ -1,4 +1,6 @@
 import enum
+from datetime import date
+
 from sqlalchemy import (
     Column,
     Integer,
@@ -10,13 +12,29 @@ from sqlalchemy import (
     ForeignKey,
     Boolean,
     Enum,
+    Index,
+    DDL,
+    event,
 )
 
-from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy.orm import declarative_base, relationship, validates
 
 Base = declarative_base()
 
 
+def birthday_doy(value: date) -> int:
+    """
+    Encodes the month and day of a date as a sortable integer (`month * 100 + day`).
+
+    Args:
+        value (date): The date to encode.
+
+    Returns:
+        int: The encoded day of year, e.g. 1231 for December 31.
+    """
+    return value.month * 100 + value.day
+
+
 class Contact(Base):
     """
     Represents a contact entity in the database.
@@ -27,6 +45,7 @@ class Contact(Base):
         email (str): The email address of the contact.
         phone (str): The phone number of the contact.
         birthday (date): The birth date of the contact.
+        birthday_doy (int): The birthday encoded as `month * 100 + day`, kept in sync with `birthday`.
         additional_data (str, optional): Any additional information related to the contact.
         user_id (int): The ID of the user who owns the contact.
         user (User): Relationship reference to the User entity.
@@ -39,6 +58,7 @@ class Contact(Base):
     email = Column(String, nullable=False, index=True)
     phone = Column(String, nullable=False)
     birthday = Column(Date, nullable=False)
+    birthday_doy = Column(Integer, nullable=False)
     additional_data = Column(Text, nullable=True)
 
     user_id = Column(
@@ -46,6 +66,61 @@ class Contact(Base):
     )
     user = relationship("User", backref="users")
 
+    __table_args__ = (
+        Index("ix_contacts_user_id_id", "user_id", "id"),
+        Index("ix_contacts_user_id_name_id", "user_id", "name", "id"),
+        Index("ix_contacts_user_id_birthday_doy", "user_id", "birthday_doy"),
+    )
+
+    @validates("birthday")
+    def _sync_birthday_doy(self, key, value):
+        self.birthday_doy = birthday_doy(value) if value is not None else None
+        return value
+
+
+# SQLite has no pg_trgm, so an external-content FTS5 table with the trigram
+# tokenizer plays the same role there and is kept in sync by triggers.
+CONTACTS_FTS_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5(
+        name, email, phone,
+        content='contacts', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS contacts_fts_ai AFTER INSERT ON contacts BEGIN
+        INSERT INTO contacts_fts(rowid, name, email, phone)
+        VALUES (new.id, new.name, new.email, new.phone);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS contacts_fts_ad AFTER DELETE ON contacts BEGIN
+        INSERT INTO contacts_fts(contacts_fts, rowid, name, email, phone)
+        VALUES ('delete', old.id, old.name, old.email, old.phone);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS contacts_fts_au AFTER UPDATE ON contacts BEGIN
+        INSERT INTO contacts_fts(contacts_fts, rowid, name, email, phone)
+        VALUES ('delete', old.id, old.name, old.email, old.phone);
+        INSERT INTO contacts_fts(rowid, name, email, phone)
+        VALUES (new.id, new.name, new.email, new.phone);
+    END
+    """,
+)
+
+for statement in CONTACTS_FTS_DDL:
+    event.listen(
+        Contact.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="sqlite"),
+    )
+event.listen(
+    Contact.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS contacts_fts").execute_if(dialect="sqlite"),
+)
+
 
 class UserRole(str, enum.Enum):
     user = "user"
@@ -77,3 +152,10 @@ class User(Base):
     avatar = Column(String(255), nullable=True)
     confirmed = Column(Boolean, default=False)
     role = Column(Enum(UserRole), default=UserRole.user)
+
+    # Emails and usernames are unique regardless of case, and looked up by
+    # their lowercase form.
+    __table_args__ = (
+        Index("ix_users_email_lower", func.lower(email), unique=True),
+        Index("ix_users_username_lower", func.lower(username), unique=True),
+    )
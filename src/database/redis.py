@@ -1,11 +1,49 @@
+from typing import Optional
+
 import redis.asyncio as redis
 from src.conf.config import settings
+from src.utils.metrics import observe_redis
+
+
+class InstrumentedRedis(redis.Redis):
+    """
+    Redis client that records the latency of every command it sends.
+    """
+
+    async def execute_command(self, *args, **options):
+        with observe_redis(str(args[0])):
+            return await super().execute_command(*args, **options)
+
 
+_redis_client: Optional[InstrumentedRedis] = None
 
-redis_client = redis.Redis(
-    host=settings.REDIS_HOST, port=settings.REDIS_PORT, decode_responses=True
-)
+
+def init_redis() -> InstrumentedRedis:
+    """
+    Creates the shared Redis client, unless already created.
+
+    Called on application startup; `get_redis` falls back to it on first use.
+
+    Returns:
+        InstrumentedRedis: The shared client.
+    """
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = InstrumentedRedis(
+            host=settings.REDIS_HOST, port=settings.REDIS_PORT, decode_responses=True
+        )
+    return _redis_client
 
 
 async def get_redis():
-    return redis_client
+    return init_redis()
+
+
+async def close_redis() -> None:
+    """
+    Closes the shared Redis client and its connections, if it was created.
+    """
+    global _redis_client
+    if _redis_client is not None:
+        client, _redis_client = _redis_client, None
+        await client.aclose()
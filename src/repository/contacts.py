@@ -1,10 +1,29 @@
-from typing import Optional, Sequence
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import (
+    delete,
+    insert,
+    update,
+    select,
+    tuple_,
+    func,
+    or_,
+    case,
+    column,
+    table,
+    literal_column,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.models import Contact, User
+from src.database.models import Contact, User, birthday_doy
 from src.schemas.contacts import ContactCreate, ContactUpdate
+from src.services.cache import contacts_cache
+
+contacts_fts = table("contacts_fts", column("rowid"))
+"""Lightweight handle on the SQLite FTS5 index created alongside the contacts table."""
+
+FTS_TRIGRAM_MIN_LENGTH = 3
+"""The FTS5 trigram tokenizer cannot match terms shorter than this."""
 
 
 class ContactRepository:
@@ -23,29 +42,179 @@ class ContactRepository:
         """
         self.db = session
 
+    @staticmethod
+    def _filter(
+        stmt,
+        user: User,
+        name: Optional[str] = None,
+        email: Optional[str] = None,
+        ids: Optional[Sequence[int]] = None,
+    ):
+        """
+        Restricts a statement to a user's contacts matching the given filters.
+
+        Args:
+            stmt: A SELECT, UPDATE or DELETE statement on contacts.
+            user (User): The owner of the contacts.
+            name (Optional[str]): A name filter for searching contacts.
+            email (Optional[str]): An email filter for searching contacts.
+            ids (Optional[Sequence[int]]): Restrict to these contact IDs.
+
+        Returns:
+            The filtered statement.
+        """
+        stmt = stmt.where(Contact.user_id == user.id)
+        if ids is not None:
+            stmt = stmt.where(Contact.id.in_(ids))
+        if name:
+            stmt = stmt.where(Contact.name.ilike(f"%{name}%"))
+        if email:
+            stmt = stmt.where(Contact.email.ilike(f"%{email}%"))
+        return stmt
+
     async def get_all(
         self,
         user: User,
         name: Optional[str] = None,
         email: Optional[str] = None,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[str, int]] = None,
     ) -> Sequence[Contact]:
         """
         Retrieves a list of contacts for a user with optional filtering.
 
+        Contacts are ordered by `(name, id)`, so a page can be continued from
+        the last row of the previous one with a keyset condition instead of OFFSET.
+
         Args:
             user (User): The owner of the contacts.
             name (Optional[str]): A name filter for searching contacts.
             email (Optional[str]): An email filter for searching contacts.
+            limit (Optional[int]): Maximum number of contacts to return.
+            after (Optional[Tuple[str, int]]): The `(name, id)` of the last contact already seen.
 
         Returns:
             Sequence[Contact]: A list of contacts that match the criteria.
         """
-        query = select(Contact).filter(Contact.user_id == user.id)
+        query = self._filter(select(Contact), user=user, name=name, email=email)
+        if after is not None:
+            query = query.filter(tuple_(Contact.name, Contact.id) > tuple_(*after))
 
-        if name:
-            query = query.filter(Contact.name.ilike(f"%{name}%"))
-        if email:
-            query = query.filter(Contact.email.ilike(f"%{email}%"))
+        query = query.order_by(Contact.name, Contact.id)
+        if limit is not None:
+            query = query.limit(limit)
+
+        result = await self.db.execute(query)
+        return result.scalars().all()
+
+    async def stream_all(
+        self, user: User, batch_size: int = 1000
+    ) -> AsyncIterator[Contact]:
+        """
+        Streams all contacts of a user without loading them into memory at once.
+
+        Rows are fetched through a server-side cursor in batches of `batch_size`.
+
+        Args:
+            user (User): The owner of the contacts.
+            batch_size (int): Number of rows fetched from the cursor at a time.
+
+        Yields:
+            Contact: The user's contacts ordered by ID.
+        """
+        query = (
+            select(Contact)
+            .filter(Contact.user_id == user.id)
+            .order_by(Contact.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.db.stream_scalars(query)
+        async for contact in result:
+            yield contact
+
+    async def search(
+        self, user: User, query: str, limit: int = 20
+    ) -> Sequence[Contact]:
+        """
+        Searches a user's contacts by name, email or phone, best matches first.
+
+        On PostgreSQL the substring match is served by the pg_trgm GIN indexes
+        and ranked by trigram word similarity. On SQLite the FTS5 trigram table
+        is used and ranked by bm25.
+
+        Args:
+            user (User): The owner of the contacts.
+            query (str): The search term.
+            limit (int): Maximum number of contacts to return.
+
+        Returns:
+            Sequence[Contact]: Matching contacts ordered by relevance.
+        """
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "sqlite" and len(query) >= FTS_TRIGRAM_MIN_LENGTH:
+            phrase = '"' + query.replace('"', '""') + '"'
+            stmt = (
+                select(Contact)
+                .join(contacts_fts, contacts_fts.c.rowid == Contact.id)
+                .where(Contact.user_id == user.id)
+                .where(literal_column("contacts_fts").op("MATCH")(phrase))
+                .order_by(func.bm25(literal_column("contacts_fts")), Contact.id)
+            )
+        else:
+            pattern = f"%{query}%"
+            stmt = select(Contact).where(
+                Contact.user_id == user.id,
+                or_(
+                    Contact.name.ilike(pattern),
+                    Contact.email.ilike(pattern),
+                    Contact.phone.ilike(pattern),
+                ),
+            )
+            if dialect == "postgresql":
+                rank = func.greatest(
+                    func.word_similarity(query, Contact.name),
+                    func.word_similarity(query, Contact.email),
+                    func.word_similarity(query, Contact.phone),
+                )
+                stmt = stmt.order_by(rank.desc(), Contact.id)
+            else:
+                stmt = stmt.order_by(Contact.name, Contact.id)
+
+        result = await self.db.execute(stmt.limit(limit))
+        return result.scalars().all()
+
+    async def get_by_birthday_window(
+        self, user: User, start_doy: Optional[int], end_doy: Optional[int]
+    ) -> Sequence[Contact]:
+        """
+        Retrieves contacts whose birthday falls between two `month * 100 + day` values.
+
+        A window whose end is smaller than its start wraps over the new year.
+        Results are ordered by the next occurrence of the birthday.
+
+        Args:
+            user (User): The owner of the contacts.
+            start_doy (Optional[int]): First day of the window, or None for the whole year.
+            end_doy (Optional[int]): Last day of the window, inclusive.
+
+        Returns:
+            Sequence[Contact]: Contacts with a birthday inside the window.
+        """
+        query = select(Contact).filter(Contact.user_id == user.id)
+        if start_doy is None:
+            query = query.order_by(Contact.birthday_doy, Contact.id)
+        else:
+            if start_doy <= end_doy:
+                query = query.filter(Contact.birthday_doy.between(start_doy, end_doy))
+            else:
+                query = query.filter(
+                    or_(
+                        Contact.birthday_doy >= start_doy,
+                        Contact.birthday_doy <= end_doy,
+                    )
+                )
+            wrapped = case((Contact.birthday_doy < start_doy, 1), else_=0)
+            query = query.order_by(wrapped, Contact.birthday_doy, Contact.id)
 
         result = await self.db.execute(query)
         return result.scalars().all()
@@ -61,7 +230,9 @@ class ContactRepository:
         Returns:
             Optional[Contact]: The contact if found, otherwise None.
         """
-        query = select(Contact).filter_by(id=contact_id, user=user)
+        query = select(Contact).filter(
+            Contact.id == contact_id, Contact.user_id == user.id
+        )
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
 
@@ -76,19 +247,123 @@ class ContactRepository:
         Returns:
             Contact: The newly created contact.
         """
-        contact = Contact(**body.model_dump())
-        contact.user = user
+        contact = Contact(**body.model_dump(exclude={"user_id"}), user_id=user.id)
 
         self.db.add(contact)
         await self.db.commit()
-        await self.db.refresh(contact)
+        await contacts_cache.bump(user.id)
 
         return contact
 
+    async def bulk_create(
+        self, bodies: Sequence[ContactCreate], user: User, chunk_size: int = 1000
+    ) -> List[int]:
+        """
+        Inserts many contacts with one multi-row INSERT per chunk and a single commit.
+
+        Args:
+            bodies (Sequence[ContactCreate]): The validated contacts to insert.
+            user (User): The owner of the contacts.
+            chunk_size (int): Number of rows per INSERT statement.
+
+        Returns:
+            List[int]: IDs of the inserted contacts.
+        """
+        ids = []
+        for start in range(0, len(bodies), chunk_size):
+            rows = [
+                {
+                    **body.model_dump(exclude={"user_id"}),
+                    "user_id": user.id,
+                    "birthday_doy": birthday_doy(body.birthday),
+                }
+                for body in bodies[start : start + chunk_size]
+            ]
+            result = await self.db.execute(
+                insert(Contact).values(rows).returning(Contact.id)
+            )
+            ids.extend(result.scalars().all())
+
+        await self.db.commit()
+        if ids:
+            await contacts_cache.bump(user.id)
+        return ids
+
+    async def bulk_update(
+        self,
+        body: ContactUpdate,
+        user: User,
+        ids: Optional[Sequence[int]] = None,
+        name: Optional[str] = None,
+        email: Optional[str] = None,
+    ) -> List[int]:
+        """
+        Applies the same changes to every selected contact in one UPDATE statement.
+
+        Args:
+            body (ContactUpdate): The fields to set.
+            user (User): The owner of the contacts.
+            ids (Optional[Sequence[int]]): Restrict to these contact IDs.
+            name (Optional[str]): Restrict to contacts whose name matches.
+            email (Optional[str]): Restrict to contacts whose email matches.
+
+        Returns:
+            List[int]: IDs of the updated contacts.
+        """
+        values = body.model_dump(exclude_unset=True)
+        if "birthday" in values:
+            values["birthday_doy"] = birthday_doy(values["birthday"])
+        stmt = (
+            self._filter(update(Contact), user=user, name=name, email=email, ids=ids)
+            .values(**values)
+            .returning(Contact.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(stmt)
+        updated = list(result.scalars().all())
+        await self.db.commit()
+        if updated:
+            await contacts_cache.bump(user.id)
+        return updated
+
+    async def bulk_delete(
+        self,
+        user: User,
+        ids: Optional[Sequence[int]] = None,
+        name: Optional[str] = None,
+        email: Optional[str] = None,
+    ) -> List[int]:
+        """
+        Deletes every selected contact in one DELETE statement.
+
+        Args:
+            user (User): The owner of the contacts.
+            ids (Optional[Sequence[int]]): Restrict to these contact IDs.
+            name (Optional[str]): Restrict to contacts whose name matches.
+            email (Optional[str]): Restrict to contacts whose email matches.
+
+        Returns:
+            List[int]: IDs of the deleted contacts.
+        """
+        stmt = (
+            self._filter(delete(Contact), user=user, name=name, email=email, ids=ids)
+            .returning(Contact.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(stmt)
+        deleted = list(result.scalars().all())
+        await self.db.commit()
+        if deleted:
+            await contacts_cache.bump(user.id)
+        return deleted
+
     async def update(self, contact_id: int, body: ContactUpdate, user: User) -> Contact:
         """
         Updates an existing contact.
 
+        The change is written and the updated row read back by a single
+        `UPDATE ... RETURNING` statement.
+
         Args:
             contact_id (int): The unique identifier of the contact.
             body (ContactUpdate): The updated contact details.
@@ -97,19 +372,33 @@ class ContactRepository:
         Returns:
             Contact: The updated contact, or None if not found.
         """
-        contact = await self.get_by_id(contact_id=contact_id, user=user)
-        if contact:
-            for key, value in body.model_dump(exclude_unset=True).items():
-                setattr(contact, key, value)
+        values = body.model_dump(exclude_unset=True)
+        if not values:
+            return await self.get_by_id(contact_id=contact_id, user=user)
+        if "birthday" in values:
+            values["birthday_doy"] = birthday_doy(values["birthday"])
 
-            await self.db.commit()
-            await self.db.refresh(contact)
+        stmt = (
+            update(Contact)
+            .where(Contact.id == contact_id, Contact.user_id == user.id)
+            .values(**values)
+            .returning(Contact)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        result = await self.db.execute(stmt)
+        contact = result.scalar_one_or_none()
+        await self.db.commit()
+        if contact:
+            await contacts_cache.bump(user.id)
         return contact
 
     async def delete(self, contact_id: int, user: User) -> Optional[Contact]:
         """
         Deletes a contact by its ID.
 
+        The row is deleted and returned by a single `DELETE ... RETURNING`
+        statement.
+
         Args:
             contact_id (int): The unique identifier of the contact.
             user (User): The owner of the contact.
@@ -117,10 +406,17 @@ class ContactRepository:
         Returns:
             Contact: If the contact is deleted successfully.
         """
-        contact = await self.get_by_id(contact_id=contact_id, user=user)
+        stmt = (
+            delete(Contact)
+            .where(Contact.id == contact_id, Contact.user_id == user.id)
+            .returning(Contact)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(stmt)
+        contact = result.scalar_one_or_none()
         if contact is None:
             return None
 
-        await self.db.delete(contact)
         await self.db.commit()
+        await contacts_cache.bump(user.id)
         return contact
@@ -1,7 +1,8 @@
-from sqlalchemy import select
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.database.models import User
 from src.schemas.users import UserCreateSchema
+from src.services.cache import user_cache
 from pydantic import EmailStr
 
 
@@ -40,12 +41,14 @@ class UserRepository:
         Retrieves a user by their username.
 
         Args:
-            username (str): The username of the user.
+            username (str): The username of the user, in any case.
 
         Returns:
             User | None: The user object if found, else None.
         """
-        stmt = select(User).where(User.username == username).limit(1)
+        stmt = (
+            select(User).where(func.lower(User.username) == username.lower()).limit(1)
+        )
         result = await self.db.execute(stmt)
         return result.scalar_one_or_none()
 
@@ -54,12 +57,12 @@ class UserRepository:
         Retrieves a user by their email address.
 
         Args:
-            email (EmailStr): The email of the user.
+            email (EmailStr): The email of the user, in any case.
 
         Returns:
             User | None: The user object if found, else None.
         """
-        stmt = select(User).where(User.email == email).limit(1)
+        stmt = select(User).where(func.lower(User.email) == email.lower()).limit(1)
         result = await self.db.execute(stmt)
         return result.scalar_one_or_none()
 
@@ -81,7 +84,33 @@ class UserRepository:
         )
         self.db.add(user)
         await self.db.commit()
-        await self.db.refresh(user)
+        return user
+
+    async def _update_by_email(self, email: EmailStr, **values) -> User | None:
+        """
+        Updates a user and reads the row back with one `UPDATE ... RETURNING`.
+
+        The user's cached profile is invalidated afterwards.
+
+        Args:
+            email (EmailStr): The email of the user, in any case.
+            **values: The columns to set.
+
+        Returns:
+            User | None: The updated user, or None if there is no such user.
+        """
+        stmt = (
+            update(User)
+            .where(func.lower(User.email) == email.lower())
+            .values(**values)
+            .returning(User)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        result = await self.db.execute(stmt)
+        user = result.scalar_one_or_none()
+        await self.db.commit()
+        if user is not None:
+            await user_cache.invalidate(user.email)
         return user
 
     async def update_avatar_url(self, email: EmailStr, url: str) -> User:
@@ -95,11 +124,33 @@ class UserRepository:
         Returns:
             User: The updated user object.
         """
-        user = await self.get_user_by_email(email)
-        user.avatar = url
+        return await self._update_by_email(email, avatar=url)
+
+    async def set_avatar_if_missing(self, email: EmailStr, url: str) -> bool:
+        """
+        Sets the avatar URL of a user only if they have no avatar.
+
+        A single conditional UPDATE, so an avatar uploaded in the meantime is
+        never overwritten.
+
+        Args:
+            email (EmailStr): The email of the user.
+            url (str): The avatar URL.
+
+        Returns:
+            bool: True if the user's avatar was set.
+        """
+        stmt = (
+            update(User)
+            .where(func.lower(User.email) == email.lower(), User.avatar.is_(None))
+            .values(avatar=url)
+        )
+        result = await self.db.execute(stmt)
         await self.db.commit()
-        await self.db.refresh(user)
-        return user
+        if not result.rowcount:
+            return False
+        await user_cache.invalidate(email)
+        return True
 
     async def confirmed_email(self, email: EmailStr) -> None:
         """
@@ -108,9 +159,7 @@ class UserRepository:
         Args:
             email (EmailStr): The email of the user whose email is being confirmed.
         """
-        user = await self.get_user_by_email(email)
-        user.confirmed = True
-        await self.db.commit()
+        await self._update_by_email(email, confirmed=True)
 
     async def update_password(self, email: EmailStr, new_hashed_password: str) -> User:
         """
@@ -123,8 +172,4 @@ class UserRepository:
         Returns:
             User: The updated user object.
         """
-        user = await self.get_user_by_email(email)
-        user.hashed_password = new_hashed_password
-        await self.db.commit()
-        await self.db.refresh(user)
-        return user
+        return await self._update_by_email(email, hashed_password=new_hashed_password)
@@ -1,6 +1,6 @@
 from datetime import date
-from typing import Optional
-from pydantic import BaseModel, EmailStr, Field
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
 
 
 class ContactCreate(BaseModel):
@@ -26,7 +26,7 @@ class ContactCreate(BaseModel):
 
 class ContactUpdate(BaseModel):
     """
-    Schema for updating an existing contact.
+    Schema for updating an existing contact; fields left out are not changed.
 
     Attributes:
         name (Optional[str]): The updated name of the contact.
@@ -42,6 +42,19 @@ class ContactUpdate(BaseModel):
     birthday: Optional[date] = Field(None)
     additional_data: Optional[str] = Field(None)
 
+    @field_validator("name", "email", "phone", "birthday")
+    @classmethod
+    def reject_null(cls, value):
+        """
+        Rejects an explicit null for a field the contact cannot be without.
+
+        Such fields may be left out of an update but not cleared; only
+        `additional_data` can be set to null.
+        """
+        if value is None:
+            raise ValueError("may be omitted but not set to null")
+        return value
+
 
 class ContactOut(BaseModel):
     """
@@ -63,5 +76,99 @@ class ContactOut(BaseModel):
     birthday: date
     additional_data: Optional[str]
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ContactPage(BaseModel):
+    """
+    Schema for a single page of contacts returned by keyset pagination.
+
+    Attributes:
+        items (List[ContactOut]): The contacts on this page.
+        limit (int): The maximum number of contacts requested for the page.
+        next_cursor (Optional[str]): Opaque cursor for the next page, or None on the last page.
+    """
+
+    items: List[ContactOut]
+    limit: int
+    next_cursor: Optional[str] = None
+
+
+class BulkRowError(BaseModel):
+    """
+    Schema describing why a single row of a bulk import was rejected.
+
+    Attributes:
+        row (int): The 1-based position of the row in the upload.
+        errors (List[Dict[str, Any]]): Validation errors with their location and message.
+    """
+
+    row: int
+    errors: List[Dict[str, Any]]
+
+
+class ContactBulkImportResult(BaseModel):
+    """
+    Schema for the outcome of a bulk contact import.
+
+    Attributes:
+        created (int): Number of contacts inserted.
+        ids (List[int]): IDs of the inserted contacts.
+        errors (List[BulkRowError]): Rows that failed validation and were skipped.
+        elapsed_seconds (float): Time spent validating and inserting.
+        rows_per_second (float): Import throughput.
+    """
+
+    created: int
+    ids: List[int]
+    errors: List[BulkRowError]
+    elapsed_seconds: float
+    rows_per_second: float
+
+
+class ContactSelector(BaseModel):
+    """
+    Schema selecting a set of contacts by ID list and/or the list filters.
+
+    Attributes:
+        ids (Optional[List[int]]): IDs of the contacts to select.
+        name (Optional[str]): Select contacts whose name contains this value.
+        email (Optional[str]): Select contacts whose email contains this value.
+    """
+
+    ids: Optional[List[int]] = Field(None)
+    name: Optional[str] = Field(None)
+    email: Optional[str] = Field(None)
+
+    def is_empty(self) -> bool:
+        """
+        Checks whether no selection criteria were given.
+
+        Returns:
+            bool: True if neither IDs nor filters are set.
+        """
+        return self.ids is None and not self.name and not self.email
+
+
+class ContactBulkUpdate(ContactSelector):
+    """
+    Schema for updating every selected contact with the same changes.
+
+    Attributes:
+        changes (ContactUpdate): The fields to set on each selected contact.
+    """
+
+    changes: ContactUpdate
+
+
+class ContactBulkResult(BaseModel):
+    """
+    Schema for the outcome of a bulk update or delete.
+
+    Attributes:
+        affected (int): Number of contacts changed.
+        ids (List[int]): IDs of the changed contacts.
+    """
+
+    affected: int
+    ids: List[int]
@@ -1,3 +1,5 @@
+from typing import Literal, Optional
+
 from pydantic import BaseModel, ConfigDict, EmailStr
 
 
@@ -9,18 +11,36 @@ class UserSchema(BaseModel):
         id (int): The unique identifier of the user.
         username (str): The username of the user.
         email (str): The email address of the user.
-        avatar (str): The URL of the user's avatar image.
+        avatar (Optional[str]): The URL of the user's avatar image, None
+            until it has been resolved.
     """
 
     id: int
     username: str
     email: str
-    avatar: str
+    avatar: Optional[str] = None
     role: str
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class AvatarJobSchema(BaseModel):
+    """
+    Schema for the status of an avatar upload processed in the background.
+
+    Attributes:
+        id (str): The job ID.
+        status (str): "pending", "done" or "failed".
+        avatar (Optional[str]): The new avatar URL once the job is done.
+        error (Optional[str]): Why the job failed.
+    """
+
+    id: str
+    status: Literal["pending", "done", "failed"]
+    avatar: Optional[str] = None
+    error: Optional[str] = None
+
+
 class UserCreateSchema(BaseModel):
     """
     Schema for creating a new user.
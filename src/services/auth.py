@@ -1,19 +1,23 @@
-import json
 from datetime import datetime, timedelta, UTC
 from typing import Optional
 
 from fastapi import Depends, HTTPException, status
-from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import EmailStr
 from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError, jwt
 
-from src.database.db import get_db
+from src.database.db import get_read_db, is_replica_session
 from src.conf.config import settings
-from src.database.redis import get_redis
 from src.database.models import User
 from src.schemas.users import UserSchema
+from src.services.cache import user_cache
+from src.services.hashing import (
+    get_pwd_context,
+    hashing_pool,
+    hash_password,
+    verify_password,
+)
 from src.services.users import UserService
 
 
@@ -22,9 +26,16 @@ class Hash:
     A utility class for hashing and verifying passwords.
 
     This class utilizes bcrypt hashing algorithm to securely store passwords.
+    The asynchronous variants run in the bounded hashing pool so that bcrypt
+    does not block the event loop.
     """
 
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    @property
+    def pwd_context(self):
+        """
+        The bcrypt context, created on first use.
+        """
+        return get_pwd_context()
 
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """
@@ -37,7 +48,7 @@ class Hash:
         Returns:
             bool: True if passwords match, False otherwise.
         """
-        return self.pwd_context.verify(plain_password, hashed_password)
+        return verify_password(plain_password, hashed_password)
 
     def get_password_hash(self, password: str) -> str:
         """
@@ -49,7 +60,40 @@ class Hash:
         Returns:
             str: The hashed password.
         """
-        return self.pwd_context.hash(password)
+        return hash_password(password)
+
+    async def verify_password_async(
+        self, plain_password: str, hashed_password: str
+    ) -> bool:
+        """
+        Verify a password in the hashing pool without blocking the event loop.
+
+        Args:
+            plain_password (str): The raw password provided by the user.
+            hashed_password (str): The stored hashed password.
+
+        Returns:
+            bool: True if passwords match, False otherwise.
+
+        Raises:
+            PoolBusyError: If the hashing backlog is full.
+        """
+        return await hashing_pool.run(verify_password, plain_password, hashed_password)
+
+    async def get_password_hash_async(self, password: str) -> str:
+        """
+        Hash a password in the hashing pool without blocking the event loop.
+
+        Args:
+            password (str): The password to hash.
+
+        Returns:
+            str: The hashed password.
+
+        Raises:
+            PoolBusyError: If the hashing backlog is full.
+        """
+        return await hashing_pool.run(hash_password, password)
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
@@ -87,16 +131,18 @@ async def create_access_token(
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db),
-    redis=Depends(get_redis),
+    db: AsyncSession = Depends(get_read_db),
 ) -> User:
     """
     Retrieve the currently authenticated user from a JWT token.
 
+    The user is looked up in the two-tier user cache before the database,
+    so a hot user costs no network round-trip at all. Only users read from
+    the primary are cached.
+
     Args:
         token (str): The JWT access token provided by the user.
         db (AsyncSession): The database session.
-        redis: Redis connection instance.
 
     Returns:
         User: The authenticated user instance.
@@ -110,10 +156,6 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    cached_user = await redis.get(f"user:{token}")
-    if cached_user:
-        return User(**json.loads(cached_user))
-
     try:
         payload = jwt.decode(
             token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
@@ -125,16 +167,60 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
 
+    cached_user = await user_cache.get(email)
+    if cached_user:
+        return User(**cached_user)
+
     user_service = UserService(db)
     user = await user_service.get_user_by_email(email)
     if user is None:
         raise credentials_exception
-    user_schema = UserSchema.model_validate(user)
-    await redis.setex(f"user:{token}", 600, json.dumps(user_schema.model_dump()))
+    if not is_replica_session(db):
+        user_schema = UserSchema.model_validate(user)
+        await user_cache.set(email, user_schema.model_dump())
 
     return user
 
 
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_read_db),
+) -> User:
+    """
+    Resolve the caller from the claims of a JWT token alone.
+
+    Only the signature and expiry are checked; the user ID and role embedded
+    in the token are trusted, so no Redis or database round-trip is made.
+    Use `get_current_user` where the full user profile is needed. Tokens
+    issued without a `uid` claim fall back to `get_current_user`.
+
+    Args:
+        token (str): The JWT access token provided by the user.
+        db (AsyncSession): The database session, used only for legacy tokens.
+
+    Returns:
+        User: A transient user carrying the ID, email and role from the token.
+
+    Raises:
+        HTTPException: If token validation fails.
+    """
+    try:
+        payload = jwt.decode(
+            token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
+        )
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    user_id = payload.get("uid")
+    if user_id is None:
+        return await get_current_user(token=token, db=db)
+    return User(id=user_id, email=payload.get("sub"), role=payload.get("role"))
+
+
 def create_email_token(data: dict) -> str:
     """
     Generate an email confirmation token.
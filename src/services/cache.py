@@ -0,0 +1,346 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from redis.exceptions import RedisError
+
+from src.conf.config import settings
+from src.database.redis import get_redis
+from src.utils.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """
+    A bounded in-process cache with least-recently-used eviction and a per-entry TTL.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        Initializes an empty cache.
+
+        Args:
+            maxsize (int): Maximum number of entries kept.
+            ttl (float): Seconds an entry stays valid after being stored.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Returns a cached value and marks it as recently used.
+
+        Args:
+            key (Hashable): The cache key.
+
+        Returns:
+            Optional[Any]: The value, or None if it is missing or expired.
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Stores a value, evicting the least recently used entry when full.
+
+        Args:
+            key (Hashable): The cache key.
+            value (Any): The value to store.
+        """
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """
+        Removes an entry if present.
+
+        Args:
+            key (Hashable): The cache key.
+        """
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Removes all entries.
+        """
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class UserCache:
+    """
+    Two-tier cache of authenticated users: an in-process LRU in front of Redis.
+
+    Entries are keyed by the user's identity (the token subject), not by the
+    raw token, so every token of a user shares one entry. Writes to a user
+    publish an invalidation message that every worker listens to.
+    """
+
+    CHANNEL = "user-cache:invalidate"
+
+    def __init__(self, maxsize: int, local_ttl: float, redis_ttl: int):
+        """
+        Initializes the cache tiers.
+
+        Args:
+            maxsize (int): Maximum number of users kept in process.
+            local_ttl (float): Seconds a user stays in the in-process tier.
+            redis_ttl (int): Seconds a user stays in Redis.
+        """
+        self.local = LRUCache(maxsize=maxsize, ttl=local_ttl)
+        self.redis_ttl = redis_ttl
+
+    @staticmethod
+    def _redis_key(identity: str) -> str:
+        return f"user:{identity}"
+
+    async def get(self, identity: str) -> Optional[dict]:
+        """
+        Looks a user up in process first, then in Redis.
+
+        Args:
+            identity (str): The user's identity, i.e. the token subject.
+
+        Returns:
+            Optional[dict]: The cached user fields, or None on a miss.
+        """
+        data = self.local.get(identity)
+        if data is not None:
+            CACHE_REQUESTS.inc(cache="user", result="local_hit")
+            return data
+
+        redis = await get_redis()
+        cached = await redis.get(self._redis_key(identity))
+        if cached is None:
+            CACHE_REQUESTS.inc(cache="user", result="miss")
+            return None
+        CACHE_REQUESTS.inc(cache="user", result="redis_hit")
+        data = json.loads(cached)
+        self.local.set(identity, data)
+        return data
+
+    async def set(self, identity: str, data: dict) -> None:
+        """
+        Stores a user in both tiers.
+
+        Args:
+            identity (str): The user's identity, i.e. the token subject.
+            data (dict): JSON-serializable user fields.
+        """
+        self.local.set(identity, data)
+        redis = await get_redis()
+        await redis.setex(self._redis_key(identity), self.redis_ttl, json.dumps(data))
+
+    async def invalidate(self, identity: str) -> None:
+        """
+        Evicts a user from both tiers and tells other workers to do the same.
+
+        Failures to reach Redis are logged rather than raised, since the local
+        TTL still bounds how long a stale entry can live elsewhere.
+
+        Args:
+            identity (str): The user's identity, i.e. the token subject.
+        """
+        self.local.pop(identity)
+        try:
+            redis = await get_redis()
+            await redis.delete(self._redis_key(identity))
+            await redis.publish(self.CHANNEL, identity)
+        except (RedisError, OSError, RuntimeError) as e:
+            logger.warning(f"Failed to invalidate cached user {identity}: {e}")
+
+    async def listen(self) -> None:
+        """
+        Evicts users from the in-process tier as invalidations are published.
+
+        Runs until cancelled. While disconnected from Redis invalidations may
+        be missed, so the in-process tier is cleared before resubscribing.
+        """
+        delay = 1
+        while True:
+            try:
+                redis = await get_redis()
+                pubsub = redis.pubsub()
+                await pubsub.subscribe(self.CHANNEL)
+                delay = 1
+                try:
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.local.pop(message["data"])
+                finally:
+                    await pubsub.aclose()
+            except asyncio.CancelledError:
+                raise
+            except (RedisError, OSError) as e:
+                logger.warning(f"User cache invalidation listener failed: {e}")
+            self.local.clear()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+
+
+class ContactsResponseCache:
+    """
+    Redis cache of serialized contact responses, invalidated per user.
+
+    Every user has a generation token that each write to their contacts
+    replaces. Cached responses and ETags embed the generation they were built
+    from, so one write invalidates all of them at once; old entries simply
+    expire. Tokens are timestamps rather than counters so that a lost key
+    never brings an old generation back. Tokens expire too, twice as late as
+    responses, so users who stop using the API leave nothing behind. Redis
+    errors are logged and treated as a miss, so the cache never fails a
+    request.
+    """
+
+    def __init__(self, ttl: int):
+        """
+        Initializes the cache.
+
+        Args:
+            ttl (int): Seconds a cached response is kept.
+        """
+        self.ttl = ttl
+        self.generation_ttl = 2 * ttl
+
+    @staticmethod
+    def _generation_key(user_id: int) -> str:
+        return f"contacts:gen:{user_id}"
+
+    @staticmethod
+    def _digest(user_id: int, generation: str, query: str) -> str:
+        raw = f"{user_id}:{generation}:{query}".encode()
+        return hashlib.blake2b(raw, digest_size=12).hexdigest()
+
+    async def generation(self, user_id: int) -> Optional[str]:
+        """
+        Returns the user's current generation token, creating it if missing.
+
+        Args:
+            user_id (int): The owner of the contacts.
+
+        Returns:
+            Optional[str]: The generation, or None if Redis is unavailable.
+        """
+        key = self._generation_key(user_id)
+        try:
+            redis = await get_redis()
+            generation = await redis.get(key)
+            if generation is None:
+                generation = str(time.time_ns())
+                if not await redis.set(
+                    key, generation, ex=self.generation_ttl, nx=True
+                ):
+                    generation = await redis.get(key)
+            return generation
+        except (RedisError, OSError, RuntimeError) as e:
+            logger.warning(f"Failed to read contacts generation of {user_id}: {e}")
+            return None
+
+    async def bump(self, user_id: int) -> None:
+        """
+        Invalidates every cached response of a user.
+
+        Args:
+            user_id (int): The owner of the contacts.
+        """
+        try:
+            redis = await get_redis()
+            await redis.set(
+                self._generation_key(user_id),
+                str(time.time_ns()),
+                ex=self.generation_ttl,
+            )
+        except (RedisError, OSError, RuntimeError) as e:
+            logger.warning(f"Failed to bump contacts generation of {user_id}: {e}")
+
+    def etag(self, user_id: int, generation: str, query: str) -> str:
+        """
+        Builds the weak ETag of a response.
+
+        Args:
+            user_id (int): The owner of the contacts.
+            generation (str): The user's current generation.
+            query (str): The normalized query the response answers.
+
+        Returns:
+            str: The ETag header value.
+        """
+        return f'W/"{self._digest(user_id, generation, query)}"'
+
+    async def get(self, user_id: int, generation: str, query: str) -> Optional[bytes]:
+        """
+        Returns a cached response body.
+
+        Args:
+            user_id (int): The owner of the contacts.
+            generation (str): The user's current generation.
+            query (str): The normalized query the response answers.
+
+        Returns:
+            Optional[bytes]: The serialized body, or None on a miss.
+        """
+        try:
+            redis = await get_redis()
+            body = await redis.get(
+                f"contacts:resp:{self._digest(user_id, generation, query)}"
+            )
+        except (RedisError, OSError, RuntimeError) as e:
+            logger.warning(f"Failed to read cached contacts response: {e}")
+            return None
+        if body is None:
+            CACHE_REQUESTS.inc(cache="contacts", result="miss")
+            return None
+        CACHE_REQUESTS.inc(cache="contacts", result="redis_hit")
+        return body.encode() if isinstance(body, str) else body
+
+    async def set(self, user_id: int, generation: str, query: str, body: bytes) -> None:
+        """
+        Stores a response body.
+
+        Args:
+            user_id (int): The owner of the contacts.
+            generation (str): The generation the body was built from.
+            query (str): The normalized query the response answers.
+            body (bytes): The serialized body.
+        """
+        try:
+            redis = await get_redis()
+            await redis.setex(
+                f"contacts:resp:{self._digest(user_id, generation, query)}",
+                self.ttl,
+                body,
+            )
+        except (RedisError, OSError, RuntimeError) as e:
+            logger.warning(f"Failed to cache contacts response: {e}")
+
+
+user_cache = UserCache(
+    maxsize=settings.USER_CACHE_LOCAL_SIZE,
+    local_ttl=settings.USER_CACHE_LOCAL_TTL,
+    redis_ttl=settings.USER_CACHE_REDIS_TTL,
+)
+"""
+Process-wide two-tier cache used by `get_current_user`.
+"""
+
+contacts_cache = ContactsResponseCache(ttl=settings.CONTACTS_CACHE_TTL)
+"""
+Process-wide cache of contact list, detail and birthday responses.
+"""
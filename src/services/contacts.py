@@ -1,11 +1,99 @@
-from typing import Optional, Type, Sequence
+import calendar
+import csv
+import io
+import json
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Type,
+    Sequence,
+    Tuple,
+)
 from datetime import date, timedelta
 
+import orjson
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.conf.config import settings
+
 from src.repository.contacts import ContactRepository
-from src.schemas.contacts import ContactCreate, ContactUpdate
-from src.database.models import Contact, User
+from src.schemas.contacts import (
+    ContactCreate,
+    ContactUpdate,
+    ContactOut,
+    ContactSelector,
+    ContactBulkUpdate,
+)
+from src.database.models import Contact, User, birthday_doy
+from src.utils.pagination import decode_cursor, encode_cursor
+from src.utils.serialization import row_dict
+
+EXPORT_CHUNK_ROWS = 500
+"""Number of exported rows encoded into a single streamed chunk."""
+
+
+def birthday_window(today: date, days: int) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Computes the `month * 100 + day` bounds of an upcoming-birthday window.
+
+    Birthdays on February 29 are celebrated on February 28 in non-leap years,
+    so a window ending on that day is stretched to include them.
+
+    Args:
+        today (date): The first day of the window.
+        days (int): Length of the window in days after `today`.
+
+    Returns:
+        Tuple[Optional[int], Optional[int]]: The inclusive start and end, or
+        `(None, None)` when the window covers the whole year.
+    """
+    if days >= 365:
+        return None, None
+    end = today + timedelta(days=days)
+    end_doy = birthday_doy(end)
+    if end_doy == 228 and not calendar.isleap(end.year):
+        end_doy = 229
+    return birthday_doy(today), end_doy
+
+
+def parse_contact_rows(data: bytes, import_format: str) -> List[Dict[str, Any]]:
+    """
+    Parses an uploaded contact list into raw row dictionaries.
+
+    Empty CSV cells are dropped so that optional fields fall back to their defaults.
+
+    Args:
+        data (bytes): The uploaded content.
+        import_format (str): One of "json" (an array of objects), "ndjson" or "csv".
+
+    Returns:
+        List[Dict[str, Any]]: One dictionary per uploaded row.
+
+    Raises:
+        ValueError: If the content cannot be parsed in the given format.
+    """
+    text = data.decode("utf-8-sig")
+    if import_format == "csv":
+        try:
+            return [
+                {k: v for k, v in row.items() if k is not None and v not in ("", None)}
+                for row in csv.DictReader(io.StringIO(text))
+            ]
+        except csv.Error as e:
+            raise ValueError(str(e))
+    if import_format == "ndjson":
+        rows = [json.loads(line) for line in text.splitlines() if line.strip()]
+    else:
+        rows = json.loads(text)
+        if not isinstance(rows, list):
+            raise ValueError("Expected a JSON array of contacts")
+    return rows
 
 
 class ContactService:
@@ -35,6 +123,54 @@ class ContactService:
         """
         return await self.repository.create(body=contact_data, user=user)
 
+    async def import_contacts(self, rows: Iterable[Any], user: User) -> Dict[str, Any]:
+        """
+        Validates uploaded rows and inserts the valid ones in batches.
+
+        Invalid rows are reported and skipped; they do not abort the import.
+
+        Args:
+            rows (Iterable[Any]): Raw rows, usually from `parse_contact_rows`.
+            user (User): The owner of the new contacts.
+
+        Returns:
+            Dict[str, Any]: Created IDs, per-row errors and throughput figures.
+        """
+        started = time.perf_counter()
+        valid, errors = [], []
+        for position, row in enumerate(rows, start=1):
+            try:
+                if not isinstance(row, dict):
+                    raise ValueError("Row must be an object")
+                valid.append(ContactCreate.model_validate({**row, "user_id": user.id}))
+            except ValidationError as e:
+                errors.append(
+                    {
+                        "row": position,
+                        "errors": [
+                            {"loc": list(err["loc"]), "msg": err["msg"]}
+                            for err in e.errors()
+                        ],
+                    }
+                )
+            except ValueError as e:
+                errors.append({"row": position, "errors": [{"loc": [], "msg": str(e)}]})
+
+        ids = []
+        if valid:
+            ids = await self.repository.bulk_create(
+                valid, user=user, chunk_size=settings.BULK_IMPORT_CHUNK_SIZE
+            )
+
+        elapsed = time.perf_counter() - started
+        return {
+            "created": len(ids),
+            "ids": ids,
+            "errors": errors,
+            "elapsed_seconds": round(elapsed, 6),
+            "rows_per_second": round(len(ids) / elapsed, 2) if elapsed else 0.0,
+        }
+
     async def get_contact(self, contact_id: int, user: User) -> Optional[Contact]:
         """
         Retrieves a specific contact by ID.
@@ -53,19 +189,94 @@ class ContactService:
         user: User,
         name: Optional[str] = None,
         email: Optional[str] = None,
-    ) -> Sequence[Contact]:
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> dict:
         """
-        Retrieves a list of contacts for a user with optional filters.
+        Retrieves a page of contacts for a user with optional filters.
+
+        One extra row is fetched to find out whether another page exists,
+        so no separate COUNT query is needed.
 
         Args:
             user (User): The owner of the contacts.
             name (Optional[str]): Filter contacts by name.
             email (Optional[str]): Filter contacts by email.
+            limit (int): Maximum number of contacts on the page.
+            cursor (Optional[str]): Opaque cursor returned with the previous page.
 
         Returns:
-            Sequence[Contact]: A list of matching contacts.
+            dict: The page items, the limit and the cursor of the next page.
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed.
         """
-        return await self.repository.get_all(name=name, email=email, user=user)
+        contacts = await self.repository.get_all(
+            name=name,
+            email=email,
+            user=user,
+            limit=limit + 1,
+            after=decode_cursor(cursor),
+        )
+        items = list(contacts[:limit])
+        next_cursor = None
+        if len(contacts) > limit:
+            next_cursor = encode_cursor(items[-1].name, items[-1].id)
+        return {"items": items, "limit": limit, "next_cursor": next_cursor}
+
+    async def export_contacts(
+        self, user: User, export_format: str = "ndjson"
+    ) -> AsyncIterator[bytes]:
+        """
+        Encodes all contacts of a user as NDJSON or CSV, chunk by chunk.
+
+        Args:
+            user (User): The owner of the contacts.
+            export_format (str): Either "ndjson" or "csv".
+
+        Yields:
+            bytes: UTF-8 encoded chunks of the export.
+        """
+        fields = list(ContactOut.model_fields)
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fields)
+        if export_format == "csv":
+            writer.writeheader()
+
+        rows = 0
+        async for contact in self.repository.stream_all(user=user):
+            # Rows come from the database, so they are not validated again.
+            out = row_dict(ContactOut, contact)
+            if export_format == "csv":
+                writer.writerow(out)
+            else:
+                buffer.write(
+                    orjson.dumps(out, option=orjson.OPT_APPEND_NEWLINE).decode()
+                )
+            rows += 1
+            if rows % EXPORT_CHUNK_ROWS == 0:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+    async def search_contacts(
+        self, user: User, query: str, limit: int = 20
+    ) -> Sequence[Contact]:
+        """
+        Searches contacts by name, email or phone, ranked by relevance.
+
+        Args:
+            user (User): The owner of the contacts.
+            query (str): The search term.
+            limit (int): Maximum number of contacts to return.
+
+        Returns:
+            Sequence[Contact]: Matching contacts, best matches first.
+        """
+        return await self.repository.search(user=user, query=query, limit=limit)
 
     async def update_contact(
         self, contact_id: int, update_data: ContactUpdate, user: User
@@ -85,6 +296,46 @@ class ContactService:
             contact_id=contact_id, body=update_data, user=user
         )
 
+    async def bulk_update_contacts(
+        self, selector: ContactBulkUpdate, user: User
+    ) -> Dict[str, Any]:
+        """
+        Updates all contacts matched by the selector.
+
+        Args:
+            selector (ContactBulkUpdate): The contacts to update and the changes.
+            user (User): The owner of the contacts.
+
+        Returns:
+            Dict[str, Any]: The number and IDs of updated contacts.
+        """
+        ids = await self.repository.bulk_update(
+            body=selector.changes,
+            user=user,
+            ids=selector.ids,
+            name=selector.name,
+            email=selector.email,
+        )
+        return {"affected": len(ids), "ids": ids}
+
+    async def bulk_delete_contacts(
+        self, selector: ContactSelector, user: User
+    ) -> Dict[str, Any]:
+        """
+        Deletes all contacts matched by the selector.
+
+        Args:
+            selector (ContactSelector): The contacts to delete.
+            user (User): The owner of the contacts.
+
+        Returns:
+            Dict[str, Any]: The number and IDs of deleted contacts.
+        """
+        ids = await self.repository.bulk_delete(
+            user=user, ids=selector.ids, name=selector.name, email=selector.email
+        )
+        return {"affected": len(ids), "ids": ids}
+
     async def delete_contact(self, contact_id: int, user: User) -> bool:
         """
         Deletes a contact by ID.
@@ -101,31 +352,20 @@ class ContactService:
             return False
         return True
 
-    async def get_upcoming_birthdays(self, user: User) -> Sequence[Contact]:
+    async def get_upcoming_birthdays(
+        self, user: User, days: int = 7
+    ) -> Sequence[Contact]:
         """
-        Retrieves contacts with upcoming birthdays within the next 7 days.
+        Retrieves contacts with upcoming birthdays within the next few days.
 
         Args:
             user (User): The owner of the contacts.
+            days (int): Length of the window in days, 7 by default.
 
         Returns:
             Sequence[Contact]: A list of contacts with upcoming birthdays.
         """
-        contacts = await self.repository.get_all(user=user)
-        today = date.today()
-        upcoming_contacts = []
-        for contact in contacts:
-            try:
-                birthday_this_year = contact.birthday.replace(year=today.year)
-            except ValueError:
-                birthday_this_year = contact.birthday.replace(year=today.year, day=28)
-            if birthday_this_year < today:
-                try:
-                    birthday_this_year = contact.birthday.replace(year=today.year + 1)
-                except ValueError:
-                    birthday_this_year = contact.birthday.replace(
-                        year=today.year + 1, day=28
-                    )
-            if today <= birthday_this_year <= today + timedelta(days=7):
-                upcoming_contacts.append(contact)
-        return upcoming_contacts
+        start_doy, end_doy = birthday_window(date.today(), days)
+        return await self.repository.get_by_birthday_window(
+            user=user, start_doy=start_doy, end_doy=end_doy
+        )
@@ -1,75 +1,47 @@
 from asyncio.log import logger
-from pathlib import Path
 
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
-from fastapi_mail.errors import ConnectionErrors
 from pydantic import EmailStr
+from redis.exceptions import RedisError
 
-from src.conf.config import settings
-
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.MAIL_USERNAME,
-    MAIL_PASSWORD=settings.MAIL_PASSWORD,
-    MAIL_FROM=settings.MAIL_FROM,
-    MAIL_PORT=settings.MAIL_PORT,
-    MAIL_SERVER=settings.MAIL_SERVER,
-    MAIL_FROM_NAME=settings.MAIL_FROM_NAME,
-    MAIL_STARTTLS=settings.MAIL_STARTTLS,
-    MAIL_SSL_TLS=settings.MAIL_SSL_TLS,
-    USE_CREDENTIALS=settings.USE_CREDENTIALS,
-    VALIDATE_CERTS=settings.VALIDATE_CERTS,
-    TEMPLATE_FOLDER=Path(__file__).parent / "templates",
-)
+from src.services.email_queue import email_queue
+from src.services.email_templates import email_templates
 
 
 async def send_email(email: EmailStr, username: str, host: str):
     """
-    Sends an email verification message to a user.
+    Queues an email verification message to a user.
+
+    The message is rendered here and delivered by the email worker.
 
     Args:
         email (EmailStr): The recipient's email address.
         username (str): The username of the recipient.
         host (str): The application's base URL.
-
-    Raises:
-        ConnectionErrors: If there is an issue sending the email.
     """
     try:
         from src.services.auth import create_email_token
 
         token_verification = create_email_token({"sub": email})
-        message = MessageSchema(
-            subject="Confirm your email",
-            recipients=[email],
-            template_body={
-                "host": host,
-                "username": username,
-                "token": token_verification,
-            },
-            subtype=MessageType.html,
+        html = email_templates.render(
+            "verify_email.html", host=host, username=username, token=token_verification
         )
+        await email_queue.enqueue(str(email), "Confirm your email", html)
 
-        fm = FastMail(conf)
-        await fm.send_message(message, template_name="verify_email.html")
-
-    except ConnectionErrors as err:
-        logger.error(f"Failed to send email: {err}")
-        print(f"Failed to send email: {err}")
+    except (RedisError, OSError) as err:
+        logger.error(f"Failed to queue email: {err}")
     except Exception as e:
         logger.error(f"Unexpected error in send_email: {e}")
-        print(f"Unexpected error: {e}")
 
 
 async def send_reset_password_email(email: EmailStr, host: str):
     """
-    Send reset password verification email.
+    Queues a reset password verification email.
+
+    The message is rendered here and delivered by the email worker.
 
     Args:
         email (EmailStr): The user's email address.
         host (str): The application's base URL.
-
-    Raises:
-        ConnectionErrors: If there is an issue sending the email.
     """
 
     try:
@@ -78,19 +50,10 @@ async def send_reset_password_email(email: EmailStr, host: str):
         reset_token = create_email_token({"sub": email})
         reset_url = f"{host}/auth/reset-password/confirm?token={reset_token}"
 
-        message = MessageSchema(
-            subject="Reset Your Password",
-            recipients=[email],
-            template_body={"reset_url": reset_url},
-            subtype=MessageType.html,
-        )
-
-        fm = FastMail(conf)
-        await fm.send_message(message, template_name="reset_password.html")
+        html = email_templates.render("reset_password.html", reset_url=reset_url)
+        await email_queue.enqueue(str(email), "Reset Your Password", html)
 
-    except ConnectionErrors as err:
-        logger.error(f"Failed to send reset password email: {err}")
-        print(f"Failed to send reset password email: {err}")
+    except (RedisError, OSError) as err:
+        logger.error(f"Failed to queue reset password email: {err}")
     except Exception as e:
         logger.error(f"Unexpected error in send_reset_password_email: {e}")
-        print(f"Unexpected error: {e}")
@@ -0,0 +1,299 @@
+import json
+import random
+import time
+import uuid
+from typing import Iterable, List, Optional, Tuple
+
+from src.conf.config import settings
+from src.database.redis import get_redis
+
+
+REQUEUE_SCRIPT = """
+if redis.call('LREM', KEYS[1], 1, ARGV[1]) > 0 then
+    redis.call('RPUSH', KEYS[2], ARGV[1])
+    return 1
+end
+return 0
+"""
+
+
+class EmailQueue:
+    """
+    Durable Redis queue of rendered emails, consumed by the email worker.
+
+    Jobs wait in a list, move to the consuming worker's own processing list
+    while being sent and are removed once delivered. Workers record a
+    heartbeat, and the processing list of a worker whose heartbeat stops is
+    requeued by the workers still running, so jobs still being sent by a
+    live worker are never taken from it. Failed jobs wait in a sorted set
+    scored by their retry time, and jobs that keep failing end up in a
+    dead-letter list. Delivery is at-least-once.
+    """
+
+    def __init__(
+        self,
+        prefix: str = "email",
+        max_attempts: int = 5,
+        retry_base: float = 30,
+        retry_max: float = 3600,
+        redis=None,
+        worker_id: Optional[str] = None,
+        stale_after: float = 60,
+    ):
+        """
+        Initializes the queue.
+
+        Args:
+            prefix (str): Prefix of the Redis keys.
+            max_attempts (int): Delivery attempts before a job is dead-lettered.
+            retry_base (float): Seconds before the first retry.
+            retry_max (float): Upper bound of the retry delay in seconds.
+            redis: Client to use instead of the application's shared client.
+            worker_id (Optional[str]): Identifies the consumer; random by default.
+            stale_after (float): Seconds without a heartbeat after which a
+                worker is presumed dead and its jobs are requeued.
+        """
+        self.worker_id = worker_id or uuid.uuid4().hex
+        self.stale_after = stale_after
+        self.pending_key = f"{prefix}:queue"
+        self.workers_key = f"{prefix}:workers"
+        self._processing_prefix = f"{prefix}:processing:"
+        self.processing_key = f"{self._processing_prefix}{self.worker_id}"
+        self.retry_key = f"{prefix}:retry"
+        self.dead_key = f"{prefix}:dead"
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self._redis = redis
+
+    async def _client(self):
+        return self._redis if self._redis is not None else await get_redis()
+
+    async def enqueue(self, to: str, subject: str, html: str) -> str:
+        """
+        Adds a rendered email to the queue.
+
+        Args:
+            to (str): The recipient's address.
+            subject (str): The subject line.
+            html (str): The rendered HTML body.
+
+        Returns:
+            str: The job ID.
+        """
+        job_id = uuid.uuid4().hex
+        job = {"id": job_id, "to": to, "subject": subject, "html": html}
+        redis = await self._client()
+        await redis.lpush(self.pending_key, json.dumps({**job, "attempts": 0}))
+        return job_id
+
+    async def enqueue_many(self, messages: Iterable[Tuple[str, str, str]]) -> List[str]:
+        """
+        Adds many rendered emails in one round trip, e.g. for a campaign.
+
+        Args:
+            messages (Iterable[Tuple[str, str, str]]): `(to, subject, html)` triples.
+
+        Returns:
+            List[str]: The job IDs, in order.
+        """
+        jobs = [
+            {"id": uuid.uuid4().hex, "to": to, "subject": subject, "html": html}
+            for to, subject, html in messages
+        ]
+        if jobs:
+            redis = await self._client()
+            await redis.lpush(
+                self.pending_key, *(json.dumps({**job, "attempts": 0}) for job in jobs)
+            )
+        return [job["id"] for job in jobs]
+
+    async def heartbeat(self) -> None:
+        """
+        Records that this worker is alive.
+        """
+        redis = await self._client()
+        await redis.zadd(self.workers_key, {self.worker_id: time.time()})
+
+    async def reserve(self, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Takes the oldest job and moves it to this worker's processing list.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait for a job, or None to
+                return immediately.
+
+        Returns:
+            Optional[str]: The raw job, or None if the queue is empty.
+        """
+        await self.heartbeat()
+        redis = await self._client()
+        if timeout is None:
+            return await redis.lmove(
+                self.pending_key, self.processing_key, "RIGHT", "LEFT"
+            )
+        return await redis.blmove(
+            self.pending_key, self.processing_key, timeout, "RIGHT", "LEFT"
+        )
+
+    async def ack(self, raw: str) -> None:
+        """
+        Removes a delivered job.
+
+        Args:
+            raw (str): The job as returned by `reserve`.
+        """
+        redis = await self._client()
+        await redis.lrem(self.processing_key, 1, raw)
+
+    def retry_delay(self, attempts: int) -> float:
+        """
+        Returns the backoff before the next attempt, with jitter.
+
+        Args:
+            attempts (int): Attempts made so far.
+
+        Returns:
+            float: Seconds to wait.
+        """
+        delay = min(self.retry_base * 2 ** (attempts - 1), self.retry_max)
+        return delay * random.uniform(0.8, 1.2)
+
+    async def fail(self, raw: str, error: str) -> bool:
+        """
+        Schedules a failed job for a retry, or dead-letters it.
+
+        Args:
+            raw (str): The job as returned by `reserve`.
+            error (str): Why delivery failed.
+
+        Returns:
+            bool: True if the job will be retried, False if it was dead-lettered.
+        """
+        job = json.loads(raw)
+        job["attempts"] += 1
+        job["last_error"] = error
+        retry = job["attempts"] < self.max_attempts
+
+        redis = await self._client()
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.lrem(self.processing_key, 1, raw)
+            if retry:
+                due = time.time() + self.retry_delay(job["attempts"])
+                pipe.zadd(self.retry_key, {json.dumps(job): due})
+            else:
+                pipe.lpush(self.dead_key, json.dumps(job))
+            await pipe.execute()
+        return retry
+
+    async def bury(self, raw: str, error: str) -> None:
+        """
+        Dead-letters a job that cannot be processed at all, e.g. malformed JSON.
+
+        Args:
+            raw (str): The job as returned by `reserve`.
+            error (str): Why the job cannot be processed.
+        """
+        redis = await self._client()
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.lrem(self.processing_key, 1, raw)
+            pipe.lpush(self.dead_key, json.dumps({"raw": raw, "last_error": error}))
+            await pipe.execute()
+
+    async def requeue(self, raw: str) -> bool:
+        """
+        Puts a job from this worker's processing list back at the head of the queue.
+
+        Used for jobs whose outcome could not be recorded. A job that is no
+        longer in the processing list, because the write went through after
+        all, is left alone.
+
+        Args:
+            raw (str): The job as returned by `reserve`.
+
+        Returns:
+            bool: True if the job was requeued.
+        """
+        redis = await self._client()
+        moved = await redis.eval(
+            REQUEUE_SCRIPT, 2, self.processing_key, self.pending_key, raw
+        )
+        return bool(moved)
+
+    async def promote_due(self, limit: int = 100) -> int:
+        """
+        Moves jobs whose retry time has come back to the queue.
+
+        Args:
+            limit (int): Maximum number of jobs moved per call.
+
+        Returns:
+            int: Number of jobs moved.
+        """
+        redis = await self._client()
+        due = await redis.zrangebyscore(
+            self.retry_key, "-inf", time.time(), start=0, num=limit
+        )
+        moved = 0
+        for raw in due:
+            # Only the worker whose ZREM succeeds requeues the job.
+            if await redis.zrem(self.retry_key, raw):
+                await redis.lpush(self.pending_key, raw)
+                moved += 1
+        return moved
+
+    async def recover(self, include_own: bool = True) -> int:
+        """
+        Requeues the jobs of workers that stopped without finishing them.
+
+        A worker counts as stopped once its heartbeat is older than
+        `stale_after`. Workers that are still alive keep their jobs.
+
+        Args:
+            include_own (bool): Also requeue this worker's processing list,
+                which only holds leftovers before the worker starts sending.
+
+        Returns:
+            int: Number of jobs requeued.
+        """
+        redis = await self._client()
+        stale = await redis.zrangebyscore(
+            self.workers_key, "-inf", time.time() - self.stale_after
+        )
+        recovered = 0
+        workers = set(stale)
+        if include_own:
+            workers.add(self.worker_id)
+        else:
+            workers.discard(self.worker_id)
+        for worker_id in workers:
+            # LMOVE is atomic, so two workers recovering the same list
+            # never requeue a job twice.
+            while await redis.lmove(
+                f"{self._processing_prefix}{worker_id}",
+                self.pending_key,
+                "RIGHT",
+                "RIGHT",
+            ):
+                recovered += 1
+        if stale:
+            await redis.zrem(self.workers_key, *stale)
+        return recovered
+
+    async def depth(self) -> int:
+        """
+        Returns the number of jobs waiting to be sent or retried.
+        """
+        redis = await self._client()
+        return await redis.llen(self.pending_key) + await redis.zcard(self.retry_key)
+
+
+email_queue = EmailQueue(
+    max_attempts=settings.EMAIL_MAX_ATTEMPTS,
+    retry_base=settings.EMAIL_RETRY_BASE_SECONDS,
+    retry_max=settings.EMAIL_RETRY_MAX_SECONDS,
+    stale_after=settings.EMAIL_WORKER_STALE_SECONDS,
+)
+"""
+Process-wide email queue; the web app enqueues, the email worker consumes.
+"""
@@ -0,0 +1,125 @@
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+
+if TYPE_CHECKING:
+    from jinja2 import Environment, Template
+
+TEMPLATE_FOLDER = Path(__file__).parent / "templates"
+
+_BETWEEN_TAGS = re.compile(r">\s+<")
+
+
+class EmailTemplates:
+    """
+    Email templates compiled once and kept in memory.
+
+    Jinja's default environment re-checks the template file on every lookup;
+    here every template is read, preprocessed and compiled when loaded, and
+    rendering only runs the compiled code.
+    """
+
+    def __init__(self, folder: Path = TEMPLATE_FOLDER):
+        """
+        Initializes the cache; templates are compiled by `load` or on first use.
+
+        Args:
+            folder (Path): Directory containing the templates.
+        """
+        self.folder = folder
+        self._env: Optional["Environment"] = None
+        self._compiled: Dict[str, "Template"] = {}
+
+    @property
+    def env(self) -> "Environment":
+        """
+        The Jinja environment, created when the first template is compiled.
+        """
+        if self._env is None:
+            from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+            self._env = Environment(
+                loader=FileSystemLoader(self.folder),
+                autoescape=select_autoescape(["html"]),
+                auto_reload=False,
+            )
+        return self._env
+
+    @staticmethod
+    def _preprocess(source: str) -> str:
+        """
+        Precomputes the static parts of a template before compiling it.
+
+        Whitespace between tags is removed once here rather than shipped in
+        every message.
+        """
+        return _BETWEEN_TAGS.sub("><", source.strip())
+
+    def load(self) -> int:
+        """
+        Compiles every template in the folder.
+
+        Returns:
+            int: Number of compiled templates.
+        """
+        for name in self.env.list_templates(extensions=["html", "txt"]):
+            source, _, _ = self.env.loader.get_source(self.env, name)
+            self._compiled[name] = self.env.from_string(self._preprocess(source))
+        return len(self._compiled)
+
+    def get(self, name: str) -> "Template":
+        """
+        Returns a compiled template, loading the cache on first use.
+
+        Args:
+            name (str): The template file name.
+
+        Returns:
+            Template: The compiled template.
+
+        Raises:
+            KeyError: If there is no such template.
+        """
+        if not self._compiled:
+            self.load()
+        return self._compiled[name]
+
+    def render(self, name: str, **context) -> str:
+        """
+        Renders a template.
+
+        Args:
+            name (str): The template file name.
+            **context: Template variables.
+
+        Returns:
+            str: The rendered body.
+        """
+        return self.get(name).render(**context)
+
+    def render_many(
+        self, name: str, contexts: Iterable[dict], shared: Optional[dict] = None
+    ) -> List[str]:
+        """
+        Renders one template for many recipients.
+
+        The template is looked up once, so each body only costs running the
+        compiled template with that recipient's variables.
+
+        Args:
+            name (str): The template file name.
+            contexts (Iterable[dict]): Per-recipient variables.
+            shared (Optional[dict]): Variables common to every recipient.
+
+        Returns:
+            List[str]: One rendered body per context, in order.
+        """
+        template = self.get(name)
+        shared = shared or {}
+        return [template.render({**shared, **context}) for context in contexts]
+
+
+email_templates = EmailTemplates()
+"""
+Process-wide template cache used to render queued emails.
+"""
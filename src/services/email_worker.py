@@ -0,0 +1,319 @@
+"""
+Email worker: sends the emails queued by the web app.
+
+Run it as a separate process next to the API:
+
+    python -m src.services.email_worker
+"""
+
+import asyncio
+import json
+import logging
+import signal
+import time
+from contextlib import asynccontextmanager, suppress
+from email.message import EmailMessage
+from email.utils import formataddr, make_msgid
+from typing import List, Optional, Tuple
+
+import aiosmtplib
+from redis.exceptions import RedisError
+
+from src.conf.config import settings
+from src.services.email_queue import EmailQueue, email_queue
+
+logger = logging.getLogger(__name__)
+
+
+class SMTPConnectionPool:
+    """
+    A bounded pool of open SMTP connections reused across messages.
+
+    Reusing connections saves the TCP, TLS and AUTH handshakes that
+    dominate the cost of sending a single small message.
+    """
+
+    def __init__(self, size: int, max_idle: float, **smtp_options):
+        """
+        Initializes an empty pool; connections are opened on demand.
+
+        Args:
+            size (int): Maximum number of connections open at once.
+            max_idle (float): Seconds an idle connection is reused before it
+                is replaced, since servers drop idle clients.
+            **smtp_options: Arguments for `aiosmtplib.SMTP`.
+        """
+        self.size = size
+        self.max_idle = max_idle
+        self._options = smtp_options
+        self._idle: List[Tuple[aiosmtplib.SMTP, float]] = []
+        self._slots = asyncio.Semaphore(size)
+        self.opened = 0
+
+    @classmethod
+    def from_settings(cls) -> "SMTPConnectionPool":
+        """
+        Builds a pool for the SMTP server configured in the settings.
+        """
+        credentials = {}
+        if settings.USE_CREDENTIALS:
+            credentials = {
+                "username": settings.MAIL_USERNAME,
+                "password": settings.MAIL_PASSWORD,
+            }
+        return cls(
+            size=settings.SMTP_POOL_SIZE,
+            max_idle=settings.SMTP_POOL_MAX_IDLE_SECONDS,
+            hostname=settings.MAIL_SERVER,
+            port=settings.MAIL_PORT,
+            use_tls=settings.MAIL_SSL_TLS,
+            start_tls=settings.MAIL_STARTTLS,
+            validate_certs=settings.VALIDATE_CERTS,
+            **credentials,
+        )
+
+    async def _checkout(self) -> aiosmtplib.SMTP:
+        while self._idle:
+            smtp, idle_since = self._idle.pop()
+            if smtp.is_connected and time.monotonic() - idle_since < self.max_idle:
+                return smtp
+            self._discard(smtp)
+        smtp = aiosmtplib.SMTP(**self._options)
+        await smtp.connect()
+        self.opened += 1
+        return smtp
+
+    @staticmethod
+    def _discard(smtp: aiosmtplib.SMTP) -> None:
+        if smtp.is_connected:
+            smtp.close()
+
+    @asynccontextmanager
+    async def connection(self):
+        """
+        Lends out an open connection; it is dropped if the block raises.
+
+        Yields:
+            aiosmtplib.SMTP: A connected, authenticated client.
+        """
+        async with self._slots:
+            smtp = await self._checkout()
+            try:
+                yield smtp
+            except BaseException:
+                self._discard(smtp)
+                raise
+            self._idle.append((smtp, time.monotonic()))
+
+    async def close(self) -> None:
+        """
+        Closes every idle connection.
+        """
+        while self._idle:
+            smtp, _ = self._idle.pop()
+            with suppress(aiosmtplib.SMTPException, OSError):
+                await smtp.quit()
+            self._discard(smtp)
+
+
+def build_message(job: dict) -> EmailMessage:
+    """
+    Builds the MIME message of a queued email.
+
+    Args:
+        job (dict): The job with `to`, `subject` and rendered `html`.
+
+    Returns:
+        EmailMessage: The message ready to send.
+    """
+    message = EmailMessage()
+    message["From"] = formataddr((settings.MAIL_FROM_NAME, settings.MAIL_FROM))
+    message["To"] = job["to"]
+    message["Subject"] = job["subject"]
+    message["Message-ID"] = make_msgid(idstring=job["id"])
+    message.set_content(job["html"], subtype="html")
+    return message
+
+
+class EmailWorker:
+    """
+    Sends queued emails over pooled SMTP connections, retrying failures.
+    """
+
+    def __init__(self, queue: EmailQueue, pool: SMTPConnectionPool, concurrency: int):
+        """
+        Initializes the worker.
+
+        Args:
+            queue (EmailQueue): The queue to consume.
+            pool (SMTPConnectionPool): Connections to send through.
+            concurrency (int): Emails sent at once.
+        """
+        self.queue = queue
+        self.pool = pool
+        self._slots = asyncio.Semaphore(concurrency)
+        self._unsettled: List[str] = []
+        self.sent = 0
+        self.failed = 0
+
+    async def process(self, raw: str) -> None:
+        """
+        Sends one reserved job, then acknowledges, reschedules or buries it.
+
+        Jobs that cannot be parsed or built into a message are dead-lettered
+        at once; any error while sending is retried. If Redis fails while
+        the job is settled, the job stays in the processing list and the
+        running worker requeues it once Redis answers again.
+
+        Args:
+            raw (str): The job as returned by `EmailQueue.reserve`.
+        """
+        try:
+            try:
+                job = json.loads(raw)
+                message = build_message(job)
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Dead-lettering malformed email job: {e!r}")
+                await self.queue.bury(raw, f"Malformed job: {e!r}")
+                return
+
+            try:
+                async with self.pool.connection() as smtp:
+                    await smtp.send_message(message)
+            except Exception as e:
+                self.failed += 1
+                retried = await self.queue.fail(raw, str(e))
+                logger.warning(
+                    f"Failed to send email {job['id']} to {job['to']} "
+                    f"(attempt {job['attempts'] + 1}, "
+                    f"{'will retry' if retried else 'dead-lettered'}): {e!r}"
+                )
+            else:
+                self.sent += 1
+                await self.queue.ack(raw)
+        except (RedisError, OSError) as e:
+            self._unsettled.append(raw)
+            logger.error(f"Failed to settle an email job, will requeue it: {e}")
+
+    async def _process_in_slot(self, raw: str) -> None:
+        try:
+            await self.process(raw)
+        finally:
+            self._slots.release()
+
+    async def _requeue_unsettled(self) -> None:
+        while self._unsettled:
+            await self.queue.requeue(self._unsettled[0])
+            self._unsettled.pop(0)
+
+    async def _maintain(self, stop: asyncio.Event) -> None:
+        """
+        Keeps the heartbeat fresh and requeues stranded jobs until `stop` is set.
+
+        Jobs of workers that died while this one runs, such as a worker
+        restarted under a new ID, are requeued once their heartbeat goes
+        stale, as are this worker's own jobs that could not be settled.
+        """
+        interval = self.queue.stale_after / 3
+        while not stop.is_set():
+            try:
+                await self.queue.heartbeat()
+                await self._requeue_unsettled()
+                recovered = await self.queue.recover(include_own=False)
+                if recovered:
+                    logger.info(f"Requeued {recovered} emails of stopped workers")
+            except (RedisError, OSError) as e:
+                logger.warning(f"Email worker maintenance failed: {e}")
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(stop.wait(), interval)
+
+    async def run(
+        self,
+        stop: asyncio.Event,
+        poll_timeout: float = 1,
+        max_backoff: float = 30,
+    ) -> None:
+        """
+        Consumes the queue until `stop` is set, then finishes in-flight sends.
+
+        While Redis is unreachable the worker backs off, doubling the pause
+        up to `max_backoff`, and resumes once it answers again.
+
+        Args:
+            stop (asyncio.Event): Set to shut the worker down.
+            poll_timeout (float): Seconds to block waiting for a job.
+            max_backoff (float): Longest pause between attempts to reach Redis.
+        """
+        maintenance = asyncio.create_task(self._maintain(stop))
+        recovered = None
+        backoff = poll_timeout
+        tasks = set()
+        while not stop.is_set():
+            await self._slots.acquire()
+            try:
+                if recovered is None:
+                    recovered = await self.queue.recover()
+                    if recovered:
+                        logger.info(f"Requeued {recovered} interrupted emails")
+                await self.queue.promote_due()
+                raw = await self.queue.reserve(timeout=poll_timeout)
+            except (RedisError, OSError) as e:
+                logger.warning(f"Email queue unavailable, retrying in {backoff}s: {e}")
+                self._slots.release()
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(stop.wait(), backoff)
+                backoff = min(backoff * 2, max_backoff)
+                continue
+            backoff = poll_timeout
+            if raw is None:
+                self._slots.release()
+                continue
+            task = asyncio.create_task(self._process_in_slot(raw))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks)
+        await maintenance
+
+    async def drain(self) -> int:
+        """
+        Sends every job that is due now and returns once the queue is empty.
+
+        Returns:
+            int: Number of jobs processed.
+        """
+        processed = 0
+        await self.queue.promote_due()
+        while (raw := await self.queue.reserve()) is not None:
+            await self.process(raw)
+            processed += 1
+        return processed
+
+
+async def main(queue: Optional[EmailQueue] = None) -> None:
+    """
+    Runs a worker with the configured SMTP server until SIGINT or SIGTERM.
+
+    Args:
+        queue (Optional[EmailQueue]): The queue to consume; the application's by default.
+    """
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    pool = SMTPConnectionPool.from_settings()
+    worker = EmailWorker(
+        queue or email_queue, pool, concurrency=settings.EMAIL_WORKER_CONCURRENCY
+    )
+    logger.info(f"Email worker started, sending through {settings.MAIL_SERVER}")
+    try:
+        await worker.run(stop)
+    finally:
+        await pool.close()
+        logger.info(f"Email worker stopped: {worker.sent} sent, {worker.failed} failed")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+import asyncio
+import hashlib
+import logging
+from typing import Optional
+
+from pydantic import EmailStr
+from redis.exceptions import RedisError
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.conf.config import settings
+from src.database.db import sessionmanager
+from src.services.cache import LRUCache
+from src.services.users import UserService
+
+logger = logging.getLogger(__name__)
+
+
+def email_hash(email: str) -> str:
+    """
+    Hashes an email the way Gravatar identifies it.
+
+    Args:
+        email (str): The email address.
+
+    Returns:
+        str: The hex MD5 digest of the trimmed, lowercased address.
+    """
+    return hashlib.md5(email.strip().lower().encode()).hexdigest()
+
+
+class GravatarResolver:
+    """
+    Resolves Gravatar URLs off the event loop and caches them by email hash.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        Initializes the resolver with an empty cache.
+
+        Args:
+            maxsize (int): Maximum number of URLs cached.
+            ttl (float): Seconds a URL stays cached.
+        """
+        self.cache = LRUCache(maxsize=maxsize, ttl=ttl)
+
+    async def resolve(self, email: str) -> Optional[str]:
+        """
+        Returns the Gravatar URL of an email address.
+
+        Args:
+            email (str): The email address.
+
+        Returns:
+            Optional[str]: The image URL, or None if it could not be resolved.
+        """
+        key = email_hash(email)
+        url = self.cache.get(key)
+        if url is None:
+            from libgravatar import Gravatar
+
+            try:
+                url = await asyncio.to_thread(Gravatar(email).get_image)
+            except Exception as e:
+                logger.warning(f"Failed to resolve the Gravatar of {email}: {e}")
+                return None
+            self.cache.set(key, url)
+        return url
+
+
+gravatar_resolver = GravatarResolver(
+    maxsize=settings.GRAVATAR_CACHE_SIZE, ttl=settings.GRAVATAR_CACHE_TTL
+)
+"""
+Process-wide Gravatar resolver used when users register.
+"""
+
+
+async def fill_gravatar(email: EmailStr) -> None:
+    """
+    Sets a new user's avatar to their Gravatar, unless they already have one.
+
+    Runs as a background task after registration, so avatar resolution is
+    not part of the registration response time.
+
+    Args:
+        email (EmailStr): The user's email address.
+    """
+    url = await gravatar_resolver.resolve(email)
+    if url is None:
+        return
+    try:
+        async with sessionmanager.session() as db:
+            await UserService(db).set_default_avatar(email, url)
+    except (SQLAlchemyError, RedisError, OSError) as e:
+        logger.error(f"Failed to store the Gravatar of {email}: {e}")
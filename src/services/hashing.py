@@ -0,0 +1,65 @@
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from src.conf.config import settings
+from src.services.worker_pool import WorkerPool
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+
+@lru_cache(maxsize=None)
+def get_pwd_context() -> "CryptContext":
+    """
+    Returns the bcrypt context, importing passlib on first use.
+
+    Workers only pay for passlib and bcrypt once they hash a password.
+
+    Returns:
+        CryptContext: The process-wide password context.
+    """
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def hash_password(password: str) -> str:
+    """
+    Hash a password using bcrypt.
+
+    Defined at module level so it can be sent to a process pool.
+
+    Args:
+        password (str): The password to hash.
+
+    Returns:
+        str: The hashed password.
+    """
+    return get_pwd_context().hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password against a bcrypt hash.
+
+    Defined at module level so it can be sent to a process pool.
+
+    Args:
+        plain_password (str): The raw password provided by the user.
+        hashed_password (str): The stored hashed password.
+
+    Returns:
+        bool: True if passwords match, False otherwise.
+    """
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+
+hashing_pool = WorkerPool(
+    name="hashing",
+    kind=settings.HASH_POOL_KIND,
+    workers=settings.HASH_POOL_WORKERS,
+    max_pending=settings.HASH_POOL_MAX_PENDING,
+)
+"""
+Process-wide pool used by `Hash` for asynchronous hashing and verification.
+"""
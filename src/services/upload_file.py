@@ -1,46 +1,366 @@
-import cloudinary
-import cloudinary.uploader
+import hashlib
+import io
+import json
+import os
+import tempfile
+import uuid
+from pathlib import Path
+from typing import Optional
 
+from src.conf.config import settings
+from src.database.redis import get_redis
+from src.services.worker_pool import WorkerPool
 
-class UploadFileService:
+IMAGE_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+SNIFF_BYTES = 12
+"""Bytes at the start of an upload needed to recognise its image type."""
+
+_PIL_FORMATS = ["PNG", "JPEG", "GIF", "WEBP"]
+
+
+class InvalidImageError(Exception):
+    """
+    Raised when an upload is not an image that can be used as an avatar.
+    """
+
+
+class ImageTooLargeError(InvalidImageError):
+    """
+    Raised when an image has more pixels than an avatar may be decoded from.
+    """
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """
+    Recognises an image from its leading magic bytes.
+
+    The client's Content-Type header is not trusted.
+
+    Args:
+        head (bytes): At least the first `SNIFF_BYTES` bytes of the upload.
+
+    Returns:
+        Optional[str]: The image MIME type, or None if it is not a supported image.
+    """
+    for signature, mime_type in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return mime_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def make_thumbnail(data: bytes, size: int, max_pixels: int) -> bytes:
+    """
+    Crops an image to a centred square and scales it to an avatar.
+
+    Args:
+        data (bytes): The uploaded image.
+        size (int): Width and height of the avatar in pixels.
+        max_pixels (int): Largest image, in pixels, that is decoded.
+
+    Returns:
+        bytes: The avatar encoded as WebP.
+
+    Raises:
+        ImageTooLargeError: If the image has more than `max_pixels` pixels.
+        InvalidImageError: If the data cannot be decoded as an image.
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        with Image.open(io.BytesIO(data), formats=_PIL_FORMATS) as image:
+            # Only the header has been read so far, so huge images are
+            # rejected before their pixels are decoded.
+            if image.width * image.height > max_pixels:
+                raise ImageTooLargeError(
+                    f"Image is {image.width}x{image.height} pixels, "
+                    f"at most {max_pixels} pixels are allowed"
+                )
+            # Lets JPEG decode at a fraction of its size when that is enough.
+            image.draft("RGB", (size * 2, size * 2))
+            image = ImageOps.exif_transpose(image)
+            image = image.convert("RGBA" if image.has_transparency_data else "RGB")
+            thumbnail = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        raise InvalidImageError(f"Not a valid image: {e}") from e
+
+    output = io.BytesIO()
+    thumbnail.save(output, "WEBP", quality=85)
+    return output.getvalue()
+
+
+class AvatarStorage:
+    """
+    Base class of the places avatars are stored in.
+
+    `save` blocks, so it is called from a worker thread.
     """
-    Service class for handling file uploads using Cloudinary.
+
+    content_type = "image/webp"
+
+    def save(self, key: str, data: bytes) -> str:
+        """
+        Stores an avatar, replacing any previous one under the same key.
+
+        Args:
+            key (str): Path-like name of the avatar.
+            data (bytes): The encoded avatar.
+
+        Returns:
+            str: The public URL of the stored avatar.
+        """
+        raise NotImplementedError
+
+
+class CloudinaryStorage(AvatarStorage):
+    """
+    Stores avatars in Cloudinary.
     """
 
     def __init__(self, cloud_name, api_key, api_secret):
         """
-        Initializes the Cloudinary upload service.
+        Configures the Cloudinary client.
 
         Args:
             cloud_name (str): Cloudinary cloud name.
             api_key (str): Cloudinary API key.
             api_secret (str): Cloudinary API secret.
         """
-        self.cloud_name = cloud_name
-        self.api_key = api_key
-        self.api_secret = api_secret
+        import cloudinary
+
         cloudinary.config(
-            cloud_name=self.cloud_name,
-            api_key=self.api_key,
-            api_secret=self.api_secret,
+            cloud_name=cloud_name,
+            api_key=api_key,
+            api_secret=api_secret,
             secure=True,
         )
 
-    @staticmethod
-    def upload_file(file, username) -> str:
+    def save(self, key: str, data: bytes) -> str:
+        import cloudinary.uploader
+
+        r = cloudinary.uploader.upload(io.BytesIO(data), public_id=key, overwrite=True)
+        return r["secure_url"]
+
+
+class LocalStorage(AvatarStorage):
+    """
+    Stores avatars as files served by the application itself.
+
+    Suitable for development and single-host deployments, and as a stand-in
+    for an object store mounted into the filesystem.
+    """
+
+    def __init__(self, root, base_url: str):
         """
-        Uploads a file to Cloudinary and returns the file URL.
+        Initializes the storage.
 
         Args:
-            file: The file object to be uploaded.
-            username (str): The username associated with the file.
+            root: Directory the avatars are written to.
+            base_url (str): URL prefix under which `root` is served.
+        """
+        self.root = Path(root)
+        self.base_url = base_url.rstrip("/")
+
+    def save(self, key: str, data: bytes) -> str:
+        """
+        Writes an avatar under `root`.
+
+        Raises:
+            ValueError: If the key would place the file outside `root`.
+        """
+        root = self.root.resolve()
+        path = (root / f"{key}.webp").resolve()
+        if not path.is_relative_to(root):
+            raise ValueError(f"Avatar key escapes the storage root: {key!r}")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Written next to the target and renamed, so readers never see a
+        # partially written avatar.
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        version = hashlib.blake2b(data, digest_size=6).hexdigest()
+        return f"{self.base_url}/{key}.webp?v={version}"
+
+
+def storage_from_settings() -> AvatarStorage:
+    """
+    Creates the storage backend selected by `AVATAR_STORAGE`.
+
+    Returns:
+        AvatarStorage: The configured backend.
+
+    Raises:
+        ValueError: If the setting names an unknown backend.
+    """
+    if settings.AVATAR_STORAGE == "cloudinary":
+        return CloudinaryStorage(
+            settings.CLD_NAME, settings.CLD_API_KEY, settings.CLD_API_SECRET
+        )
+    if settings.AVATAR_STORAGE == "local":
+        return LocalStorage(settings.AVATAR_LOCAL_DIR, settings.AVATAR_BASE_URL)
+    raise ValueError(f"Unknown avatar storage: {settings.AVATAR_STORAGE}")
+
+
+class UploadFileService:
+    """
+    Service class for resizing avatars and uploading them to storage.
+    """
+
+    def __init__(
+        self,
+        storage: AvatarStorage,
+        size: int = 250,
+        max_pixels: int = 40_000_000,
+    ):
+        """
+        Initializes the upload service.
+
+        Args:
+            storage (AvatarStorage): Where the avatars are stored.
+            size (int): Width and height of the avatars in pixels.
+            max_pixels (int): Largest image, in pixels, that is decoded.
+        """
+        self.storage = storage
+        self.size = size
+        self.max_pixels = max_pixels
+
+    @classmethod
+    def from_settings(cls) -> "UploadFileService":
+        """
+        Creates the service configured by the application settings.
 
         Returns:
-            str: The URL of the uploaded file.
+            UploadFileService: The configured service.
         """
-        public_id = f"RestApp/{username}"
-        r = cloudinary.uploader.upload(file.file, public_id=public_id, overwrite=True)
-        src_url = cloudinary.CloudinaryImage(public_id).build_url(
-            width=250, height=250, crop="fill", version=r.get("version")
+        return cls(
+            storage_from_settings(),
+            size=settings.AVATAR_SIZE,
+            max_pixels=settings.AVATAR_MAX_PIXELS,
         )
-        return src_url
+
+    def upload_file(self, data: bytes, user_id: int) -> str:
+        """
+        Resizes an avatar locally and stores it.
+
+        Blocks for the whole resize and upload, so run it in `image_pool`.
+
+        Args:
+            data (bytes): The uploaded image.
+            user_id (int): The ID of the user the avatar belongs to. The ID
+                rather than the username names the file, so no user input
+                ends up in the storage path.
+
+        Returns:
+            str: The URL of the uploaded file.
+
+        Raises:
+            InvalidImageError: If the data is not a usable image.
+        """
+        thumbnail = make_thumbnail(data, self.size, self.max_pixels)
+        return self.storage.save(f"RestApp/{int(user_id)}", thumbnail)
+
+
+class AvatarJobs:
+    """
+    Status of avatar uploads processed in the background, kept in Redis.
+
+    A job is "pending" until it is either "done", with the new avatar URL,
+    or "failed", with the reason. Jobs expire after `ttl` seconds.
+    """
+
+    def __init__(self, ttl: int, prefix: str = "avatar-job"):
+        """
+        Initializes the store.
+
+        Args:
+            ttl (int): Seconds a job's status is kept.
+            prefix (str): Prefix of the Redis keys.
+        """
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.prefix}:{job_id}"
+
+    async def _save(self, job: dict) -> None:
+        redis = await get_redis()
+        await redis.set(self._key(job["id"]), json.dumps(job), ex=self.ttl)
+
+    async def create(self, user_id: int) -> str:
+        """
+        Records a new pending job.
+
+        Args:
+            user_id (int): The user who uploaded the avatar.
+
+        Returns:
+            str: The job ID.
+        """
+        job_id = uuid.uuid4().hex
+        await self._save({"id": job_id, "user_id": user_id, "status": "pending"})
+        return job_id
+
+    async def finish(
+        self,
+        job_id: str,
+        user_id: int,
+        avatar: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """
+        Marks a job as done, or as failed if an error is given.
+
+        Args:
+            job_id (str): The job ID.
+            user_id (int): The user who uploaded the avatar.
+            avatar (Optional[str]): The new avatar URL.
+            error (Optional[str]): Why the upload failed.
+        """
+        job = {"id": job_id, "user_id": user_id}
+        if error is None:
+            job.update(status="done", avatar=avatar)
+        else:
+            job.update(status="failed", error=error)
+        await self._save(job)
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        """
+        Returns a job's status.
+
+        Args:
+            job_id (str): The job ID.
+
+        Returns:
+            Optional[dict]: The job, or None if it does not exist or expired.
+        """
+        redis = await get_redis()
+        raw = await redis.get(self._key(job_id))
+        return json.loads(raw) if raw is not None else None
+
+
+image_pool = WorkerPool(
+    kind="thread",
+    workers=settings.IMAGE_POOL_WORKERS,
+    max_pending=settings.IMAGE_POOL_MAX_PENDING,
+    name="image",
+)
+"""
+Process-wide pool resizing and uploading avatars off the event loop.
+"""
+
+avatar_jobs = AvatarJobs(ttl=settings.AVATAR_JOB_TTL)
+"""
+Process-wide store of background avatar upload jobs.
+"""
@@ -1,8 +1,6 @@
 from pydantic import EmailStr
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from libgravatar import Gravatar
-
 from src.database.models import User
 from src.repository.users import UserRepository
 from src.schemas.users import UserCreateSchema
@@ -24,7 +22,9 @@ class UserService:
 
     async def create_user(self, body: UserCreateSchema):
         """
-        Creates a new user and assigns an avatar if available.
+        Creates a new user without an avatar.
+
+        The avatar is filled in afterwards by `fill_gravatar`.
 
         Args:
             body (UserCreateSchema): The user creation data.
@@ -32,14 +32,7 @@ class UserService:
         Returns:
             User: The newly created user.
         """
-        avatar = None
-        try:
-            g = Gravatar(body.email)
-            avatar = g.get_image()
-        except Exception as e:
-            print(e)
-
-        return await self.repository.create_user(body, avatar)
+        return await self.repository.create_user(body)
 
     async def get_user_by_id(self, user_id: int):
         """
@@ -90,6 +83,19 @@ class UserService:
         """
         return await self.repository.update_avatar_url(email, url)
 
+    async def set_default_avatar(self, email: EmailStr, url: str) -> bool:
+        """
+        Sets the avatar URL of a user who does not have an avatar yet.
+
+        Args:
+            email (EmailStr): The user's email.
+            url (str): The default avatar URL.
+
+        Returns:
+            bool: True if the avatar was set.
+        """
+        return await self.repository.set_avatar_if_missing(email, url)
+
     async def confirmed_email(self, email: EmailStr):
         """
         Confirms the user's email address.
@@ -0,0 +1,112 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+class PoolBusyError(Exception):
+    """
+    Raised when too many jobs are already waiting for a worker pool.
+
+    Attributes:
+        pool (str): The name of the pool that is full.
+    """
+
+    def __init__(self, pool: str):
+        super().__init__(f"The {pool} backlog is full")
+        self.pool = pool
+
+
+class WorkerPool:
+    """
+    Runs blocking or CPU-heavy work off the event loop with a bounded backlog.
+
+    Used for password hashing and avatar resizing. Jobs beyond `max_pending`
+    are rejected immediately instead of queueing, so a burst of work
+    degrades into fast 503s rather than stalling the worker.
+    """
+
+    def __init__(self, kind: str, workers: int, max_pending: int, name: str = "worker"):
+        """
+        Initializes the pool; the executor itself is created on first use.
+
+        Args:
+            kind (str): Either "thread" or "process".
+            workers (int): Number of worker threads or processes.
+            max_pending (int): Maximum number of jobs running or waiting at once.
+            name (str): Names the worker threads and appears in busy errors.
+        """
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown worker pool kind: {kind}")
+        self.kind = kind
+        self.name = name
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[Executor] = None
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.busy_seconds = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix=self.name
+                )
+        return self._executor
+
+    async def run(self, func: Callable, *args: Any) -> Any:
+        """
+        Runs a function in the pool and waits for its result.
+
+        Args:
+            func (Callable): A picklable, module-level function.
+            *args (Any): Arguments for the function.
+
+        Returns:
+            Any: The function's result.
+
+        Raises:
+            PoolBusyError: If the backlog is already full.
+        """
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PoolBusyError(self.name)
+
+        self.pending += 1
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+            self.busy_seconds += time.perf_counter() - started
+
+    def stats(self) -> dict:
+        """
+        Returns counters describing the pool's load.
+
+        Returns:
+            dict: Pending, completed and rejected jobs and total time spent.
+        """
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "busy_seconds": round(self.busy_seconds, 6),
+        }
+
+    def shutdown(self) -> None:
+        """
+        Stops the executor, waiting for running jobs to finish.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
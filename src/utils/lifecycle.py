@@ -0,0 +1,169 @@
+"""
+Startup warmup, readiness and graceful shutdown of a worker.
+
+A fresh worker warms up in the background: it opens pooled database
+connections, pings Redis, loads the rate limiter script, configures the ORM
+mappers and builds the schemas, serializers and templates that the first
+requests would otherwise build. It reports ready only once that is done, so
+a load balancer keeps traffic away until then.
+
+On SIGTERM the worker reports "draining" but keeps accepting requests for
+`SHUTDOWN_DRAIN_DELAY` seconds, so the load balancer notices and routes
+new traffic elsewhere, before the signal is handed on to uvicorn. Uvicorn
+then stops accepting and waits up to `--timeout-graceful-shutdown` seconds
+for in-flight requests before the lifespan shutdown closes the pools.
+
+Attributes:
+    lifecycle (Lifecycle): The state of this worker.
+"""
+
+import asyncio
+import logging
+import signal
+import threading
+import time
+from types import FrameType
+from typing import Callable, List, Optional
+
+from fastapi import FastAPI
+from sqlalchemy.orm import configure_mappers
+
+from src.conf.config import settings
+from src.database.db import read_sessionmanager, sessionmanager
+from src.database.redis import get_redis
+from src.schemas.contacts import ContactOut
+from src.schemas.users import UserSchema
+from src.services.email_templates import email_templates
+from src.utils.limiter import limiter
+from src.utils.serialization import dump_rows, type_adapter
+
+logger = logging.getLogger(__name__)
+
+
+class Lifecycle:
+    """
+    Tracks whether a worker is ready or draining.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.draining = False
+
+    @property
+    def status(self) -> str:
+        """
+        "starting", "ready" or "draining".
+        """
+        if self.draining:
+            return "draining"
+        return "ready" if self.ready else "starting"
+
+
+def drain_on_signal(delay: float, signum: int = signal.SIGTERM) -> Callable[[], None]:
+    """
+    Reports "draining" on `signum` and hands the signal on after `delay`.
+
+    Wraps the handler the server installed, uvicorn's `handle_exit`, so the
+    worker keeps serving while readiness fails. A second signal is handed on
+    at once. Does nothing when called off the main thread, where signal
+    handlers cannot be set, or when no Python handler is installed.
+
+    Args:
+        delay (float): Seconds to keep serving after the signal.
+        signum (int): The signal that starts the shutdown.
+
+    Returns:
+        Callable[[], None]: Restores the previous handler.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return lambda: None
+    previous = signal.getsignal(signum)
+    if not callable(previous):
+        return lambda: None
+    loop = asyncio.get_running_loop()
+
+    def start_draining(sig: int) -> None:
+        logger.info(f"Draining for {delay}s before shutting down")
+        loop.call_later(delay, previous, sig, None)
+
+    def handle(sig: int, frame: Optional[FrameType]) -> None:
+        if lifecycle.draining or delay <= 0:
+            previous(sig, frame)
+            return
+        lifecycle.draining = True
+        loop.call_soon_threadsafe(start_draining, sig)
+
+    signal.signal(signum, handle)
+
+    def restore() -> None:
+        if signal.getsignal(signum) is handle:
+            signal.signal(signum, previous)
+
+    return restore
+
+
+async def _warm_database(connections: int) -> None:
+    managers = [sessionmanager]
+    if read_sessionmanager is not sessionmanager:
+        managers.append(read_sessionmanager)
+    for manager in managers:
+        await manager.warmup(connections)
+
+
+async def _warm_redis() -> None:
+    redis = await get_redis()
+    await redis.ping()
+    if limiter.enabled:
+        await limiter.load_script()
+
+
+def _warm_schemas(app: FastAPI) -> None:
+    configure_mappers()
+    dump_rows(ContactOut, [])
+    type_adapter(UserSchema)
+    app.openapi()
+    email_templates.load()
+
+
+async def warm_up(app: FastAPI) -> List[str]:
+    """
+    Warms up the worker and marks it ready.
+
+    The database is retried until it answers, as a worker without it cannot
+    serve. Redis only degrades caching and rate limiting, so a failure to
+    reach it is logged and warmup goes on.
+
+    Args:
+        app (FastAPI): The application instance.
+
+    Returns:
+        List[str]: The steps that failed.
+    """
+    started = time.perf_counter()
+    connections = min(settings.WARMUP_DB_CONNECTIONS, settings.DB_POOL_SIZE)
+    while True:
+        try:
+            await _warm_database(connections)
+            break
+        except Exception as e:
+            logger.warning(f"Database warmup failed, retrying: {e}")
+            await asyncio.sleep(settings.WARMUP_RETRY_SECONDS)
+
+    failed = []
+    try:
+        await _warm_redis()
+    except Exception as e:
+        logger.warning(f"Redis warmup failed: {e}")
+        failed.append("redis")
+    try:
+        _warm_schemas(app)
+    except Exception as e:
+        logger.exception(f"Schema warmup failed: {e}")
+        failed.append("schemas")
+
+    lifecycle.ready = True
+    logger.info(f"Warmup finished in {time.perf_counter() - started:.3f}s")
+    return failed
+
+
+lifecycle = Lifecycle()
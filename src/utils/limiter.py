@@ -1,13 +1,229 @@
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-
-limiter = Limiter(key_func=get_remote_address)
 """
-This module initializes the rate limiter for the FastAPI application.
+Distributed rate limiting shared by every worker through Redis.
 
-It uses `slowapi.Limiter` to restrict the number of requests from each client
-based on their IP address.
+Each caller has a token bucket per policy, kept in a Redis hash and updated
+by one Lua script, so checking a request costs a single EVALSHA round trip
+and concurrent workers never race. Callers are identified by the user in
+their access token, or by IP address when they are anonymous.
 
 Attributes:
-    limiter (Limiter): A rate limiter instance using the remote IP address as the key.
-"""
\ No newline at end of file
+    limiter (RateLimiter): The limiter applied to every `/api` route.
+"""
+
+import logging
+import re
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request
+from jose import JWTError, jwt
+from redis.exceptions import NoScriptError, RedisError
+
+from src.conf.config import settings
+from src.database.redis import get_redis
+from src.utils.metrics import RATE_LIMIT_DECISIONS
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+_RATE = re.compile(r"^\s*(\d+)\s*/\s*(\d*)\s*(second|minute|hour|day)s?\s*$")
+
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * refill)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / refill
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / refill * 1000))
+return {allowed, tostring(retry_after)}
+"""
+"""
+Takes one token from the bucket in KEYS[1], refilled at ARGV[2] tokens per
+second up to ARGV[1]. Returns whether the request is allowed and, if not,
+the seconds until a token is available. Redis' clock is used so that the
+workers' clocks do not need to agree.
+"""
+
+
+def parse_rate(rate: str) -> Tuple[int, float]:
+    """
+    Parses a rate such as "5/minute" or "100/15 minutes".
+
+    Args:
+        rate (str): Requests allowed per period.
+
+    Returns:
+        Tuple[int, float]: The number of requests and the period in seconds.
+
+    Raises:
+        ValueError: If the rate cannot be parsed.
+    """
+    match = _RATE.match(rate)
+    if match is None or int(match.group(1)) < 1:
+        raise ValueError(f"Invalid rate limit: {rate!r}")
+    count, multiplier, period = match.groups()
+    return int(count), int(multiplier or 1) * _PERIODS[period]
+
+
+class RateLimitExceeded(Exception):
+    """
+    Raised when a caller has used up the requests allowed by a policy.
+    """
+
+    def __init__(self, policy: str, retry_after: float):
+        super().__init__(f"Rate limit of {policy} exceeded")
+        self.policy = policy
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter with per-route policies, used as a dependency.
+
+    Routes listed in `policies`, by path template, get their own bucket;
+    all other routes share the default bucket. A bucket holds as many
+    tokens as the rate allows per period and refills continuously, so short
+    bursts are allowed but the long-run rate is not exceeded. When Redis is
+    unavailable requests are allowed.
+    """
+
+    def __init__(self, default: str, policies: Dict[str, str], enabled: bool = True):
+        """
+        Initializes the limiter.
+
+        Args:
+            default (str): Rate of routes without a policy, e.g. "120/minute".
+            policies (Dict[str, str]): Rates by route path template.
+            enabled (bool): Whether requests are limited at all.
+
+        Raises:
+            ValueError: If a rate cannot be parsed.
+        """
+        self.default = parse_rate(default)
+        self.policies = {path: parse_rate(rate) for path, rate in policies.items()}
+        self.enabled = enabled
+        self._sha: Optional[str] = None
+
+    def policy_for(self, path: str) -> Tuple[str, Tuple[int, float]]:
+        """
+        Returns the policy applied to a route.
+
+        Args:
+            path (str): The route's path template.
+
+        Returns:
+            Tuple[str, Tuple[int, float]]: The bucket name and its rate.
+        """
+        if path in self.policies:
+            return path, self.policies[path]
+        return "default", self.default
+
+    @staticmethod
+    def identify(request: Request) -> str:
+        """
+        Returns the key identifying the caller.
+
+        The access token is only decoded, not looked up, so a forged token
+        merely falls back to the IP address.
+
+        Args:
+            request (Request): The incoming request.
+
+        Returns:
+            str: "user:<id>" for authenticated callers, else "ip:<address>".
+        """
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and token:
+            try:
+                payload = jwt.decode(
+                    token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
+                )
+            except JWTError:
+                payload = {}
+            user = payload.get("uid") or payload.get("sub")
+            if user is not None:
+                return f"user:{user}"
+        host = request.client.host if request.client else "unknown"
+        return f"ip:{host}"
+
+    async def load_script(self) -> str:
+        """
+        Loads the token bucket script into Redis.
+
+        Returns:
+            str: The SHA1 the script is run by.
+        """
+        redis = await get_redis()
+        self._sha = await redis.script_load(TOKEN_BUCKET_SCRIPT)
+        return self._sha
+
+    async def hit(self, bucket: str, rate: Tuple[int, float]) -> Optional[float]:
+        """
+        Takes one request from a bucket.
+
+        Args:
+            bucket (str): The Redis key of the bucket.
+            rate (Tuple[int, float]): Requests allowed and the period in seconds.
+
+        Returns:
+            Optional[float]: None if the request is allowed, else the seconds
+            until it would be.
+        """
+        count, period = rate
+        redis = await get_redis()
+        if self._sha is None:
+            await self.load_script()
+        args = [bucket, count, count / period]
+        try:
+            allowed, retry_after = await redis.evalsha(self._sha, 1, *args)
+        except NoScriptError:
+            # Redis was restarted or its script cache flushed.
+            await self.load_script()
+            allowed, retry_after = await redis.evalsha(self._sha, 1, *args)
+        return None if int(allowed) else float(retry_after)
+
+    async def __call__(self, request: Request) -> None:
+        """
+        Checks the request against its route's policy.
+
+        Args:
+            request (Request): The incoming request.
+
+        Raises:
+            RateLimitExceeded: If the caller has no requests left.
+        """
+        if not self.enabled:
+            return
+        route = request.scope.get("route")
+        policy, rate = self.policy_for(route.path if route else request.url.path)
+        try:
+            retry_after = await self.hit(
+                f"ratelimit:{policy}:{self.identify(request)}", rate
+            )
+        except (RedisError, OSError) as e:
+            logger.warning(f"Rate limiting skipped, Redis is unavailable: {e}")
+            return
+        if retry_after is None:
+            RATE_LIMIT_DECISIONS.inc(policy=policy, result="allowed")
+            return
+        RATE_LIMIT_DECISIONS.inc(policy=policy, result="limited")
+        raise RateLimitExceeded(policy, retry_after)
+
+
+limiter = RateLimiter(
+    default=settings.RATE_LIMIT_DEFAULT,
+    policies=settings.RATE_LIMITS,
+    enabled=settings.RATE_LIMIT_ENABLED,
+)
@@ -0,0 +1,449 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.075,
+    0.1,
+    0.25,
+    0.5,
+    0.75,
+    1.0,
+    2.5,
+    5.0,
+    7.5,
+    10.0,
+)
+"""Histogram bucket upper bounds in seconds, as used by Prometheus clients."""
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+"""Content type of the Prometheus text exposition format."""
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Metric:
+    """
+    Base class of the metrics kept in a `Registry`.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """
+        Initializes the metric.
+
+        Args:
+            name (str): The metric name.
+            documentation (str): The HELP text.
+            labelnames (Sequence[str]): Names of the metric's labels.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterator[Tuple[str, LabelValues, Sequence[str], float]]:
+        """
+        Yields `(name, label values, label names, value)` for every sample.
+        """
+        raise NotImplementedError
+
+    def render(self) -> str:
+        """
+        Renders the metric in the Prometheus text exposition format.
+
+        Returns:
+            str: HELP and TYPE lines followed by one line per sample.
+        """
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for name, values, labelnames, value in self.samples():
+            lines.append(
+                f"{name}{_format_labels(labelnames, values)} {_format_value(value)}"
+            )
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """
+    A monotonically increasing value per label set.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """
+        Increments the counter.
+
+        Args:
+            amount (float): The increment.
+            **labels (str): A value for every label name.
+        """
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        """
+        Returns the current value for a label set.
+        """
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        for key, value in self._values.items():
+            yield self.name, key, self.labelnames, value
+
+
+class Gauge(Metric):
+    """
+    A value that can go up and down, or is read from a callback at scrape time.
+    """
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        collect: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+    ):
+        """
+        Initializes the gauge.
+
+        Args:
+            name (str): The metric name.
+            documentation (str): The HELP text.
+            labelnames (Sequence[str]): Names of the gauge's labels.
+            collect (Optional[Callable]): Returns the current values keyed by
+                label values; when given, the gauge is read only at scrape time.
+        """
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._collect = collect
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: str) -> float:
+        """
+        Returns the current value for a label set.
+        """
+        return self._values.get(self._key(labels), 0)
+
+    @contextmanager
+    def track_inprogress(self, **labels: str):
+        """
+        Increments the gauge while the block runs.
+        """
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def samples(self):
+        values = self._collect() if self._collect is not None else self._values
+        for key, value in values.items():
+            yield self.name, key, self.labelnames, value
+
+
+class Histogram(Metric):
+    """
+    Observations counted into cumulative buckets, with their sum and count.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets)) + (float("inf"),)
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """
+        Records an observation.
+
+        Args:
+            value (float): The observed value.
+            **labels (str): A value for every label name.
+        """
+        key = self._key(labels)
+        # Per-bucket counts, then the sum and the total count.
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = [0.0] * (len(self.buckets) + 2)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                state[i] += 1
+                break
+        state[-2] += value
+        state[-1] += 1
+
+    def count(self, **labels: str) -> float:
+        """
+        Returns the number of observations for a label set.
+        """
+        state = self._values.get(self._key(labels))
+        return state[-1] if state else 0
+
+    def samples(self):
+        bucket_labels = self.labelnames + ("le",)
+        for key, state in self._values.items():
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                yield (
+                    f"{self.name}_bucket",
+                    key + (_format_value(bound),),
+                    bucket_labels,
+                    cumulative,
+                )
+            yield f"{self.name}_sum", key, self.labelnames, state[-2]
+            yield f"{self.name}_count", key, self.labelnames, state[-1]
+
+
+class Registry:
+    """
+    A collection of metrics rendered together for a scrape.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """
+        Adds a metric to the registry.
+
+        Args:
+            metric (Metric): The metric to add.
+
+        Returns:
+            Metric: The same metric, for assignment at module level.
+
+        Raises:
+            ValueError: If a metric with the same name is already registered.
+        """
+        if metric.name in self._metrics:
+            raise ValueError(f"Duplicate metric: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """
+        Renders every registered metric in the Prometheus text format.
+
+        Returns:
+            str: The scrape body.
+        """
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+registry = Registry()
+"""
+Process-wide registry exposed by the `/metrics` endpoint.
+"""
+
+HTTP_REQUESTS = registry.register(
+    Counter(
+        "http_requests_total",
+        "HTTP requests by method, route template and status code.",
+        ("method", "route", "status"),
+    )
+)
+HTTP_REQUEST_DURATION = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency by method and route template.",
+        ("method", "route"),
+    )
+)
+HTTP_REQUESTS_IN_PROGRESS = registry.register(
+    Gauge("http_requests_in_progress", "HTTP requests currently being served.")
+)
+HTTP_REQUEST_DB_QUERIES = registry.register(
+    Histogram(
+        "http_request_db_queries",
+        "Database queries issued per HTTP request by route template.",
+        ("route",),
+        buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100),
+    )
+)
+HTTP_REQUEST_DB_DURATION = registry.register(
+    Histogram(
+        "http_request_db_duration_seconds",
+        "Time spent in database queries per HTTP request by route template.",
+        ("route",),
+    )
+)
+DB_QUERY_DURATION = registry.register(
+    Histogram("db_query_duration_seconds", "Latency of individual database queries.")
+)
+REDIS_COMMAND_DURATION = registry.register(
+    Histogram(
+        "redis_command_duration_seconds",
+        "Latency of Redis commands by command name.",
+        ("command",),
+    )
+)
+CACHE_REQUESTS = registry.register(
+    Counter(
+        "cache_requests_total",
+        "Cache lookups by cache and result (local_hit, redis_hit or miss).",
+        ("cache", "result"),
+    )
+)
+RATE_LIMIT_DECISIONS = registry.register(
+    Counter(
+        "rate_limit_decisions_total",
+        "Rate limit checks by policy and result (allowed or limited).",
+        ("policy", "result"),
+    )
+)
+EMAIL_QUEUE_DEPTH = registry.register(
+    Gauge("email_queue_depth", "Emails waiting to be sent or to be retried.")
+)
+
+
+class _RequestDbUsage:
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+_request_db_usage: ContextVar[Optional[_RequestDbUsage]] = ContextVar(
+    "request_db_usage", default=None
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["metrics_query_start"].pop()
+    DB_QUERY_DURATION.observe(elapsed)
+    usage = _request_db_usage.get()
+    if usage is not None:
+        usage.queries += 1
+        usage.seconds += elapsed
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("metrics_query_start"):
+        connection.info["metrics_query_start"].pop()
+
+
+@contextmanager
+def observe_redis(command: str):
+    """
+    Records the latency of a Redis command.
+
+    Args:
+        command (str): The command name, e.g. "GET".
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        REDIS_COMMAND_DURATION.observe(
+            time.perf_counter() - started, command=command.upper()
+        )
+
+
+class MetricsMiddleware:
+    """
+    Records latency, status and database usage of every HTTP request.
+
+    Requests are labelled by route template rather than by raw path, so
+    `/api/contacts/1` and `/api/contacts/2` share one series; requests that
+    match no route are labelled "unmatched".
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        usage = _RequestDbUsage()
+        token = _request_db_usage.set(usage)
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            _request_db_usage.reset(token)
+
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            HTTP_REQUESTS.inc(method=method, route=template, status=str(status_code))
+            HTTP_REQUEST_DURATION.observe(elapsed, method=method, route=template)
+            HTTP_REQUEST_DB_QUERIES.observe(usage.queries, route=template)
+            HTTP_REQUEST_DB_DURATION.observe(usage.seconds, route=template)
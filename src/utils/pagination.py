@@ -0,0 +1,50 @@
+import base64
+import binascii
+import json
+from typing import Optional, Tuple
+
+
+class InvalidCursorError(ValueError):
+    """
+    Raised when a pagination cursor cannot be decoded.
+    """
+
+
+def encode_cursor(name: str, contact_id: int) -> str:
+    """
+    Encodes a keyset position into an opaque, URL-safe cursor.
+
+    Args:
+        name (str): The name of the last contact on the page.
+        contact_id (int): The ID of the last contact on the page.
+
+    Returns:
+        str: The opaque cursor string.
+    """
+    raw = json.dumps([name, contact_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[str, int]]:
+    """
+    Decodes an opaque cursor back into a keyset position.
+
+    Args:
+        cursor (Optional[str]): The cursor received from the client.
+
+    Returns:
+        Optional[Tuple[str, int]]: The `(name, id)` position, or None if no cursor was given.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        name, contact_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise InvalidCursorError("Invalid cursor")
+    if not isinstance(name, str) or not isinstance(contact_id, int):
+        raise InvalidCursorError("Invalid cursor")
+    return name, contact_id
@@ -0,0 +1,66 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.conf.config import settings
+
+COOKIE_NAME = "rw_until"
+"""Cookie holding the Unix time until which the client reads from the primary."""
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def reads_pinned_to_primary(connection: HTTPConnection) -> bool:
+    """
+    Checks whether a client is still inside its read-your-writes window.
+
+    Args:
+        connection (HTTPConnection): The incoming request.
+
+    Returns:
+        bool: True if the client wrote recently and should read from the primary.
+    """
+    if settings.READ_YOUR_WRITES_SECONDS <= 0:
+        return False
+    try:
+        return float(connection.cookies.get(COOKIE_NAME, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+class ReadYourWritesMiddleware:
+    """
+    Marks clients that just wrote so their next reads skip the replica.
+
+    After a successful non-safe request a short-lived cookie is set; while it
+    is valid `get_read_db` hands out primary sessions, so a client never reads
+    a replica that has not yet caught up with its own write. Does nothing
+    while `READ_YOUR_WRITES_SECONDS` is 0.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] in SAFE_METHODS
+            or settings.READ_YOUR_WRITES_SECONDS <= 0
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                window = settings.READ_YOUR_WRITES_SECONDS
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "set-cookie",
+                    f"{COOKIE_NAME}={time.time() + window:.3f}; "
+                    f"Max-Age={int(window) or 1}; Path=/; HttpOnly; SameSite=lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
@@ -0,0 +1,117 @@
+"""
+Fast JSON serialization of API responses.
+
+FastAPI validates a route's return value against its `response_model`,
+converts the result to plain Python with `jsonable_encoder` and only then
+encodes it, so a list of ORM rows is walked three times. The helpers here
+produce the response bytes in a single pass instead; routes return them in
+a `Response`, which FastAPI sends as is.
+
+Rows loaded from the database were validated when they were written, so
+`dump_rows` reads the response model's fields straight off them and
+encodes the result with orjson. Validating them again mostly re-runs the
+email checks of the schemas, which dominates the cost of a large list.
+"""
+
+from functools import lru_cache
+from typing import Any, Iterable, List, Tuple, Type
+
+import orjson
+from pydantic import BaseModel, TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def type_adapter(tp: Any) -> TypeAdapter:
+    """
+    Returns the TypeAdapter of a type, built once per type.
+
+    Args:
+        tp (Any): The type, e.g. `UserSchema` or `List[ContactOut]`.
+
+    Returns:
+        TypeAdapter: The cached adapter.
+    """
+    return TypeAdapter(tp)
+
+
+def dump_json(tp: Any, value: Any) -> bytes:
+    """
+    Validates a value against a type once and encodes it to JSON.
+
+    Args:
+        tp (Any): The response type.
+        value (Any): The value, ORM objects included.
+
+    Returns:
+        bytes: The JSON body.
+    """
+    adapter = type_adapter(tp)
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+
+@lru_cache(maxsize=None)
+def _row_fields(model: Type[BaseModel]) -> Tuple[Tuple[str, str], ...]:
+    """
+    Returns the `(key, attribute)` pairs a model serializes.
+    """
+    return tuple(
+        (field.serialization_alias or field.alias or name, name)
+        for name, field in model.model_fields.items()
+    )
+
+
+def row_dict(model: Type[BaseModel], row: Any) -> dict:
+    """
+    Reads the fields of a response model off a trusted row, without validation.
+
+    Args:
+        model (Type[BaseModel]): The response model.
+        row (Any): An ORM object carrying the model's fields.
+
+    Returns:
+        dict: The row's fields, keyed as the model serializes.
+    """
+    return {key: getattr(row, name) for key, name in _row_fields(model)}
+
+
+def row_dicts(model: Type[BaseModel], rows: Iterable[Any]) -> List[dict]:
+    """
+    Reads the fields of a response model off many trusted rows.
+
+    Args:
+        model (Type[BaseModel]): The response model.
+        rows (Iterable[Any]): ORM objects carrying the model's fields.
+
+    Returns:
+        List[dict]: One dict per row, keyed as the model serializes.
+    """
+    fields = _row_fields(model)
+    return [{key: getattr(row, name) for key, name in fields} for row in rows]
+
+
+def dump_rows(model: Type[BaseModel], rows: Iterable[Any]) -> bytes:
+    """
+    Encodes trusted rows to a JSON array shaped by a response model.
+
+    Args:
+        model (Type[BaseModel]): The response model.
+        rows (Iterable[Any]): ORM objects carrying the model's fields.
+
+    Returns:
+        bytes: The JSON body.
+    """
+    return orjson.dumps(row_dicts(model, rows))
+
+
+def dump_row(model: Type[BaseModel], row: Any) -> bytes:
+    """
+    Encodes a trusted row to a JSON object shaped by a response model.
+
+    Args:
+        model (Type[BaseModel]): The response model.
+        row (Any): An ORM object carrying the model's fields.
+
+    Returns:
+        bytes: The JSON body.
+    """
+    return orjson.dumps(row_dict(model, row))
@@ -0,0 +1,138 @@
+"""
+A minimal SMTP server that accepts every message and keeps it in memory.
+
+Used by the tests and for local development, where no real mail server
+should be contacted:
+
+    python -m src.utils.smtp_sink --port 1025
+
+then run the email worker with MAIL_SERVER=localhost, MAIL_PORT=1025,
+MAIL_SSL_TLS=false and MAIL_STARTTLS=false.
+"""
+
+import argparse
+import asyncio
+import email
+from email.message import EmailMessage
+from email.policy import default
+from typing import List, Optional
+
+
+class SMTPSink:
+    """
+    Accepts SMTP connections and records every delivered message.
+
+    Supports EHLO/HELO, AUTH PLAIN and LOGIN (any credentials), MAIL, RCPT,
+    DATA, RSET, NOOP and QUIT, which is what SMTP clients need to deliver.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        """
+        Initializes the sink; call `start` to listen.
+
+        Args:
+            host (str): The interface to listen on.
+            port (int): The port to listen on; 0 picks a free one.
+        """
+        self.host = host
+        self.port = port
+        self.messages: List[EmailMessage] = []
+        self.connections = 0
+        self.reject_next = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        """
+        Starts listening; `port` holds the bound port afterwards.
+        """
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """
+        Stops listening and closes the server.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+
+        async def reply(line: str) -> None:
+            writer.write(f"{line}\r\n".encode())
+            await writer.drain()
+
+        async def read_line() -> Optional[str]:
+            line = await reader.readline()
+            return line.decode(errors="replace").rstrip("\r\n") if line else None
+
+        await reply("220 smtp-sink ready")
+        try:
+            while (line := await read_line()) is not None:
+                verb, _, argument = line.partition(" ")
+                verb = verb.upper()
+                if verb == "EHLO":
+                    await reply("250-smtp-sink")
+                    await reply("250-8BITMIME")
+                    await reply("250 AUTH PLAIN LOGIN")
+                elif verb == "HELO":
+                    await reply("250 smtp-sink")
+                elif verb == "AUTH":
+                    mechanism, _, initial = argument.partition(" ")
+                    if mechanism.upper() == "LOGIN":
+                        await reply("334 VXNlcm5hbWU6")
+                        await read_line()
+                        await reply("334 UGFzc3dvcmQ6")
+                        await read_line()
+                    elif not initial:
+                        await reply("334 ")
+                        await read_line()
+                    await reply("235 Authentication successful")
+                elif verb == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    lines = []
+                    while (data_line := await reader.readline()) not in (b".\r\n", b""):
+                        lines.append(
+                            data_line[1:] if data_line.startswith(b"..") else data_line
+                        )
+                    if self.reject_next > 0:
+                        self.reject_next -= 1
+                        await reply("451 Try again later")
+                    else:
+                        self.messages.append(
+                            email.message_from_bytes(b"".join(lines), policy=default)
+                        )
+                        await reply("250 OK")
+                elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                    await reply("250 OK")
+                elif verb == "QUIT":
+                    await reply("221 Bye")
+                    break
+                else:
+                    await reply("502 Command not implemented")
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def _serve(host: str, port: int) -> None:
+    sink = SMTPSink(host, port)
+    await sink.start()
+    print(f"SMTP sink listening on {sink.host}:{sink.port}")
+    seen = 0
+    while True:
+        await asyncio.sleep(0.5)
+        for message in sink.messages[seen:]:
+            print(f"To: {message['To']}  Subject: {message['Subject']}")
+        seen = len(sink.messages)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local SMTP sink.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    args = parser.parse_args()
+    asyncio.run(_serve(args.host, args.port))
@@ -0,0 +1,143 @@
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.conf.config import settings
+
+logger = logging.getLogger(__name__)
+
+REQUEST_HEADER = "x-sql-profile"
+"""Request header that enables profiling when `SQL_PROFILE_ALLOW_HEADER` is set."""
+
+
+class QueryProfile:
+    """
+    The SQL statements executed while handling one request.
+    """
+
+    def __init__(self):
+        self.queries: List[Tuple[str, float]] = []
+
+    def record(self, statement: str, seconds: float) -> None:
+        """
+        Adds an executed statement.
+
+        Args:
+            statement (str): The SQL text, with bound parameters as placeholders.
+            seconds (float): How long the statement took.
+        """
+        self.queries.append((" ".join(statement.split()), seconds))
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(seconds for _, seconds in self.queries)
+
+    def repeated(self, threshold: int) -> Dict[str, int]:
+        """
+        Finds statements executed at least `threshold` times.
+
+        Identical SQL text with different parameters is the signature of an
+        N+1 pattern, such as a lazy load inside a loop.
+
+        Args:
+            threshold (int): Minimum number of executions to report.
+
+        Returns:
+            Dict[str, int]: Statement text to number of executions.
+        """
+        counts = Counter(statement for statement, _ in self.queries)
+        return {statement: n for statement, n in counts.items() if n >= threshold}
+
+
+_current_profile: ContextVar[Optional[QueryProfile]] = ContextVar(
+    "sql_profile", default=None
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile.get() is not None:
+        conn.info.setdefault("profiler_query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    starts = conn.info.get("profiler_query_start")
+    if profile is not None and starts:
+        profile.record(statement, time.perf_counter() - starts.pop())
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("profiler_query_start"):
+        connection.info["profiler_query_start"].pop()
+
+
+class SQLProfilerMiddleware:
+    """
+    Profiles the SQL statements of a request and reports a summary.
+
+    Profiling is on for every request with `SQL_PROFILE`, or per request via
+    the `X-SQL-Profile` header when `SQL_PROFILE_ALLOW_HEADER` is set. The
+    response gets `X-SQL-Queries`, `X-SQL-Time-Ms` and `X-SQL-Repeated`
+    headers, and a log line lists possible N+1 statements. Statements run
+    after the response has started, e.g. while streaming, appear only in
+    the log line.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    @staticmethod
+    def _enabled(scope: Scope) -> bool:
+        if settings.SQL_PROFILE:
+            return True
+        return settings.SQL_PROFILE_ALLOW_HEADER and REQUEST_HEADER in Headers(
+            scope=scope
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._enabled(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile()
+        threshold = settings.SQL_PROFILE_REPEAT_THRESHOLD
+
+        async def send_with_summary(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-SQL-Queries"] = str(profile.count)
+                headers["X-SQL-Time-Ms"] = f"{profile.total_seconds * 1000:.3f}"
+                headers["X-SQL-Repeated"] = str(len(profile.repeated(threshold)))
+            await send(message)
+
+        token = _current_profile.set(profile)
+        try:
+            await self.app(scope, receive, send_with_summary)
+        finally:
+            _current_profile.reset(token)
+            self._log(scope, profile, threshold)
+
+    @staticmethod
+    def _log(scope: Scope, profile: QueryProfile, threshold: int) -> None:
+        request = f"{scope['method']} {scope['path']}"
+        logger.info(
+            f"{request}: {profile.count} SQL statements "
+            f"in {profile.total_seconds * 1000:.1f}ms"
+        )
+        for statement, n in profile.repeated(threshold).items():
+            logger.warning(f"Possible N+1 in {request}: {n}x {statement}")
@@ -1,15 +1,19 @@
 import asyncio
+from contextlib import suppress
+from unittest.mock import patch
 
 import pytest
 import pytest_asyncio
+import redis
 from fastapi.testclient import TestClient
 from sqlalchemy import text
 from sqlalchemy.pool import StaticPool
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 
 from main import app
+from src.conf.config import settings
 from src.database.models import Base, User
-from src.database.db import get_db
+from src.database.db import get_db, get_read_db, sessionmanager
 from src.services.auth import create_access_token, Hash
 
 SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
@@ -52,6 +56,9 @@ def init_models_wrap():
             await session.commit()
 
     asyncio.run(init_models())
+    # Cached responses of a previous run would outlive the recreated tables.
+    with suppress(redis.ConnectionError):
+        redis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT).flushdb()
 
 
 @pytest.fixture(scope="session")
@@ -65,9 +72,15 @@ def client():
                 raise
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
 
-    with TestClient(app) as client:
-        yield client
+    # Background tasks open their own sessions after the response. The
+    # warmup would connect to the configured database, not the test one.
+    with patch.object(
+        sessionmanager, "_session_maker", TestingSessionLocal
+    ), patch.object(settings, "WARMUP_DB_CONNECTIONS", 0):
+        with TestClient(app) as client:
+            yield client
 
 
 @pytest_asyncio.fixture()
@@ -80,3 +93,11 @@ async def get_token():
 async def get_user_token():
     token = await create_access_token(data={"sub": test_user["email"]}, role="user")
     return token
+
+
+@pytest.fixture()
+def sql_profile(monkeypatch):
+    """
+    Profiles SQL for every request, so tests can read `X-SQL-Queries`.
+    """
+    monkeypatch.setattr(settings, "SQL_PROFILE", True)
@@ -1,10 +1,12 @@
-from unittest.mock import Mock
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
+from jose import jwt
+from libgravatar import Gravatar
 from sqlalchemy import select
 
 from src.database.models import User
-from src.services.auth import create_access_token
+from src.services.auth import create_access_token, get_current_user
 from tests.conftest import TestingSessionLocal
 
 user_data = {
@@ -24,7 +26,17 @@ def test_signup(client, monkeypatch):
     assert data["username"] == user_data["username"]
     assert data["email"] == user_data["email"]
     assert "hashed_password" not in data
-    assert "avatar" in data
+    assert data["avatar"] is None
+
+
+@pytest.mark.asyncio
+async def test_signup_fills_gravatar_in_background(client):
+    async with TestingSessionLocal() as session:
+        result = await session.execute(
+            select(User.avatar).where(User.email == user_data["email"])
+        )
+
+    assert result.scalar_one() == Gravatar(user_data["email"]).get_image()
 
 
 def test_repeat_signup(client, monkeypatch):
@@ -73,6 +85,9 @@ async def test_login(client):
     data = response.json()
     assert "access_token" in data
     assert "token_type" in data
+    claims = jwt.get_unverified_claims(data["access_token"])
+    assert claims["sub"] == user_data["email"]
+    assert claims["uid"] == current_user.id
 
 
 def test_wrong_password_login(client):
@@ -119,3 +134,31 @@ def test_request_password_reset_user_not_found(client):
     assert response.status_code == 404, response.text
     data = response.json()
     assert data["detail"] == "User not found"
+
+
+def test_login_rejected_when_hashing_pool_is_busy(client, monkeypatch):
+    monkeypatch.setattr("src.services.auth.hashing_pool.max_pending", 0)
+
+    response = client.post(
+        "api/auth/login",
+        data={"email": user_data.get("email"), "password": user_data.get("password")},
+    )
+
+    assert response.status_code == 503, response.text
+    assert response.headers["Retry-After"] == "1"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("replica", [False, True])
+async def test_current_user_is_cached_only_from_the_primary(client, replica):
+    token = await create_access_token(data={"sub": "testuser@mail.com"}, role="admin")
+
+    with patch("src.services.auth.user_cache") as user_cache:
+        user_cache.get = AsyncMock(return_value=None)
+        user_cache.set = AsyncMock()
+        async with TestingSessionLocal() as session:
+            session.info["replica"] = replica
+            user = await get_current_user(token=token, db=session)
+
+    assert user.email == "testuser@mail.com"
+    assert user_cache.set.await_count == (0 if replica else 1)
@@ -1,9 +1,20 @@
+import csv
+import io
+import json
+from unittest.mock import AsyncMock, patch
+
 import pytest
+import pytest_asyncio
 from datetime import datetime, timedelta
 from sqlalchemy import select
 
+from main import app
+from src.conf.config import settings
+from src.database.db import get_read_db
 from src.database.models import Contact, User
-from tests.conftest import TestingSessionLocal
+from src.services.auth import create_access_token
+from src.utils.read_your_writes import COOKIE_NAME
+from tests.conftest import TestingSessionLocal, test_user
 
 contact_data = {
     "name": "John Doe",
@@ -35,9 +46,11 @@ async def test_get_contacts(client, get_token):
     response = client.get("/api/contacts/", headers=headers)
 
     assert response.status_code == 200, response.text
-    contacts = response.json()
-    assert isinstance(contacts, list)
-    assert len(contacts) > 0
+    page = response.json()
+    assert isinstance(page["items"], list)
+    assert len(page["items"]) > 0
+    assert page["limit"] == 50
+    assert page["next_cursor"] is None
 
 
 @pytest.mark.asyncio
@@ -149,3 +162,478 @@ async def test_get_upcoming_birthdays(client, get_token):
     assert "Upcoming 2" in returned_names
     assert "Past" not in returned_names
     assert "Far Future" not in returned_names
+
+
+def test_get_upcoming_birthdays_custom_window(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+
+    response = client.get(
+        "/api/contacts/upcoming_birthdays", params={"days": 10}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    assert [c["name"] for c in response.json()] == [
+        "Upcoming 1",
+        "Upcoming 2",
+        "Far Future",
+    ]
+
+    response = client.get(
+        "/api/contacts/upcoming_birthdays", params={"days": 366}, headers=headers
+    )
+    assert response.status_code == 422, response.text
+
+
+@pytest.mark.asyncio
+async def test_get_contacts_keyset_pagination(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+
+    response = client.get("/api/contacts/", params={"limit": 500}, headers=headers)
+    assert response.status_code == 200, response.text
+    expected = [(c["name"], c["id"]) for c in response.json()["items"]]
+    assert expected == sorted(expected)
+    assert len(expected) > 2
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/contacts/", params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        assert len(page["items"]) <= 2
+        seen.extend((c["name"], c["id"]) for c in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == expected
+
+
+def test_get_contacts_invalid_cursor(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+
+    response = client.get(
+        "/api/contacts/", params={"cursor": "not-a-cursor"}, headers=headers
+    )
+    assert response.status_code == 400, response.text
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_search_contacts(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    for name, email in [
+        ("Maria Search", "maria@searchable.com"),
+        ("Mario Other", "mario@elsewhere.com"),
+    ]:
+        body = {**contact_data, "name": name, "email": email}
+        response = client.post("/api/contacts", json=body, headers=headers)
+        assert response.status_code == 201, response.text
+
+    response = client.get(
+        "/api/contacts/search", params={"q": "searchable"}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    assert [c["name"] for c in response.json()] == ["Maria Search"]
+
+    response = client.get("/api/contacts/search", params={"q": "mari"}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert {c["name"] for c in response.json()} == {"Maria Search", "Mario Other"}
+
+    response = client.get("/api/contacts/search", params={"q": "io"}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert "Mario Other" in {c["name"] for c in response.json()}
+
+
+def test_search_contacts_tracks_updates(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+
+    response = client.get(
+        "/api/contacts/search", params={"q": "Mario"}, headers=headers
+    )
+    contact_id = response.json()[0]["id"]
+    response = client.put(
+        f"/api/contacts/{contact_id}", json={"name": "Luigi"}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+
+    response = client.get(
+        "/api/contacts/search", params={"q": "Mario"}, headers=headers
+    )
+    assert "Mario Other" not in {c["name"] for c in response.json()}
+    response = client.get(
+        "/api/contacts/search", params={"q": "Luigi"}, headers=headers
+    )
+    assert [c["id"] for c in response.json()] == [contact_id]
+
+
+def test_export_contacts(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    response = client.get("/api/contacts/", params={"limit": 500}, headers=headers)
+    expected_ids = sorted(c["id"] for c in response.json()["items"])
+
+    response = client.get("/api/contacts/export", headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == expected_ids
+    assert set(rows[0]) == {
+        "id",
+        "name",
+        "email",
+        "phone",
+        "birthday",
+        "additional_data",
+    }
+
+    response = client.get(
+        "/api/contacts/export", params={"format": "csv"}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("text/csv")
+    reader = csv.DictReader(io.StringIO(response.text))
+    assert [int(row["id"]) for row in reader] == expected_ids
+
+    response = client.get(
+        "/api/contacts/export", params={"format": "xml"}, headers=headers
+    )
+    assert response.status_code == 422, response.text
+
+
+def test_bulk_import_json(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    rows = [
+        {
+            "name": f"Bulk {i}",
+            "email": f"bulk{i}@mail.com",
+            "phone": "+380990000000",
+            "birthday": "1999-03-0" + str(i + 1),
+        }
+        for i in range(3)
+    ]
+    rows.append({"name": "Broken", "email": "not-an-email"})
+
+    response = client.post("/api/contacts/bulk", json=rows, headers=headers)
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result["created"] == 3
+    assert len(result["ids"]) == 3
+    assert [error["row"] for error in result["errors"]] == [4]
+    failed = {tuple(e["loc"]) for e in result["errors"][0]["errors"]}
+    assert {("email",), ("phone",), ("birthday",)} <= failed
+    assert result["rows_per_second"] > 0
+
+    response = client.get(f"/api/contacts/{result['ids'][0]}", headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["name"] == "Bulk 0"
+
+    response = client.get(
+        "/api/contacts/upcoming_birthdays", params={"days": 365}, headers=headers
+    )
+    assert "Bulk 2" in {c["name"] for c in response.json()}
+
+
+def test_bulk_import_ndjson_and_csv(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    ndjson = "\n".join(
+        json.dumps({**contact_data, "name": f"Line {i}", "email": f"line{i}@mail.com"})
+        for i in range(2)
+    )
+    response = client.post(
+        "/api/contacts/bulk",
+        content=ndjson,
+        headers={**headers, "Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["created"] == 2
+
+    csv_body = (
+        "name,email,phone,birthday,additional_data\n"
+        "Csv One,csv1@mail.com,+380991111111,1990-01-01,\n"
+        "Csv Two,csv2@mail.com,+380992222222,1990-01-02,note\n"
+    )
+    response = client.post(
+        "/api/contacts/bulk",
+        files={"file": ("contacts.csv", csv_body, "text/csv")},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result["created"] == 2
+    assert result["errors"] == []
+
+
+def test_bulk_import_rejects_bad_uploads(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+
+    response = client.post(
+        "/api/contacts/bulk",
+        content="<contacts/>",
+        headers={**headers, "Content-Type": "application/xml"},
+    )
+    assert response.status_code == 415, response.text
+
+    response = client.post(
+        "/api/contacts/bulk",
+        content="{not json",
+        headers={**headers, "Content-Type": "application/json"},
+    )
+    assert response.status_code == 400, response.text
+
+
+def test_bulk_update_contacts(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    response = client.get("/api/contacts/", params={"name": "Bulk"}, headers=headers)
+    ids = [c["id"] for c in response.json()["items"]]
+    assert len(ids) == 3
+
+    response = client.patch(
+        "/api/contacts/bulk",
+        json={"ids": ids[:2], "changes": {"phone": "+380661234567"}},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["affected"] == 2
+    assert sorted(response.json()["ids"]) == sorted(ids[:2])
+
+    response = client.patch(
+        "/api/contacts/bulk",
+        json={"name": "Bulk", "changes": {"birthday": "2001-12-25"}},
+        headers=headers,
+    )
+    assert response.json()["affected"] == 3
+
+    for contact_id in ids:
+        contact = client.get(f"/api/contacts/{contact_id}", headers=headers).json()
+        assert contact["birthday"] == "2001-12-25"
+    phones = {
+        client.get(f"/api/contacts/{i}", headers=headers).json()["phone"]
+        for i in ids[:2]
+    }
+    assert phones == {"+380661234567"}
+
+    response = client.patch(
+        "/api/contacts/bulk", json={"changes": {"phone": "1"}}, headers=headers
+    )
+    assert response.status_code == 400, response.text
+
+
+@pytest.mark.parametrize("field", ["name", "email", "phone", "birthday"])
+def test_update_rejects_null_for_required_fields(client, get_token, field):
+    headers = {"Authorization": f"Bearer {get_token}"}
+
+    response = client.put("/api/contacts/1", json={field: None}, headers=headers)
+    assert response.status_code == 422, response.text
+
+    response = client.patch(
+        "/api/contacts/bulk",
+        json={"ids": [1], "changes": {field: None}},
+        headers=headers,
+    )
+    assert response.status_code == 422, response.text
+
+
+def test_update_clears_additional_data_with_null(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+
+    response = client.put(
+        "/api/contacts/1", json={"additional_data": None}, headers=headers
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json()["additional_data"] is None
+
+
+def test_bulk_delete_contacts(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+
+    response = client.delete("/api/contacts/bulk", headers=headers)
+    assert response.status_code == 400, response.text
+
+    response = client.delete(
+        "/api/contacts/bulk", params={"name": "Csv"}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["affected"] == 2
+
+    response = client.get("/api/contacts/", params={"name": "Bulk"}, headers=headers)
+    ids = [c["id"] for c in response.json()["items"]]
+    response = client.delete(
+        "/api/contacts/bulk", params={"ids": ids, "name": "Bulk 0"}, headers=headers
+    )
+    assert response.json() == {"affected": 1, "ids": [ids[0]]}
+
+    response = client.get("/api/contacts/search", params={"q": "Csv"}, headers=headers)
+    assert response.json() == []
+
+
+@pytest.mark.asyncio
+async def test_contacts_trust_token_claims(client, monkeypatch):
+    token = await create_access_token(
+        data={"sub": test_user["email"], "uid": 1}, role="admin"
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def fail(*args, **kwargs):
+        raise AssertionError("user lookup on a stateless route")
+
+    monkeypatch.setattr("src.services.auth.get_current_user", fail)
+
+    response = client.get("/api/contacts/", headers=headers)
+    assert response.status_code == 200, response.text
+    assert len(response.json()["items"]) > 0
+
+    response = client.get("/api/contacts/", headers={"Authorization": "Bearer bad"})
+    assert response.status_code == 401, response.text
+
+
+def test_write_pins_reads_to_primary(client, get_token, monkeypatch):
+    monkeypatch.setattr(settings, "READ_YOUR_WRITES_SECONDS", 5)
+    headers = {"Authorization": f"Bearer {get_token}"}
+
+    response = client.post(
+        "/api/contacts",
+        json={
+            "name": "Pinned Reader",
+            "email": "pinned.reader@example.com",
+            "phone": "+380991112233",
+            "birthday": "1991-02-03",
+            "user_id": 1,
+        },
+        headers=headers,
+    )
+    assert response.status_code == 201, response.text
+    assert COOKIE_NAME in response.cookies
+
+    response = client.get("/api/contacts", headers=headers)
+    assert response.status_code == 200
+    assert "set-cookie" not in response.headers
+    client.cookies.clear()
+
+
+def test_replica_reads_do_not_fill_the_contacts_cache(client, get_token):
+    async def replica_db():
+        async with TestingSessionLocal() as session:
+            session.info["replica"] = True
+            yield session
+
+    headers = {"Authorization": f"Bearer {get_token}"}
+    with patch.dict(app.dependency_overrides, {get_read_db: replica_db}), patch(
+        "src.api.contacts.contacts_cache.set", new=AsyncMock()
+    ) as cache_set:
+        response = client.get("/api/contacts", params={"limit": 3}, headers=headers)
+
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+    cache_set.assert_not_awaited()
+
+
+def test_wildcard_if_none_match_needs_an_existing_contact(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}", "If-None-Match": "*"}
+
+    assert client.get("/api/contacts/999999", headers=headers).status_code == 404
+    response = client.get("/api/contacts", params={"cursor": "bad"}, headers=headers)
+    assert response.status_code == 400
+    assert client.get("/api/contacts/1", headers=headers).status_code == 304
+
+
+def test_contact_list_etag_and_invalidation(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+
+    first = client.get("/api/contacts", params={"limit": 5}, headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    cached = client.get("/api/contacts", params={"limit": 5}, headers=headers)
+    assert cached.headers["etag"] == etag
+    assert cached.json() == first.json()
+
+    not_modified = client.get(
+        "/api/contacts",
+        params={"limit": 5},
+        headers={**headers, "If-None-Match": etag},
+    )
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    response = client.post(
+        "/api/contacts",
+        json={
+            "name": "Aaron Cache",
+            "email": "aaron.cache@example.com",
+            "phone": "+380991112299",
+            "birthday": "1990-07-08",
+            "user_id": 1,
+        },
+        headers=headers,
+    )
+    assert response.status_code == 201, response.text
+    contact_id = response.json()["id"]
+
+    refreshed = client.get(
+        "/api/contacts",
+        params={"limit": 5},
+        headers={**headers, "If-None-Match": etag},
+    )
+    assert refreshed.status_code == 200
+    assert refreshed.headers["etag"] != etag
+
+    detail = client.get(f"/api/contacts/{contact_id}", headers=headers)
+    assert detail.json()["name"] == "Aaron Cache"
+    response = client.put(
+        f"/api/contacts/{contact_id}", json={"name": "Aaron Fresh"}, headers=headers
+    )
+    assert response.status_code == 200
+    detail = client.get(f"/api/contacts/{contact_id}", headers=headers)
+    assert detail.json()["name"] == "Aaron Fresh"
+
+
+@pytest_asyncio.fixture()
+async def uid_token():
+    return await create_access_token(
+        data={"sub": test_user["email"], "uid": 1}, role="admin"
+    )
+
+
+@pytest.fixture()
+def budget_contact_id(client, uid_token):
+    response = client.post(
+        "/api/contacts",
+        json={
+            "name": "Budget Contact",
+            "email": "budget.contact@example.com",
+            "phone": "+380991113344",
+            "birthday": "1990-03-04",
+            "user_id": 1,
+        },
+        headers={"Authorization": f"Bearer {uid_token}"},
+    )
+    return response.json()["id"]
+
+
+@pytest.mark.parametrize(
+    "method, path, body, budget",
+    [
+        ("post", "/api/contacts", contact_data, 1),
+        ("get", "/api/contacts?limit=10", None, 1),
+        ("get", "/api/contacts/{id}", None, 1),
+        ("get", "/api/contacts/search?q=Budget", None, 1),
+        ("get", "/api/contacts/upcoming_birthdays?days=365", None, 1),
+        ("put", "/api/contacts/{id}", {"name": "Budget Renamed"}, 1),
+        ("delete", "/api/contacts/{id}", None, 1),
+    ],
+)
+def test_contact_endpoints_query_budget(
+    client, sql_profile, uid_token, budget_contact_id, method, path, body, budget
+):
+    response = client.request(
+        method.upper(),
+        path.format(id=budget_contact_id),
+        json=body,
+        headers={"Authorization": f"Bearer {uid_token}"},
+    )
+
+    assert response.status_code < 400, response.text
+    assert int(response.headers["X-SQL-Queries"]) <= budget
+    assert response.headers["X-SQL-Repeated"] == "0"
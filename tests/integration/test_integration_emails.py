@@ -1,78 +1,291 @@
+import asyncio
+import json
+import uuid
 from unittest.mock import AsyncMock, patch
+
 import pytest
+import pytest_asyncio
+import redis.asyncio as redis
+from redis.exceptions import ConnectionError
+
+from src.conf.config import settings
 from src.services.email import send_email, send_reset_password_email
-from src.services.auth import create_email_token
-from fastapi_mail import FastMail
+from src.services.email_queue import EmailQueue
+from src.services.email_worker import EmailWorker, SMTPConnectionPool
+from src.utils.smtp_sink import SMTPSink
+
+
+@pytest_asyncio.fixture()
+async def queue():
+    client = redis.Redis(
+        host=settings.REDIS_HOST, port=settings.REDIS_PORT, decode_responses=True
+    )
+    yield EmailQueue(
+        prefix=f"test-email-{uuid.uuid4().hex}",
+        max_attempts=2,
+        retry_base=0,
+        redis=client,
+    )
+    await client.aclose()
+
+
+@pytest_asyncio.fixture()
+async def sink():
+    sink = SMTPSink()
+    await sink.start()
+    yield sink
+    await sink.stop()
+
+
+@pytest_asyncio.fixture()
+async def worker(queue, sink):
+    pool = SMTPConnectionPool(
+        size=2, max_idle=60, hostname=sink.host, port=sink.port, use_tls=False
+    )
+    yield EmailWorker(queue, pool, concurrency=2)
+    await pool.close()
 
 
 @pytest.mark.asyncio
-async def test_send_email_success():
+async def test_send_email_queues_rendered_message():
     email = "testuser@example.com"
     username = "testuser"
+    host = "http://localhost:8000/"
+
+    with patch("src.services.email.email_queue.enqueue", new=AsyncMock()) as enqueue:
+        await send_email(email, username, host)
+
+    enqueue.assert_awaited_once()
+    to, subject, html = enqueue.await_args.args
+    assert to == email
+    assert subject == "Confirm your email"
+    assert f"Hi {username}" in html
+    assert f"{host}api/auth/confirmed_email/" in html
+
+
+@pytest.mark.asyncio
+async def test_send_reset_password_email_queues_rendered_message():
+    email = "testuser@example.com"
     host = "http://localhost:8000"
 
-    token = create_email_token({"sub": email})
+    with patch("src.services.email.email_queue.enqueue", new=AsyncMock()) as enqueue:
+        await send_reset_password_email(email, host)
 
-    with patch.object(FastMail, "send_message", new_callable=AsyncMock) as mock_send:
-        await send_email(email, username, host)
+    to, subject, html = enqueue.await_args.args
+    assert to == email
+    assert subject == "Reset Your Password"
+    assert f"{host}/auth/reset-password/confirm?token=" in html
 
-        mock_send.assert_called_once()
 
-        args, kwargs = mock_send.call_args
-        message = args[0]
+@pytest.mark.asyncio
+async def test_send_email_redis_error_is_logged():
+    with patch(
+        "src.services.email.email_queue.enqueue",
+        new=AsyncMock(side_effect=ConnectionError("Redis is down")),
+    ) as enqueue:
+        await send_email("testuser@example.com", "testuser", "http://localhost/")
 
-        assert message.subject == "Confirm your email"
-        assert message.recipients == [email]
-        assert message.template_body["host"] == host
-        assert message.template_body["username"] == username
-        assert message.template_body["token"] == token
-        assert kwargs["template_name"] == "verify_email.html"
+    enqueue.assert_awaited_once()
 
 
 @pytest.mark.asyncio
-async def test_send_reset_password_email_success():
-    email = "testuser@example.com"
-    host = "http://localhost:8000"
+async def test_worker_sends_queued_emails_over_one_connection(queue, sink, worker):
+    for i in range(3):
+        await queue.enqueue(f"user{i}@example.com", f"Hello {i}", f"<p>{i}</p>")
+    assert await queue.depth() == 3
 
-    token = create_email_token({"sub": email})
-    expected_url = f"{host}/auth/reset-password/confirm?token={token}"
+    assert await worker.drain() == 3
 
-    with patch.object(FastMail, "send_message", new_callable=AsyncMock) as mock_send:
-        await send_reset_password_email(email, host)
+    assert sorted(message["To"] for message in sink.messages) == [
+        "user0@example.com",
+        "user1@example.com",
+        "user2@example.com",
+    ]
+    assert sink.messages[0].get_content_type() == "text/html"
+    assert sink.connections == 1
+    assert worker.pool.opened == 1
+    assert await queue.depth() == 0
+
+
+@pytest.mark.asyncio
+async def test_worker_retries_then_dead_letters(queue, sink, worker):
+    await queue.enqueue("retry@example.com", "Retry", "<p>retry</p>")
+    sink.reject_next = 1
 
-        mock_send.assert_called_once()
+    await worker.drain()
+    # With no backoff the retry is due immediately.
+    await worker.drain()
 
-        args, kwargs = mock_send.call_args
-        message = args[0]
+    assert [message["To"] for message in sink.messages] == ["retry@example.com"]
+    assert worker.failed == 1
+    assert worker.sent == 1
 
-        assert message.subject == "Reset Your Password"
-        assert message.recipients == [email]
-        assert message.template_body["reset_url"] == expected_url
-        assert kwargs["template_name"] == "reset_password.html"
+    await queue.enqueue("dead@example.com", "Dead", "<p>dead</p>")
+    sink.reject_next = 2
+    await worker.drain()
+    await worker.drain()
+
+    dead = await queue._redis.lrange(queue.dead_key, 0, -1)
+    assert [json.loads(job)["to"] for job in dead] == ["dead@example.com"]
+    assert json.loads(dead[0])["attempts"] == 2
+    assert await queue.depth() == 0
 
 
 @pytest.mark.asyncio
-async def test_send_email_connection_error():
-    email = "testuser@example.com"
-    username = "testuser"
-    host = "http://localhost:8000"
+async def test_queue_recovers_interrupted_jobs(queue):
+    await queue.enqueue("crash@example.com", "Crash", "<p>crash</p>")
+    raw = await queue.reserve()
+    assert await queue.reserve() is None
 
-    with patch.object(FastMail, "send_message", new_callable=AsyncMock) as mock_send:
-        mock_send.side_effect = Exception("SMTP Connection Failed")
+    assert await queue.recover() == 1
+    assert await queue.reserve() == raw
 
-        await send_email(email, username, host)
 
-        mock_send.assert_called_once()
+def peer_of(queue, **kwargs):
+    """
+    Another worker's view of the same queue.
+    """
+    prefix = queue.pending_key.removesuffix(":queue")
+    return EmailQueue(prefix=prefix, redis=queue._redis, **kwargs)
 
 
 @pytest.mark.asyncio
-async def test_send_reset_password_email_connection_error():
-    email = "testuser@example.com"
-    host = "http://localhost:8000"
+async def test_recover_leaves_live_workers_jobs_alone(queue):
+    await queue.enqueue("busy@example.com", "Busy", "<p>busy</p>")
+    await queue.reserve()
 
-    with patch.object(FastMail, "send_message", new_callable=AsyncMock) as mock_send:
-        mock_send.side_effect = Exception("SMTP Connection Failed")
+    assert await peer_of(queue).recover() == 0
+    assert await queue._redis.llen(queue.processing_key) == 1
 
-        await send_reset_password_email(email, host)
 
-        mock_send.assert_called_once()
+@pytest.mark.asyncio
+async def test_recover_requeues_jobs_of_stale_workers(queue):
+    await queue.enqueue("crash@example.com", "Crash", "<p>crash</p>")
+    raw = await queue.reserve()
+    await queue._redis.zadd(queue.workers_key, {queue.worker_id: 0})
+
+    peer = peer_of(queue)
+    assert await peer.recover() == 1
+    assert await peer.reserve() == raw
+    assert await queue._redis.zscore(queue.workers_key, queue.worker_id) is None
+
+
+@pytest.mark.asyncio
+async def test_restarted_worker_requeues_jobs_once_its_old_self_goes_stale(queue, sink):
+    crashed = peer_of(queue, stale_after=0.3)
+    await crashed.enqueue("crash@example.com", "Crash", "<p>crash</p>")
+    await crashed.reserve()
+
+    # Restarted within `stale_after`, under a new worker ID.
+    restarted = peer_of(queue, stale_after=0.3)
+    pool = SMTPConnectionPool(
+        size=1, max_idle=60, hostname=sink.host, port=sink.port, use_tls=False
+    )
+    worker = EmailWorker(restarted, pool, concurrency=1)
+    stop = asyncio.Event()
+    run = asyncio.create_task(worker.run(stop, poll_timeout=0.05))
+
+    await asyncio.sleep(0.1)
+    assert sink.messages == []
+    for _ in range(50):
+        if sink.messages:
+            break
+        await asyncio.sleep(0.05)
+    stop.set()
+    await run
+    await pool.close()
+
+    assert len(sink.messages) == 1
+    assert await queue._redis.llen(crashed.processing_key) == 0
+
+
+@pytest.mark.asyncio
+async def test_worker_requeues_jobs_it_could_not_settle(queue, worker):
+    await queue.enqueue("flaky@example.com", "Flaky", "<p>flaky</p>")
+
+    with patch.object(queue, "ack", side_effect=ConnectionError("Redis blip")):
+        assert await worker.drain() == 1
+    assert await queue._redis.llen(queue.processing_key) == 1
+
+    await worker._requeue_unsettled()
+
+    assert await queue._redis.llen(queue.processing_key) == 0
+    assert await queue._redis.llen(queue.pending_key) == 1
+
+
+@pytest.mark.asyncio
+async def test_requeue_skips_jobs_already_settled(queue):
+    await queue.enqueue("done@example.com", "Done", "<p>done</p>")
+    raw = await queue.reserve()
+    await queue.ack(raw)
+
+    assert await queue.requeue(raw) is False
+    assert await queue.depth() == 0
+
+
+@pytest.mark.asyncio
+async def test_worker_dead_letters_malformed_jobs(queue, worker):
+    await queue._redis.lpush(queue.pending_key, "not json", json.dumps({"id": "x"}))
+
+    assert await worker.drain() == 2
+
+    dead = await queue._redis.lrange(queue.dead_key, 0, -1)
+    assert sorted(json.loads(job)["raw"] for job in dead) == sorted(
+        ["not json", json.dumps({"id": "x"})]
+    )
+    assert worker.failed == 2
+    assert await queue._redis.llen(queue.processing_key) == 0
+
+
+@pytest.mark.asyncio
+async def test_worker_retries_unexpected_send_errors(queue, worker):
+    await queue.enqueue("odd@example.com", "Odd", "<p>odd</p>")
+
+    with patch.object(
+        worker.pool, "connection", side_effect=RuntimeError("unexpected")
+    ):
+        await worker.drain()
+
+    assert worker.failed == 1
+    assert await queue.depth() == 1
+    assert await queue._redis.llen(queue.processing_key) == 0
+
+
+@pytest.mark.asyncio
+async def test_worker_keeps_running_through_redis_errors(queue, worker):
+    stop = asyncio.Event()
+    reserve = queue.reserve
+    calls = 0
+
+    async def flaky_reserve(timeout=None):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise ConnectionError("Redis blip")
+        stop.set()
+        return await reserve(timeout=None)
+
+    with patch.object(queue, "reserve", side_effect=flaky_reserve):
+        await asyncio.wait_for(worker.run(stop, poll_timeout=0.01), 5)
+
+    assert calls == 2
+
+
+def test_retry_delay_backs_off_exponentially():
+    queue = EmailQueue(retry_base=10, retry_max=60)
+
+    assert 8 <= queue.retry_delay(1) <= 12
+    assert 16 <= queue.retry_delay(2) <= 24
+    assert 48 <= queue.retry_delay(10) <= 72
+
+
+@pytest.mark.asyncio
+async def test_enqueue_many_uses_one_round_trip(queue, sink, worker):
+    ids = await queue.enqueue_many(
+        (f"bulk{i}@example.com", "Happy birthday", f"<p>{i}</p>") for i in range(5)
+    )
+
+    assert len(set(ids)) == 5
+    assert await queue.depth() == 5
+    assert await worker.drain() == 5
+    assert len(sink.messages) == 5
@@ -0,0 +1,155 @@
+"""
+Runs every repository query against the test database and checks its
+`EXPLAIN QUERY PLAN`, so a query that stops using an index fails here.
+"""
+
+import re
+from contextlib import contextmanager
+from datetime import date
+from unittest.mock import AsyncMock, patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+
+from src.repository.contacts import ContactRepository
+from src.repository.users import UserRepository
+from src.schemas.contacts import ContactCreate, ContactUpdate
+from tests.conftest import TestingSessionLocal, engine, test_user
+
+FULL_SCAN = re.compile(r"^SCAN (contacts|users)( |$)")
+"""A plan step reading a whole table, or a whole index of it."""
+
+
+@contextmanager
+def captured_statements():
+    """
+    Collects the SELECT, UPDATE and DELETE statements sent to the test database.
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+async def query_plans(statements):
+    plans = []
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", parameters
+            )
+            plans.append((statement, [row.detail for row in result]))
+    return plans
+
+
+@pytest.fixture(autouse=True)
+def no_cache():
+    # The shared Redis client is bound to the test client's event loop.
+    with patch("src.repository.contacts.contacts_cache") as contacts_cache, patch(
+        "src.repository.users.user_cache"
+    ) as user_cache:
+        contacts_cache.bump = AsyncMock()
+        user_cache.invalidate = AsyncMock()
+        yield
+
+
+@pytest_asyncio.fixture()
+async def owner():
+    async with TestingSessionLocal() as session:
+        user = await UserRepository(session).get_user_by_email(test_user["email"])
+        repository = ContactRepository(session)
+        for i, name in enumerate(["Anna", "Boris", "Olena"]):
+            await repository.create(
+                ContactCreate(
+                    name=name,
+                    email=f"{name.lower()}@example.com",
+                    phone=f"+38099000000{i}",
+                    birthday=date(1990, 1 + i, 10),
+                    user_id=user.id,
+                ),
+                user,
+            )
+        return user
+
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+
+CONTACT_QUERIES = {
+    "get_all": lambda r, u: r.get_all(u),
+    "get_all_page": lambda r, u: r.get_all(u, limit=2, after=("Anna", 1)),
+    "get_all_filtered": lambda r, u: r.get_all(u, name="an", email="example"),
+    "stream_all": lambda r, u: collect(r.stream_all(u)),
+    "search": lambda r, u: r.search(u, "bori"),
+    "search_short": lambda r, u: r.search(u, "an"),
+    "birthdays": lambda r, u: r.get_by_birthday_window(u, 101, 215),
+    "birthdays_wrapped": lambda r, u: r.get_by_birthday_window(u, 1220, 110),
+    "birthdays_all": lambda r, u: r.get_by_birthday_window(u, None, None),
+    "get_by_id": lambda r, u: r.get_by_id(1, u),
+    "update": lambda r, u: r.update(1, ContactUpdate(phone="+380990000009"), u),
+    "delete": lambda r, u: r.delete(999999, u),
+    "bulk_update": lambda r, u: r.bulk_update(
+        ContactUpdate(additional_data="vip"), u, ids=[1, 2]
+    ),
+    "bulk_update_filtered": lambda r, u: r.bulk_update(
+        ContactUpdate(additional_data="vip"), u, name="ann"
+    ),
+    "bulk_delete": lambda r, u: r.bulk_delete(u, ids=[999999]),
+}
+
+USER_QUERIES = {
+    "get_user_by_id": lambda r, u: r.get_user_by_id(u.id),
+    "get_user_by_email": lambda r, u: r.get_user_by_email(u.email.upper()),
+    "get_user_by_username": lambda r, u: r.get_user_by_username(u.username.upper()),
+    "set_avatar_if_missing": lambda r, u: r.set_avatar_if_missing(
+        u.email, "https://example.com/a.png"
+    ),
+}
+
+
+def assert_no_full_scans(plans):
+    assert plans, "no statements were captured"
+    for statement, details in plans:
+        scans = [detail for detail in details if FULL_SCAN.match(detail)]
+        assert not scans, f"{scans} in the plan of:\n{statement}"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("query", CONTACT_QUERIES.values(), ids=CONTACT_QUERIES)
+async def test_contact_queries_use_indexes(owner, query):
+    async with TestingSessionLocal() as session:
+        with captured_statements() as statements:
+            await query(ContactRepository(session), owner)
+
+    assert_no_full_scans(await query_plans(statements))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("query", USER_QUERIES.values(), ids=USER_QUERIES)
+async def test_user_queries_use_indexes(owner, query):
+    async with TestingSessionLocal() as session:
+        with captured_statements() as statements:
+            await query(UserRepository(session), owner)
+
+    assert_no_full_scans(await query_plans(statements))
+
+
+@pytest.mark.asyncio
+async def test_lookups_ignore_case(owner):
+    async with TestingSessionLocal() as session:
+        repository = UserRepository(session)
+
+        by_email = await repository.get_user_by_email(owner.email.upper())
+        by_username = await repository.get_user_by_username(owner.username.upper())
+
+    assert by_email.id == owner.id
+    assert by_username.id == owner.id
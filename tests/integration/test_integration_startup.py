@@ -0,0 +1,29 @@
+import json
+import subprocess
+import sys
+
+from benchmarks.startup import LAZY_MODULES, ROOT
+
+PROBE = """
+import json, sys
+import main
+from src.database import db, redis
+print(json.dumps({
+    "modules": sorted(m for m in sys.modules if m.split(".")[0] in %r),
+    "engine": db.sessionmanager._engine is not None,
+    "redis": redis._redis_client is not None,
+}))
+"""
+
+
+def test_importing_main_defers_integrations_and_connections():
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE % (LAZY_MODULES,)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    probe = json.loads(result.stdout.splitlines()[-1])
+
+    assert probe == {"modules": [], "engine": False, "redis": False}
@@ -1,8 +1,19 @@
+import io
 from unittest.mock import patch
 
+import pytest
+from PIL import Image
+
+from src.conf.config import settings
 from tests.conftest import test_user
 
 
+def png(size=(300, 200)) -> bytes:
+    output = io.BytesIO()
+    Image.new("RGB", size, "blue").save(output, "PNG")
+    return output.getvalue()
+
+
 def test_get_me(client, get_token):
     token = get_token
     headers = {"Authorization": f"Bearer {token}"}
@@ -21,7 +32,7 @@ def test_update_avatar_user(mock_upload_file, client, get_token):
     mock_upload_file.return_value = fake_url
 
     headers = {"Authorization": f"Bearer {get_token}"}
-    file_data = {"file": ("avatar.jpg", b"fake image content", "image/jpeg")}
+    file_data = {"file": ("avatar.png", png(), "image/png")}
 
     response = client.patch("/api/users/avatar", headers=headers, files=file_data)
 
@@ -33,3 +44,98 @@ def test_update_avatar_user(mock_upload_file, client, get_token):
     assert data["avatar"] == fake_url
 
     mock_upload_file.assert_called_once()
+
+
+def test_get_me_after_avatar_update(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+
+    response = client.get("api/users/me", headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["avatar"] == "<http://example.com/avatar.jpg>"
+
+
+def test_update_avatar_rejects_non_images(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    file_data = {"file": ("avatar.jpg", b"fake image content", "image/jpeg")}
+
+    response = client.patch("/api/users/avatar", headers=headers, files=file_data)
+
+    assert response.status_code == 415, response.text
+
+
+def test_update_avatar_rejects_big_uploads(client, get_token, monkeypatch):
+    monkeypatch.setattr(settings, "AVATAR_MAX_BYTES", 100)
+    headers = {"Authorization": f"Bearer {get_token}"}
+    file_data = {"file": ("avatar.png", png((400, 400)), "image/png")}
+
+    response = client.patch("/api/users/avatar", headers=headers, files=file_data)
+
+    assert response.status_code == 413, response.text
+
+
+@pytest.fixture()
+def local_avatars(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "AVATAR_STORAGE", "local")
+    monkeypatch.setattr(settings, "AVATAR_LOCAL_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_update_avatar_stores_resized_image_locally(client, get_token, local_avatars):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    file_data = {"file": ("avatar.png", png(), "image/png")}
+
+    response = client.patch("/api/users/avatar", headers=headers, files=file_data)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["avatar"].startswith("/media/avatars/RestApp/")
+    path = local_avatars / "RestApp" / f"{response.json()['id']}.webp"
+    with Image.open(path) as image:
+        assert image.size == (settings.AVATAR_SIZE, settings.AVATAR_SIZE)
+
+
+def test_big_avatar_upload_runs_as_background_job(
+    client, get_token, local_avatars, monkeypatch
+):
+    monkeypatch.setattr(settings, "AVATAR_ASYNC_THRESHOLD_BYTES", 0)
+    headers = {"Authorization": f"Bearer {get_token}"}
+    file_data = {"file": ("avatar.png", png((600, 600)), "image/png")}
+
+    response = client.patch("/api/users/avatar", headers=headers, files=file_data)
+
+    assert response.status_code == 202, response.text
+    job = response.json()
+    assert job["status"] == "pending"
+    assert response.headers["location"].endswith(f"/api/users/avatar/jobs/{job['id']}")
+
+    # The test client runs background tasks before returning the response.
+    response = client.get(response.headers["location"], headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["status"] == "done"
+    avatar = response.json()["avatar"]
+    assert avatar.startswith("/media/avatars/RestApp/")
+
+    response = client.get("api/users/me", headers=headers)
+    assert response.json()["avatar"] == avatar
+
+
+def test_background_job_reports_invalid_images(
+    client, get_token, local_avatars, monkeypatch
+):
+    monkeypatch.setattr(settings, "AVATAR_ASYNC_THRESHOLD_BYTES", 0)
+    headers = {"Authorization": f"Bearer {get_token}"}
+    file_data = {"file": ("avatar.png", png()[:80], "image/png")}
+
+    response = client.patch("/api/users/avatar", headers=headers, files=file_data)
+    assert response.status_code == 202, response.text
+
+    response = client.get(response.headers["location"], headers=headers)
+    assert response.json()["status"] == "failed"
+    assert response.json()["error"].startswith("Not a valid image")
+
+
+def test_get_unknown_avatar_job(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+
+    response = client.get("api/users/avatar/jobs/missing", headers=headers)
+
+    assert response.status_code == 404, response.text
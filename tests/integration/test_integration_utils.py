@@ -1,5 +1,13 @@
+import time
 from unittest.mock import MagicMock, AsyncMock
 
+import pytest
+
+from src.conf.config import settings
+from src.services.auth import create_access_token
+from tests.conftest import test_user
+from src.utils.lifecycle import lifecycle
+
 
 def test_healthchecker_success(client, monkeypatch):
     async def mock_get_db():
@@ -15,3 +23,116 @@ def test_healthchecker_success(client, monkeypatch):
 
     assert response.status_code == 200
     assert response.json() == {"message": "Welcome to FastAPI!"}
+
+
+def test_pool_stats(client, get_token):
+    response = client.get(
+        "/api/pool_stats", headers={"Authorization": f"Bearer {get_token}"}
+    )
+
+    assert response.status_code == 200
+    assert "pool" in response.json()
+
+
+def test_pool_stats_requires_authentication(client):
+    response = client.get("/api/pool_stats")
+
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_forbidden_for_non_admins(client):
+    token = await create_access_token(
+        data={"sub": test_user["email"], "uid": 1}, role="user"
+    )
+
+    response = client.get(
+        "/api/pool_stats", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Only admins can see pool stats"
+
+
+def test_metrics_use_route_templates(client, get_token, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    headers = {"Authorization": f"Bearer {get_token}"}
+    client.get("/api/contacts/999999", headers=headers)
+
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert (
+        'http_requests_total{method="GET",route="/api/contacts/{contact_id}",'
+        'status="404"}' in body
+    )
+    assert "/api/contacts/999999" not in body
+    assert 'http_request_db_queries_count{route="/api/contacts/{contact_id}"}' in body
+    assert "redis_command_duration_seconds_bucket" in body
+    assert "db_pool_connections" in body
+    assert 'hashing_pool_jobs{state="pending"}' in body
+
+
+@pytest.mark.parametrize(
+    "token, authorization, expected",
+    [
+        (None, "Bearer anything", 404),
+        ("scrape-secret", None, 401),
+        ("scrape-secret", "Bearer wrong", 401),
+    ],
+)
+def test_metrics_require_the_scrape_token(
+    client, monkeypatch, token, authorization, expected
+):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", token)
+    headers = {"Authorization": authorization} if authorization else {}
+
+    response = client.get("/metrics", headers=headers)
+
+    assert response.status_code == expected
+    assert "db_pool_connections" not in response.text
+
+
+def test_rate_limit_policy_is_enforced_with_one_redis_call(
+    client, monkeypatch, get_token
+):
+    from src.utils.limiter import limiter
+    from src.utils.metrics import REDIS_COMMAND_DURATION
+
+    monkeypatch.setitem(limiter.policies, "/api/pool_stats", (2, 60))
+    evalsha_before = REDIS_COMMAND_DURATION.count(command="EVALSHA")
+
+    headers = {"Authorization": f"Bearer {get_token}"}
+    statuses = [
+        client.get("/api/pool_stats", headers=headers).status_code for _ in range(3)
+    ]
+
+    assert statuses == [200, 200, 429]
+    response = client.get("/api/pool_stats", headers=headers)
+    assert response.json() == {"error": "Too Many Requests"}
+    assert 1 <= int(response.headers["retry-after"]) <= 30
+    assert REDIS_COMMAND_DURATION.count(command="EVALSHA") - evalsha_before == 4
+
+
+def test_ready_after_warmup(client):
+    for _ in range(50):
+        response = client.get("/ready")
+        if response.status_code == 200:
+            break
+        time.sleep(0.1)
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ready"}
+
+
+def test_ready_reports_draining(client, monkeypatch):
+    # The SIGTERM hook that sets the flag is covered in test_utils_lifecycle;
+    # the test client runs the lifespan off the main thread, so it is not set.
+    monkeypatch.setattr(lifecycle, "draining", True)
+
+    response = client.get("/ready")
+
+    assert response.status_code == 503
+    assert response.json() == {"status": "draining"}
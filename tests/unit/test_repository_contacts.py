@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 
@@ -24,6 +24,13 @@ def user():
     return User(id=1, username="testuser")
 
 
+@pytest.fixture(autouse=True)
+def mock_contacts_cache():
+    with patch("src.repository.contacts.contacts_cache") as cache:
+        cache.bump = AsyncMock()
+        yield cache
+
+
 @pytest.mark.asyncio
 async def test_get_contacts(contact_repository, mock_session, user):
     mock_result = MagicMock()
@@ -49,6 +56,54 @@ async def test_get_contacts(contact_repository, mock_session, user):
     assert contacts[0].user_id == user.id
 
 
+@pytest.mark.asyncio
+async def test_get_contacts_after_cursor(contact_repository, mock_session, user):
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.all.return_value = []
+    mock_session.execute = AsyncMock(return_value=mock_result)
+
+    await contact_repository.get_all(user, limit=10, after=("test name", 1))
+
+    query = mock_session.execute.await_args.args[0]
+    sql = str(query.compile(compile_kwargs={"literal_binds": True}))
+    assert "(contacts.name, contacts.id) > ('test name', 1)" in sql
+    assert "ORDER BY contacts.name, contacts.id" in sql
+    assert "LIMIT 10" in sql
+    assert "OFFSET" not in sql
+
+
+@pytest.mark.asyncio
+async def test_search_contacts_postgres_ranks_by_similarity(
+    contact_repository, mock_session, user
+):
+    mock_session.get_bind.return_value.dialect.name = "postgresql"
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.all.return_value = []
+    mock_session.execute = AsyncMock(return_value=mock_result)
+
+    await contact_repository.search(user, "john", limit=5)
+
+    sql = str(mock_session.execute.await_args.args[0])
+    assert "lower(contacts.name) LIKE lower(" in sql
+    assert "ORDER BY greatest(word_similarity(" in sql
+
+
+@pytest.mark.asyncio
+async def test_get_by_birthday_window_wraps_new_year(
+    contact_repository, mock_session, user
+):
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.all.return_value = []
+    mock_session.execute = AsyncMock(return_value=mock_result)
+
+    await contact_repository.get_by_birthday_window(user, start_doy=1228, end_doy=104)
+
+    query = mock_session.execute.await_args.args[0]
+    sql = str(query.compile(compile_kwargs={"literal_binds": True}))
+    assert "contacts.birthday_doy >= 1228 OR contacts.birthday_doy <= 104" in sql
+    assert "contacts.user_id = 1" in sql
+
+
 @pytest.mark.asyncio
 async def test_get_contact_by_id(contact_repository, mock_session, user):
     mock_result = MagicMock()
@@ -70,7 +125,9 @@ async def test_get_contact_by_id(contact_repository, mock_session, user):
 
 
 @pytest.mark.asyncio
-async def test_create_contact(contact_repository, mock_session, user):
+async def test_create_contact(
+    contact_repository, mock_session, user, mock_contacts_cache
+):
     contact_data = ContactCreate(
         name="new name",
         email="new@mail.com",
@@ -97,37 +154,88 @@ async def test_create_contact(contact_repository, mock_session, user):
 
     mock_session.add.assert_called_once()
     mock_session.commit.assert_awaited_once()
-    mock_session.refresh.assert_awaited_once_with(result)
+    mock_session.refresh.assert_not_awaited()
+    mock_contacts_cache.bump.assert_awaited_once_with(user.id)
 
 
 @pytest.mark.asyncio
-async def test_update_contact(contact_repository, mock_session, user):
+async def test_bulk_create_contacts(contact_repository, mock_session, user):
+    bodies = [
+        ContactCreate(
+            name=f"bulk {i}",
+            email=f"bulk{i}@mail.com",
+            phone="+380998887766",
+            birthday=datetime.strptime("2007-01-01", "%Y-%m-%d").date(),
+            user_id=user.id,
+        )
+        for i in range(5)
+    ]
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.all.side_effect = [[1, 2], [3, 4], [5]]
+    mock_session.execute = AsyncMock(return_value=mock_result)
+
+    ids = await contact_repository.bulk_create(bodies, user=user, chunk_size=2)
+
+    assert ids == [1, 2, 3, 4, 5]
+    assert mock_session.execute.await_count == 3
+    mock_session.commit.assert_awaited_once()
+    mock_session.add.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_bulk_delete_contacts_single_statement(
+    contact_repository, mock_session, user
+):
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.all.return_value = [3, 7]
+    mock_session.execute = AsyncMock(return_value=mock_result)
+
+    ids = await contact_repository.bulk_delete(user, ids=[3, 7, 9])
+
+    assert ids == [3, 7]
+    mock_session.execute.assert_awaited_once()
+    sql = str(mock_session.execute.await_args.args[0])
+    assert sql.startswith("DELETE FROM contacts WHERE contacts.user_id = ")
+    assert "RETURNING contacts.id" in sql
+    mock_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_update_contact(
+    contact_repository, mock_session, user, mock_contacts_cache
+):
     contact_data = ContactUpdate(
         name="new name",
         email="new@mail.com",
+        birthday=datetime.strptime("2007-03-08", "%Y-%m-%d").date(),
     )
 
-    existing_contact = Contact(
+    updated_contact = Contact(
         id=1,
-        name="test name",
-        email="test@mail.com",
+        name="new name",
+        email="new@mail.com",
         phone="+380998887766",
-        birthday=datetime.strptime("2007-01-01", "%Y-%m-%d").date(),
+        birthday=datetime.strptime("2007-03-08", "%Y-%m-%d").date(),
         user_id=user.id,
     )
 
     mock_result = MagicMock()
-    mock_result.scalar_one_or_none.return_value = existing_contact
+    mock_result.scalar_one_or_none.return_value = updated_contact
     mock_session.execute = AsyncMock(return_value=mock_result)
 
     result = await contact_repository.update(contact_id=1, body=contact_data, user=user)
 
-    assert result is not None
-    assert result.name == "new name"
-    assert result.email == "new@mail.com"
+    assert result is updated_contact
 
+    assert mock_session.execute.await_count == 1
+    stmt = mock_session.execute.await_args.args[0]
+    sql = str(stmt.compile(compile_kwargs={"literal_binds": True}))
+    assert sql.startswith("UPDATE contacts SET")
+    assert "birthday_doy=308" in sql
+    assert "RETURNING" in sql
     mock_session.commit.assert_awaited_once()
-    mock_session.refresh.assert_awaited_once_with(existing_contact)
+    mock_session.refresh.assert_not_awaited()
+    mock_contacts_cache.bump.assert_awaited_once_with(user.id)
 
 
 @pytest.mark.asyncio
@@ -151,7 +259,10 @@ async def test_delete_contact(contact_repository, mock_session, user):
     assert result.name == "test name"
     assert result.email == "test@mail.com"
 
-    mock_session.delete.assert_awaited_once_with(existing_contact)
+    assert mock_session.execute.await_count == 1
+    stmt = mock_session.execute.await_args.args[0]
+    assert str(stmt).startswith("DELETE FROM contacts")
+    mock_session.delete.assert_not_awaited()
     mock_session.commit.assert_awaited_once()
 
 
@@ -193,7 +304,9 @@ async def test_update_contact_not_found(contact_repository, mock_session, user):
 
 
 @pytest.mark.asyncio
-async def test_delete_contact_not_found(contact_repository, mock_session, user):
+async def test_delete_contact_not_found(
+    contact_repository, mock_session, user, mock_contacts_cache
+):
     mock_result = MagicMock()
     mock_result.scalar_one_or_none.return_value = None
     mock_session.execute = AsyncMock(return_value=mock_result)
@@ -201,3 +314,4 @@ async def test_delete_contact_not_found(contact_repository, mock_session, user):
     result = await contact_repository.delete(contact_id=99, user=user)
 
     assert result is None
+    mock_contacts_cache.bump.assert_not_awaited()
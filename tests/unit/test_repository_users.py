@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.database.models import User
 from src.repository.users import UserRepository
@@ -17,6 +17,13 @@ def user_repository(mock_session):
     return UserRepository(mock_session)
 
 
+@pytest.fixture(autouse=True)
+def mock_user_cache():
+    with patch("src.repository.users.user_cache") as cache:
+        cache.invalidate = AsyncMock()
+        yield cache
+
+
 @pytest.fixture
 def test_user():
     return User(
@@ -87,37 +94,96 @@ async def test_create_user(user_repository, mock_session):
 
     mock_session.add.assert_called_once()
     mock_session.commit.assert_awaited_once()
-    mock_session.refresh.assert_awaited_once_with(result)
+    mock_session.refresh.assert_not_awaited()
+
+
+def assert_single_update(mock_session, column):
+    assert mock_session.execute.await_count == 1
+    sql = str(mock_session.execute.await_args.args[0])
+    assert sql.startswith(f"UPDATE users SET {column}=")
+    assert "lower(users.email) = :lower_1" in sql
+    assert "RETURNING" in sql
+    mock_session.commit.assert_awaited_once()
+    mock_session.refresh.assert_not_awaited()
 
 
 @pytest.mark.asyncio
-async def test_update_avatar_url(user_repository, mock_session, test_user):
+async def test_update_avatar_url(
+    user_repository, mock_session, test_user, mock_user_cache
+):
+    test_user.avatar = "https://newavatar.com/image.png"
     mock_result = MagicMock()
     mock_result.scalar_one_or_none.return_value = test_user
     mock_session.execute = AsyncMock(return_value=mock_result)
-    mock_session.commit = AsyncMock()
-    mock_session.refresh = AsyncMock()
 
     updated_user = await user_repository.update_avatar_url(
-        "test@example.com", "https://newavatar.com/image.png"
+        "Test@Example.com", "https://newavatar.com/image.png"
     )
 
-    assert updated_user is not None
-    assert updated_user.avatar == "https://newavatar.com/image.png"
-
-    mock_session.commit.assert_awaited_once()
-    mock_session.refresh.assert_awaited_once_with(test_user)
+    assert updated_user is test_user
+    assert_single_update(mock_session, "avatar")
+    mock_user_cache.invalidate.assert_awaited_once_with("test@example.com")
 
 
 @pytest.mark.asyncio
-async def test_confirmed_email(user_repository, mock_session, test_user):
+async def test_confirmed_email(
+    user_repository, mock_session, test_user, mock_user_cache
+):
     mock_result = MagicMock()
     mock_result.scalar_one_or_none.return_value = test_user
     mock_session.execute = AsyncMock(return_value=mock_result)
-    mock_session.commit = AsyncMock()
 
     await user_repository.confirmed_email("test@example.com")
 
-    assert test_user.confirmed is True
+    assert_single_update(mock_session, "confirmed")
+    mock_user_cache.invalidate.assert_awaited_once_with("test@example.com")
+
+
+@pytest.mark.asyncio
+async def test_update_password(
+    user_repository, mock_session, test_user, mock_user_cache
+):
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = test_user
+    mock_session.execute = AsyncMock(return_value=mock_result)
+
+    updated_user = await user_repository.update_password("test@example.com", "new")
+
+    assert updated_user is test_user
+    assert_single_update(mock_session, "hashed_password")
+    mock_user_cache.invalidate.assert_awaited_once_with("test@example.com")
+
+
+@pytest.mark.asyncio
+async def test_update_unknown_user(user_repository, mock_session, mock_user_cache):
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = None
+    mock_session.execute = AsyncMock(return_value=mock_result)
+
+    assert await user_repository.update_avatar_url("nobody@example.com", "x") is None
+    mock_user_cache.invalidate.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_set_avatar_if_missing(user_repository, mock_session, mock_user_cache):
+    mock_session.execute = AsyncMock(return_value=MagicMock(rowcount=1))
+
+    assert await user_repository.set_avatar_if_missing(
+        "test@example.com", "https://gravatar.example/a"
+    )
 
     mock_session.commit.assert_awaited_once()
+    mock_user_cache.invalidate.assert_awaited_once_with("test@example.com")
+
+
+@pytest.mark.asyncio
+async def test_set_avatar_if_missing_keeps_existing_avatar(
+    user_repository, mock_session, mock_user_cache
+):
+    mock_session.execute = AsyncMock(return_value=MagicMock(rowcount=0))
+
+    assert not await user_repository.set_avatar_if_missing(
+        "test@example.com", "https://gravatar.example/a"
+    )
+
+    mock_user_cache.invalidate.assert_not_awaited()
@@ -0,0 +1,109 @@
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from redis.exceptions import ConnectionError
+
+from src.services.cache import ContactsResponseCache, LRUCache, UserCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_lru_cache_expires_entries():
+    cache = LRUCache(maxsize=2, ttl=60)
+    with patch("src.services.cache.time.monotonic", return_value=100):
+        cache.set("a", 1)
+    with patch("src.services.cache.time.monotonic", return_value=161):
+        assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+@pytest.fixture
+def mock_redis():
+    redis = AsyncMock()
+    with patch("src.services.cache.get_redis", AsyncMock(return_value=redis)):
+        yield redis
+
+
+@pytest.mark.asyncio
+async def test_user_cache_local_hit_skips_redis(mock_redis):
+    cache = UserCache(maxsize=10, local_ttl=60, redis_ttl=600)
+    await cache.set("test@example.com", {"id": 1})
+    mock_redis.setex.assert_awaited_once_with(
+        "user:test@example.com", 600, json.dumps({"id": 1})
+    )
+
+    assert await cache.get("test@example.com") == {"id": 1}
+    mock_redis.get.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_user_cache_falls_back_to_redis(mock_redis):
+    cache = UserCache(maxsize=10, local_ttl=60, redis_ttl=600)
+    mock_redis.get.return_value = json.dumps({"id": 1})
+
+    assert await cache.get("test@example.com") == {"id": 1}
+    assert await cache.get("test@example.com") == {"id": 1}
+    mock_redis.get.assert_awaited_once_with("user:test@example.com")
+
+
+@pytest.mark.asyncio
+async def test_user_cache_invalidate_publishes(mock_redis):
+    cache = UserCache(maxsize=10, local_ttl=60, redis_ttl=600)
+    await cache.set("test@example.com", {"id": 1})
+
+    await cache.invalidate("test@example.com")
+
+    assert cache.local.get("test@example.com") is None
+    mock_redis.delete.assert_awaited_once_with("user:test@example.com")
+    mock_redis.publish.assert_awaited_once_with(UserCache.CHANNEL, "test@example.com")
+
+
+@pytest.mark.asyncio
+async def test_contacts_cache_generation_is_created_once(mock_redis):
+    cache = ContactsResponseCache(ttl=300)
+    mock_redis.get.return_value = None
+    mock_redis.set.return_value = True
+
+    generation = await cache.generation(1)
+
+    mock_redis.set.assert_awaited_once_with(
+        "contacts:gen:1", generation, ex=600, nx=True
+    )
+
+
+@pytest.mark.asyncio
+async def test_contacts_cache_bump_changes_etag(mock_redis):
+    cache = ContactsResponseCache(ttl=300)
+    mock_redis.get.return_value = "1"
+    before = cache.etag(1, await cache.generation(1), "query")
+
+    await cache.bump(1)
+    assert mock_redis.set.await_args.kwargs["ex"] == 600
+    mock_redis.get.return_value = mock_redis.set.await_args.args[1]
+    after = cache.etag(1, await cache.generation(1), "query")
+
+    assert before.startswith('W/"')
+    assert before != after
+    assert cache.etag(2, "1", "query") != before
+
+
+@pytest.mark.asyncio
+async def test_contacts_cache_fails_open(mock_redis):
+    cache = ContactsResponseCache(ttl=300)
+    mock_redis.get.side_effect = ConnectionError("down")
+
+    assert await cache.generation(1) is None
+    assert await cache.get(1, "1", "query") is None
@@ -0,0 +1,30 @@
+from datetime import date
+
+import pytest
+
+from src.database.models import Contact
+from src.services.contacts import birthday_window
+
+
+@pytest.mark.parametrize(
+    "today, days, expected",
+    [
+        (date(2025, 6, 10), 7, (610, 617)),
+        (date(2025, 12, 28), 7, (1228, 104)),
+        (date(2025, 2, 21), 7, (221, 229)),
+        (date(2024, 2, 21), 7, (221, 228)),
+        (date(2025, 2, 25), 7, (225, 304)),
+        (date(2025, 3, 1), 0, (301, 301)),
+        (date(2025, 3, 1), 365, (None, None)),
+    ],
+)
+def test_birthday_window(today, days, expected):
+    assert birthday_window(today, days) == expected
+
+
+def test_contact_birthday_doy_follows_birthday():
+    contact = Contact(name="test", birthday=date(2000, 2, 29))
+    assert contact.birthday_doy == 229
+
+    contact.birthday = date(1990, 12, 31)
+    assert contact.birthday_doy == 1231
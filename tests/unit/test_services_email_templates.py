@@ -0,0 +1,43 @@
+import pytest
+
+from src.services.email_templates import EmailTemplates
+
+
+def test_load_compiles_every_template():
+    templates = EmailTemplates()
+
+    assert templates.load() == 2
+    assert "\n" not in templates.render("reset_password.html", reset_url="http://x")
+
+
+def test_render_escapes_variables():
+    templates = EmailTemplates()
+
+    html = templates.render(
+        "verify_email.html", host="http://x/", username="<b>eve</b>", token="t"
+    )
+
+    assert "&lt;b&gt;eve&lt;/b&gt;" in html
+    assert 'href="http://x/api/auth/confirmed_email/t"' in html
+
+
+def test_render_many_personalizes_each_body():
+    templates = EmailTemplates()
+
+    bodies = templates.render_many(
+        "verify_email.html",
+        [{"username": "anna", "token": "a"}, {"username": "ivan", "token": "i"}],
+        shared={"host": "http://x/"},
+    )
+
+    assert len(bodies) == 2
+    assert "Hi anna" in bodies[0] and "confirmed_email/a" in bodies[0]
+    assert "Hi ivan" in bodies[1] and "confirmed_email/i" in bodies[1]
+    assert bodies[0] == templates.render(
+        "verify_email.html", host="http://x/", username="anna", token="a"
+    )
+
+
+def test_unknown_template_raises():
+    with pytest.raises(KeyError):
+        EmailTemplates().get("missing.html")
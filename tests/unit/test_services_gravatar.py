@@ -0,0 +1,54 @@
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from libgravatar import Gravatar
+
+from src.services.gravatar import GravatarResolver, email_hash, fill_gravatar
+
+
+def test_email_hash_normalizes_the_address():
+    assert email_hash(" Anna@Example.com ") == "6b56db1f84a3997b902509d3fbf0a306"
+    assert email_hash("anna@example.com") == "6b56db1f84a3997b902509d3fbf0a306"
+
+
+@pytest.mark.asyncio
+async def test_resolve_caches_by_email_hash():
+    resolver = GravatarResolver(maxsize=10, ttl=60)
+
+    with patch("libgravatar.Gravatar", wraps=Gravatar) as gravatar:
+        first = await resolver.resolve("anna@example.com")
+        second = await resolver.resolve("ANNA@example.com")
+
+    assert first == second
+    assert first.endswith("6b56db1f84a3997b902509d3fbf0a306")
+    assert gravatar.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_resolve_returns_none_on_errors():
+    resolver = GravatarResolver(maxsize=10, ttl=60)
+
+    with patch("libgravatar.Gravatar", side_effect=ValueError("bad")):
+        assert await resolver.resolve("anna@example.com") is None
+
+    assert resolver.cache.get(email_hash("anna@example.com")) is None
+
+
+@pytest.mark.asyncio
+async def test_fill_gravatar_sets_the_default_avatar():
+    session = MagicMock()
+
+    @asynccontextmanager
+    async def fake_session():
+        yield session
+
+    with patch("src.services.gravatar.sessionmanager.session", fake_session), patch(
+        "src.services.gravatar.UserService.set_default_avatar", new=AsyncMock()
+    ) as set_default_avatar:
+        await fill_gravatar("anna@example.com")
+
+    set_default_avatar.assert_awaited_once()
+    email, url = set_default_avatar.await_args.args
+    assert email == "anna@example.com"
+    assert url.endswith("6b56db1f84a3997b902509d3fbf0a306")
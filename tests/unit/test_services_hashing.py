@@ -0,0 +1,71 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.services.hashing import hash_password, verify_password
+from src.services.worker_pool import PoolBusyError, WorkerPool
+
+
+@pytest.mark.asyncio
+async def test_hashing_pool_runs_off_the_event_loop():
+    pool = WorkerPool(kind="thread", workers=2, max_pending=4)
+    loop_thread = threading.get_ident()
+
+    worker_thread = await pool.run(threading.get_ident)
+    hashed = await pool.run(hash_password, "secret")
+
+    assert worker_thread != loop_thread
+    assert await pool.run(verify_password, "secret", hashed) is True
+    assert await pool.run(verify_password, "wrong", hashed) is False
+    assert pool.stats()["completed"] == 4
+    assert pool.stats()["pending"] == 0
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_hashing_pool_rejects_when_backlog_is_full():
+    pool = WorkerPool(kind="thread", workers=1, max_pending=1)
+    release = threading.Event()
+
+    running = asyncio.ensure_future(pool.run(release.wait))
+    await asyncio.sleep(0)
+    with pytest.raises(PoolBusyError) as exc_info:
+        await pool.run(hash_password, "secret")
+
+    release.set()
+    assert await running is True
+    assert exc_info.value.pool == "worker"
+    assert pool.stats()["rejected"] == 1
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_hashing_pool_process_kind():
+    pool = WorkerPool(kind="process", workers=1, max_pending=2)
+
+    hashed = await pool.run(hash_password, "secret")
+
+    assert verify_password("secret", hashed)
+    pool.shutdown()
+
+
+def test_hashing_pool_unknown_kind():
+    with pytest.raises(ValueError):
+        WorkerPool(kind="fiber", workers=1, max_pending=1)
+
+
+@pytest.mark.asyncio
+async def test_image_pool_reports_its_own_name_when_full():
+    pool = WorkerPool(kind="thread", workers=1, max_pending=1, name="image")
+    release = threading.Event()
+
+    running = asyncio.ensure_future(pool.run(release.wait))
+    await asyncio.sleep(0)
+    with pytest.raises(PoolBusyError, match="image backlog is full") as exc_info:
+        await pool.run(hash_password, "secret")
+
+    release.set()
+    await running
+    assert exc_info.value.pool == "image"
+    pool.shutdown()
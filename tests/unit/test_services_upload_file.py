@@ -0,0 +1,96 @@
+import io
+
+import pytest
+from PIL import Image
+
+from src.services.upload_file import (
+    ImageTooLargeError,
+    InvalidImageError,
+    LocalStorage,
+    UploadFileService,
+    make_thumbnail,
+    sniff_image_type,
+)
+
+
+def encode(size, mode="RGB", format="PNG", color="red") -> bytes:
+    output = io.BytesIO()
+    Image.new(mode, size, color).save(output, format)
+    return output.getvalue()
+
+
+@pytest.mark.parametrize(
+    "format, mime_type",
+    [("PNG", "image/png"), ("JPEG", "image/jpeg"), ("GIF", "image/gif")],
+)
+def test_sniff_image_type_recognises_images(format, mime_type):
+    assert sniff_image_type(encode((4, 4), format=format)) == mime_type
+
+
+def test_sniff_image_type_recognises_webp():
+    assert sniff_image_type(encode((4, 4), format="WEBP")) == "image/webp"
+
+
+def test_sniff_image_type_rejects_other_content():
+    assert sniff_image_type(b"<svg xmlns='http://www.w3.org/2000/svg'/>") is None
+    assert sniff_image_type(b"") is None
+
+
+def test_make_thumbnail_crops_to_a_square():
+    thumbnail = make_thumbnail(encode((800, 400), format="JPEG"), 250, 10**6)
+
+    with Image.open(io.BytesIO(thumbnail)) as image:
+        assert image.format == "WEBP"
+        assert image.size == (250, 250)
+        assert image.mode == "RGB"
+
+
+def test_make_thumbnail_keeps_transparency():
+    thumbnail = make_thumbnail(
+        encode((300, 300), mode="RGBA", color=(255, 0, 0, 128)), 100, 10**6
+    )
+
+    with Image.open(io.BytesIO(thumbnail)) as image:
+        assert image.mode == "RGBA"
+
+
+def test_make_thumbnail_rejects_too_many_pixels():
+    with pytest.raises(ImageTooLargeError):
+        make_thumbnail(encode((1000, 1000)), 250, 999_999)
+
+
+def test_make_thumbnail_rejects_corrupt_images():
+    with pytest.raises(InvalidImageError):
+        make_thumbnail(encode((100, 100))[:60], 250, 10**6)
+
+
+def test_local_storage_replaces_the_avatar(tmp_path):
+    storage = LocalStorage(tmp_path, "/media/avatars/")
+
+    first = storage.save("RestApp/anna", b"first")
+    second = storage.save("RestApp/anna", b"second")
+
+    assert first.startswith("/media/avatars/RestApp/anna.webp?v=")
+    assert first != second
+    assert (tmp_path / "RestApp" / "anna.webp").read_bytes() == b"second"
+    assert [p.name for p in (tmp_path / "RestApp").iterdir()] == ["anna.webp"]
+
+
+def test_upload_file_stores_the_thumbnail(tmp_path):
+    service = UploadFileService(LocalStorage(tmp_path, "/media"), size=64)
+
+    url = service.upload_file(encode((500, 300)), 7)
+
+    assert url.startswith("/media/RestApp/7.webp")
+    with Image.open(tmp_path / "RestApp" / "7.webp") as image:
+        assert image.size == (64, 64)
+
+
+@pytest.mark.parametrize("key", ["../escaped", "RestApp/../../escaped", "/etc/x"])
+def test_local_storage_rejects_keys_outside_the_root(tmp_path, key):
+    storage = LocalStorage(tmp_path / "avatars", "/media")
+
+    with pytest.raises(ValueError):
+        storage.save(key, b"data")
+
+    assert not (tmp_path / "escaped.webp").exists()
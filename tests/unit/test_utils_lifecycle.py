@@ -0,0 +1,74 @@
+import asyncio
+import signal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.utils.lifecycle import Lifecycle, drain_on_signal, lifecycle, warm_up
+
+
+@pytest.fixture
+def server_handler():
+    calls = []
+
+    def handler(sig, frame):
+        calls.append((sig, frame))
+
+    handler.calls = calls
+    original = signal.signal(signal.SIGTERM, handler)
+    yield handler
+    signal.signal(signal.SIGTERM, original)
+
+
+@pytest.mark.asyncio
+async def test_sigterm_drains_before_the_server_stops(server_handler, monkeypatch):
+    monkeypatch.setattr(lifecycle, "draining", False)
+    restore = drain_on_signal(0.1)
+
+    signal.raise_signal(signal.SIGTERM)
+    await asyncio.sleep(0)
+
+    assert lifecycle.status == "draining"
+    assert server_handler.calls == []
+
+    await asyncio.sleep(0.2)
+    assert server_handler.calls == [(signal.SIGTERM, None)]
+    restore()
+    assert signal.getsignal(signal.SIGTERM) is server_handler
+
+
+@pytest.mark.asyncio
+async def test_second_sigterm_is_handed_on_at_once(server_handler, monkeypatch):
+    monkeypatch.setattr(lifecycle, "draining", False)
+    restore = drain_on_signal(60)
+
+    signal.raise_signal(signal.SIGTERM)
+    signal.raise_signal(signal.SIGTERM)
+
+    assert len(server_handler.calls) == 1
+    restore()
+
+
+def test_status_is_starting_until_ready():
+    state = Lifecycle()
+    assert state.status == "starting"
+
+    state.ready = True
+    assert state.status == "ready"
+
+
+@pytest.mark.asyncio
+async def test_warm_up_retries_the_database_and_tolerates_redis(monkeypatch):
+    monkeypatch.setattr(lifecycle, "ready", False)
+    monkeypatch.setattr("src.utils.lifecycle.settings.WARMUP_RETRY_SECONDS", 0)
+    warm_database = AsyncMock(side_effect=[OSError("refused"), None])
+
+    with patch("src.utils.lifecycle._warm_database", warm_database), patch(
+        "src.utils.lifecycle._warm_redis", AsyncMock(side_effect=OSError("down"))
+    ), patch("src.utils.lifecycle._warm_schemas") as warm_schemas:
+        failed = await warm_up(MagicMock())
+
+    assert warm_database.await_count == 2
+    warm_schemas.assert_called_once()
+    assert failed == ["redis"]
+    assert lifecycle.ready is True
@@ -0,0 +1,88 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from src.services.auth import create_access_token
+from src.utils.limiter import RateLimiter, RateLimitExceeded, parse_rate
+
+
+def make_request(path="/api/contacts/", authorization=None, host="10.0.0.1"):
+    request = MagicMock()
+    request.scope = {"route": MagicMock(path=path)}
+    request.headers = {"authorization": authorization} if authorization else {}
+    request.client.host = host
+    return request
+
+
+@pytest.mark.parametrize(
+    "rate, expected",
+    [
+        ("5/minute", (5, 60)),
+        ("100 / 15 minutes", (100, 900)),
+        ("1/second", (1, 1)),
+        ("1000/day", (1000, 86400)),
+    ],
+)
+def test_parse_rate(rate, expected):
+    assert parse_rate(rate) == expected
+
+
+@pytest.mark.parametrize("rate", ["5", "five/minute", "0/minute", "5/week"])
+def test_parse_rate_rejects_invalid_rates(rate):
+    with pytest.raises(ValueError):
+        parse_rate(rate)
+
+
+def test_policy_for_falls_back_to_default():
+    limiter = RateLimiter("60/minute", {"/api/auth/login": "5/minute"})
+
+    assert limiter.policy_for("/api/auth/login") == ("/api/auth/login", (5, 60))
+    assert limiter.policy_for("/api/contacts/") == ("default", (60, 60))
+
+
+@pytest.mark.asyncio
+async def test_identify_uses_token_user_then_ip():
+    token = await create_access_token(data={"sub": "a@b.com", "uid": 7}, role="user")
+    legacy = await create_access_token(data={"sub": "a@b.com"}, role="user")
+
+    assert RateLimiter.identify(make_request(authorization=f"Bearer {token}")) == (
+        "user:7"
+    )
+    assert RateLimiter.identify(make_request(authorization=f"Bearer {legacy}")) == (
+        "user:a@b.com"
+    )
+    assert RateLimiter.identify(make_request(authorization="Bearer forged")) == (
+        "ip:10.0.0.1"
+    )
+    assert RateLimiter.identify(make_request()) == "ip:10.0.0.1"
+
+
+@pytest.mark.asyncio
+async def test_call_raises_when_bucket_is_empty():
+    limiter = RateLimiter("60/minute", {"/api/auth/login": "5/minute"})
+
+    with patch.object(limiter, "hit", new=AsyncMock(return_value=2.5)) as hit:
+        with pytest.raises(RateLimitExceeded) as exc_info:
+            await limiter(make_request(path="/api/auth/login"))
+
+    assert exc_info.value.retry_after == 2.5
+    hit.assert_awaited_once_with("ratelimit:/api/auth/login:ip:10.0.0.1", (5, 60))
+
+
+@pytest.mark.asyncio
+async def test_call_fails_open_without_redis():
+    limiter = RateLimiter("60/minute", {})
+
+    with patch.object(limiter, "hit", new=AsyncMock(side_effect=ConnectionError())):
+        await limiter(make_request())
+
+
+@pytest.mark.asyncio
+async def test_disabled_limiter_skips_redis():
+    limiter = RateLimiter("60/minute", {}, enabled=False)
+
+    with patch.object(limiter, "hit", new=AsyncMock()) as hit:
+        await limiter(make_request())
+
+    hit.assert_not_awaited()
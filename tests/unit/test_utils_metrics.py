@@ -0,0 +1,45 @@
+import pytest
+
+from src.utils.metrics import Counter, Gauge, Histogram, Registry
+
+
+def test_counter_renders_labelled_samples():
+    registry = Registry()
+    counter = registry.register(
+        Counter("requests_total", "Requests.", ("method", "route"))
+    )
+    counter.inc(method="GET", route="/items/{id}")
+    counter.inc(2, method="GET", route="/items/{id}")
+
+    body = registry.render()
+
+    assert "# TYPE requests_total counter" in body
+    assert 'requests_total{method="GET",route="/items/{id}"} 3.0' in body
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency_seconds", "Latency.", buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.5, 5):
+        histogram.observe(value)
+
+    body = histogram.render()
+
+    assert 'latency_seconds_bucket{le="0.1"} 1.0' in body
+    assert 'latency_seconds_bucket{le="1.0"} 3.0' in body
+    assert 'latency_seconds_bucket{le="+Inf"} 4.0' in body
+    assert "latency_seconds_sum 6.05" in body
+    assert "latency_seconds_count 4.0" in body
+
+
+def test_gauge_collects_at_scrape_time_and_escapes_labels():
+    gauge = Gauge("pool", "Pool.", ("state",), collect=lambda: {('a"b',): 2})
+
+    assert 'pool{state="a\\"b"} 2.0' in gauge.render()
+
+
+def test_registry_rejects_duplicates():
+    registry = Registry()
+    registry.register(Counter("dup", "Dup."))
+
+    with pytest.raises(ValueError):
+        registry.register(Counter("dup", "Dup."))
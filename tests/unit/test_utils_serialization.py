@@ -0,0 +1,65 @@
+import json
+from datetime import date
+from typing import List
+
+from src.database.models import Contact, User
+from src.schemas.contacts import ContactOut
+from src.schemas.users import UserSchema
+from src.utils.serialization import (
+    dump_json,
+    dump_row,
+    dump_rows,
+    row_dict,
+    type_adapter,
+)
+
+
+def make_contact(contact_id: int, additional_data=None) -> Contact:
+    return Contact(
+        id=contact_id,
+        name=f"Контакт {contact_id}",
+        email=f"contact{contact_id}@example.com",
+        phone="+380990000000",
+        birthday=date(1990, 2, 28),
+        additional_data=additional_data,
+        user_id=1,
+    )
+
+
+def test_type_adapter_is_built_once():
+    assert type_adapter(List[ContactOut]) is type_adapter(List[ContactOut])
+
+
+def test_dump_rows_matches_the_validated_output():
+    contacts = [make_contact(1), make_contact(2, "note")]
+
+    body = dump_rows(ContactOut, contacts)
+
+    assert body == dump_json(List[ContactOut], contacts)
+    assert json.loads(body)[1] == {
+        "id": 2,
+        "name": "Контакт 2",
+        "email": "contact2@example.com",
+        "phone": "+380990000000",
+        "birthday": "1990-02-28",
+        "additional_data": "note",
+    }
+
+
+def test_dump_row_skips_fields_outside_the_model():
+    contact = make_contact(1)
+
+    assert "user_id" not in row_dict(ContactOut, contact)
+    assert dump_row(ContactOut, contact) == dump_json(ContactOut, contact)
+
+
+def test_dump_json_validates_orm_objects():
+    user = User(id=1, username="anna", email="anna@example.com", role="user")
+
+    assert json.loads(dump_json(UserSchema, user)) == {
+        "id": 1,
+        "username": "anna",
+        "email": "anna@example.com",
+        "avatar": None,
+        "role": "user",
+    }
@@ -0,0 +1,13 @@
+from src.utils.sql_profiler import QueryProfile
+
+
+def test_query_profile_flags_repeated_statements():
+    profile = QueryProfile()
+    profile.record("SELECT * FROM contacts\n WHERE id = ?", 0.001)
+    for _ in range(3):
+        profile.record("SELECT * FROM users WHERE id = ?", 0.002)
+
+    assert profile.count == 4
+    assert round(profile.total_seconds, 6) == 0.007
+    assert profile.repeated(threshold=2) == {"SELECT * FROM users WHERE id = ?": 3}
+    assert profile.repeated(threshold=4) == {}